@@ -6,10 +6,14 @@ Provides common functionality: JSON parsing, error handling, logging.
 import json
 import sys
 import os
+import time
 from abc import ABC, abstractmethod
-from pathlib import Path
-from datetime import datetime
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List, TextIO, Tuple
+
+from config import get_log_settings, get_metrics_settings
+
+# Hooks start a fresh interpreter per tool call, so modules only some code
+# paths need (pathlib, the log writer...) are imported where used.
 
 
 class BaseHook(ABC):
@@ -19,16 +23,67 @@ class BaseHook(ABC):
         self.hook_name = hook_name
         self.input_data: Dict[str, Any] = {}
         self.exit_code = 0
+        self.stdout: TextIO = sys.stdout
+        self.stderr: TextIO = sys.stderr
+        # Set by hosts (e.g. the hook daemon) that keep the instance alive.
+        self.long_lived = False
+        # Per-invocation timings; None unless CLAUDE_HOOKS_METRICS is set.
+        self.metrics: Optional[Dict[str, Any]] = None
 
     def run(self):
         """Main entry point - handles common logic."""
+        startup = process_startup() if get_metrics_settings()['enabled'] else None
+        sys.exit(self.invoke(sys.stdin, startup=startup))
+
+    def invoke(self, stdin: TextIO, stdout: Optional[TextIO] = None,
+               stderr: Optional[TextIO] = None,
+               startup: Optional[Dict[str, float]] = None) -> int:
+        """Run the hook against a JSON payload and return its exit code."""
+        self.input_data = {}
+        self.exit_code = 0
+        self.stdout = stdout or sys.stdout
+        self.stderr = stderr or sys.stderr
+        settings = get_metrics_settings()
+        self.metrics = {} if settings['enabled'] else None
+        if self.metrics is None:
+            try:
+                self.input_data = json.load(stdin)
+                self.exit_code = self.execute()
+            except Exception as e:
+                self.handle_error(e)
+            return self.exit_code
+
+        metrics = self.metrics
+        metrics.update(hook=self.hook_name, host='daemon' if self.long_lived else 'process')
+        metrics.update(startup or {})
+        start = time.perf_counter()
         try:
-            self.input_data = json.load(sys.stdin)
+            raw = stdin.read()
+            metrics['payload_size'] = len(raw)
+            self.input_data = json.loads(raw)
+            metrics['decode_ms'] = _ms_since(start)
+            execute_start = time.perf_counter()
             self.exit_code = self.execute()
+            metrics['execute_ms'] = _ms_since(execute_start)
         except Exception as e:
             self.handle_error(e)
-        finally:
-            sys.exit(self.exit_code)
+            metrics['error'] = type(e).__name__
+
+        output_start = time.perf_counter()
+        for stream in (self.stdout, self.stderr):
+            try:
+                stream.flush()
+            except Exception:
+                pass
+        metrics['output_ms'] = _ms_since(output_start)
+        metrics['total_ms'] = _ms_since(start)
+        metrics['exit'] = self.exit_code
+        if isinstance(self.input_data, dict):
+            for key, field in (('hook_event_name', 'event'), ('tool_name', 'tool')):
+                if self.input_data.get(key):
+                    metrics[field] = self.input_data[key]
+        self.write_log(settings['file'], metrics)
+        return self.exit_code
 
     @abstractmethod
     def execute(self) -> int:
@@ -40,18 +95,29 @@ class BaseHook(ABC):
         self.log_error(f"ERROR: {type(error).__name__}: {str(error)}")
         self.exit_code = 0
 
+    def claude_dir(self) -> str:
+        """Return the project's .claude directory used for hook state."""
+        return os.path.join(os.environ.get('CLAUDE_PROJECT_DIR', os.getcwd()), '.claude')
+
     def log_error(self, message: str):
-        """Log message to hook log file."""
+        """Log message to the hook log file."""
+        self.write_log('hooks.jsonl', {'hook': self.hook_name, 'message': message})
+
+    def write_log(self, name: str, record: Dict[str, Any]):
+        """Append a record to a JSONL log in the .claude directory."""
         try:
-            log_dir = Path(os.environ.get('CLAUDE_PROJECT_DIR', os.getcwd())) / '.claude'
-            log_dir.mkdir(exist_ok=True)
-            log_file = log_dir / 'hooks.log'
-            with open(log_file, 'a') as f:
-                timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-                f.write(f"[{timestamp}] [{self.hook_name}] {message}\n")
+            from hook_log import get_log
+
+            path = os.path.join(self.claude_dir(), name)
+            get_log(path, buffered=self.long_lived, **get_log_settings()).write(record)
         except Exception:
             pass
 
+    def time_step(self, name: str, start: float):
+        """Record how long a named sub-step took, when metrics are enabled."""
+        if self.metrics is not None:
+            self.metrics.setdefault('steps', {})[name] = _ms_since(start)
+
     def get_file_path(self) -> Optional[str]:
         """Extract file_path from tool_input."""
         return self.input_data.get('tool_input', {}).get('file_path', '')
@@ -70,6 +136,27 @@ class BaseHook(ABC):
             return ' '.join(edit.get('new_string', '') for edit in edits)
         return ''
 
+    def get_content_parts(self) -> List[Tuple[Optional[int], str]]:
+        """Extract content as (edit index, text) parts.
+
+        MultiEdit edits are returned one by one with their index instead of
+        being joined; edits repeating an earlier new_string are skipped.
+        Write/Edit content is a single part with index None.
+        """
+        tool_input = self.input_data.get('tool_input', {})
+        content = tool_input.get('content', '') or tool_input.get('new_string', '')
+        if content:
+            return [(None, content)]
+
+        parts = []
+        seen = set()
+        for index, edit in enumerate(tool_input.get('edits', [])):
+            new_string = edit.get('new_string', '')
+            if new_string and new_string not in seen:
+                seen.add(new_string)
+                parts.append((index, new_string))
+        return parts
+
     def get_command(self) -> Optional[str]:
         """Extract command from tool_input."""
         return self.input_data.get('tool_input', {}).get('command', '')
@@ -77,3 +164,32 @@ class BaseHook(ABC):
     def get_prompt(self) -> Optional[str]:
         """Extract prompt from input."""
         return self.input_data.get('prompt', '')
+
+
+def _ms_since(start: float) -> float:
+    return round((time.perf_counter() - start) * 1000, 3)
+
+
+def process_startup() -> Dict[str, float]:
+    """Measure interpreter start-up and imports up to this point.
+
+    startup_ms is wall time since the process started (Linux only, with
+    clock-tick resolution); startup_cpu_ms is the CPU time used so far.
+    """
+    startup: Dict[str, float] = {}
+    try:
+        import resource
+        usage = resource.getrusage(resource.RUSAGE_SELF)
+        startup['startup_cpu_ms'] = round((usage.ru_utime + usage.ru_stime) * 1000, 3)
+    except ImportError:
+        pass
+    try:
+        with open('/proc/self/stat') as f:
+            # Field 22 (starttime) follows the parenthesised command name.
+            started = int(f.read().rsplit(')', 1)[1].split()[19])
+        with open('/proc/uptime') as f:
+            uptime = float(f.read().split()[0])
+        startup['startup_ms'] = round((uptime - started / os.sysconf('SC_CLK_TCK')) * 1000, 3)
+    except (OSError, ValueError, IndexError):
+        pass
+    return startup
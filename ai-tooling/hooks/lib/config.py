@@ -1,10 +1,21 @@
 #!/usr/bin/env python3
-"""Configuration loader for hooks (no external dependencies)."""
+"""
+Configuration loader for hooks (no external dependencies).
+
+The built-in defaults below can be overridden per user in
+~/.claude/hooks-config.json and per project in .claude/hooks-config.json,
+using the section names of DEFAULT_SECTIONS; see layered_config for the
+merge rules and the compiled cache. A project file can only tighten the
+sections in PROJECT_RESTRICTIONS, since the project being edited may not be
+trusted to relax its own checks or choose the commands hooks run.
+"""
+import os
 from typing import Dict, Any, List, Tuple
 
+from layered_config import load, source_key, source_paths
 
-def get_protected_patterns() -> Tuple[List[str], List[str]]:
-    """Get protected file patterns."""
+
+def _default_protected() -> Dict[str, Any]:
     blocked = [
         'package-lock.json',
         'yarn.lock',
@@ -18,6 +29,7 @@ def get_protected_patterns() -> Tuple[List[str], List[str]]:
         '**/secrets/*',
         '**/credentials/*',
         '.git/*',
+        '.claude/hooks-config.json',
     ]
 
     warned = [
@@ -27,11 +39,25 @@ def get_protected_patterns() -> Tuple[List[str], List[str]]:
         '**/production/*',
     ]
 
-    return blocked, warned
+    return {'blocked': blocked, 'warned': warned}
 
 
-def get_secret_patterns() -> Tuple[List[Tuple[str, str]], set]:
-    """Get secret detection patterns."""
+def get_dispatch_chains() -> Tuple[Dict[str, Tuple[str, List[str]]], Dict[str, List[str]]]:
+    """Get dispatcher steps and the chains that run them, cheapest check first."""
+    steps = {
+        'protect': ('protect-files', []),
+        'secrets': ('security-check', ['secrets']),
+        'reminders': ('security-check', ['reminders']),
+    }
+
+    chains = {
+        'pre-edit': ['protect', 'secrets', 'reminders'],
+    }
+
+    return steps, chains
+
+
+def _default_secrets() -> Dict[str, Any]:
     patterns = [
         (r'(?i)(api[_-]?key|apikey)\s*[:=]\s*["\']?[a-zA-Z0-9_-]{20,}', 'API key'),
         (r'ghp_[a-zA-Z0-9]{36}', 'GitHub Personal Access Token'),
@@ -45,49 +71,201 @@ def get_secret_patterns() -> Tuple[List[Tuple[str, str]], set]:
         (r'(?i)aws[_-]?access[_-]?key[_-]?id\s*[:=]\s*[A-Z0-9]{20}', 'AWS Access Key'),
         (r'(?i)aws[_-]?secret[_-]?access[_-]?key\s*[:=]\s*[a-zA-Z0-9/+=]{40}', 'AWS Secret Key'),
         (r'xox[baprs]-[0-9]{10,13}-[0-9]{10,13}-[a-zA-Z0-9]{24,}', 'Slack Token'),
-        (r'AIza[0-9A-Za-z_-]{35}', 'Google API Key'),
+        (r'AIza[0-9A-Za-z_-]{35}', 'Google/Firebase API Key'),
         (r'ya29\.[0-9A-Za-z_-]+', 'Google OAuth Access Token'),
-        (r'[0-9]+-[0-9A-Za-z_-]{32}\.apps\.googleusercontent\.com', 'Google OAuth2 ID'),
-        (r'AIza[0-9A-Za-z\\-_]{35}', 'Firebase API Key'),
-        (r'eyJ[a-zA-Z0-9_-]*\.eyJ[a-zA-Z0-9_-]*\.[a-zA-Z0-9_-]*', 'JWT Token'),
-        (r'(?i)(postgres|mysql|mongodb)://[^:]+:[^@]+@', 'Database URL with credentials'),
-        (r'(?i)jdbc:[^:]+://[^:]+:[^@]+@', 'JDBC URL with credentials'),
-        (r'(?i)redis://:[^@]+@', 'Redis URL with password'),
+        # Runs start only where the previous character cannot extend them, so
+        # a search does not rescan a long run from every position inside it
+        # (scripts/regex-audit.py checks the patterns for this).
+        (r'(?<![0-9])[0-9]+-[0-9A-Za-z_-]{32}\.apps\.googleusercontent\.com', 'Google OAuth2 ID'),
+        (r'(?<![a-zA-Z0-9_-])eyJ[a-zA-Z0-9_-]*\.eyJ[a-zA-Z0-9_-]*\.[a-zA-Z0-9_-]*', 'JWT Token'),
+        # A password cannot hold a raw '/' (it would be %2F), so the match ends
+        # at the URL's path instead of retrying across the rest of the line.
+        (r'(?i)(postgres|mysql|mongodb)://[^:@/\s]+:[^@/\s]+@', 'Database URL with credentials'),
+        (r'(?i)jdbc:[^:/\s]+://[^:@/\s]+:[^@/\s]+@', 'JDBC URL with credentials'),
+        (r'(?i)redis://:[^@/\s]+@', 'Redis URL with password'),
     ]
 
-    skip_files = {
+    skip_files = [
         '.env.example',
         '.env.template',
         '.env.sample',
         'package-lock.json',
         'yarn.lock',
         'pnpm-lock.yaml',
+    ]
+
+    return {'patterns': patterns, 'skip_files': skip_files}
+
+
+def _default_entropy() -> Dict[str, Any]:
+    return {
+        # 'warn' prints a reminder, 'block' fails the edit like a pattern
+        # match and 'off' disables the check.
+        'action': 'warn',
+        # Candidate tokens are whole runs of base64/hex characters this long.
+        'min_length': 32,
+        'max_length': 64,
+        # Bits per character; random hex approaches 4, random base64 6.
+        'hex_threshold': 3.0,
+        'base64_threshold': 4.2,
+        # A token is ignored when one of these matches the line it is on.
+        'allowlist': [
+            r'(?i)\b(?:sha1|sha256|sha384|sha512|checksum|digest|integrity|hash|commit|revision)\b',
+            r'[0-9a-fA-F]{8}-(?:[0-9a-fA-F]{4}-){3}[0-9a-fA-F]{12}',
+            r'(?i)\bexample\b|placeholder|dummy',
+        ],
     }
 
-    return patterns, skip_files
+
+def _default_scan() -> Dict[str, Any]:
+    return {
+        # Characters beyond this are not scanned at all.
+        'max_scan_size': 32 * 1024 * 1024,
+        # 'block' or 'warn' when content is longer than max_scan_size.
+        'oversize': 'block',
+        # Contents at least this long have their verdict cached by hash.
+        'cache_min_size': 4096,
+        'cache_max_entries': 1024,
+    }
 
 
-def get_formatters() -> Dict[str, Dict[str, Any]]:
-    """Get formatter configuration."""
+def _default_formatters() -> Dict[str, Dict[str, Any]]:
     return {
-        '.js': {'command': ['npx', 'prettier', '--write'], 'timeout': 10},
-        '.jsx': {'command': ['npx', 'prettier', '--write'], 'timeout': 10},
-        '.ts': {'command': ['npx', 'prettier', '--write'], 'timeout': 10},
-        '.tsx': {'command': ['npx', 'prettier', '--write'], 'timeout': 10},
-        '.json': {'command': ['npx', 'prettier', '--write'], 'timeout': 10},
-        '.css': {'command': ['npx', 'prettier', '--write'], 'timeout': 10},
-        '.scss': {'command': ['npx', 'prettier', '--write'], 'timeout': 10},
-        '.md': {'command': ['npx', 'prettier', '--write'], 'timeout': 10},
-        '.yaml': {'command': ['npx', 'prettier', '--write'], 'timeout': 10},
-        '.yml': {'command': ['npx', 'prettier', '--write'], 'timeout': 10},
-        '.py': {'command': ['black', '--quiet'], 'timeout': 10},
+        '.js': {'command': ['npx', 'prettier', '--write'], 'timeout': 10, 'worker': 'prettier'},
+        '.jsx': {'command': ['npx', 'prettier', '--write'], 'timeout': 10, 'worker': 'prettier'},
+        '.ts': {'command': ['npx', 'prettier', '--write'], 'timeout': 10, 'worker': 'prettier'},
+        '.tsx': {'command': ['npx', 'prettier', '--write'], 'timeout': 10, 'worker': 'prettier'},
+        '.json': {'command': ['npx', 'prettier', '--write'], 'timeout': 10, 'worker': 'prettier'},
+        '.css': {'command': ['npx', 'prettier', '--write'], 'timeout': 10, 'worker': 'prettier'},
+        '.scss': {'command': ['npx', 'prettier', '--write'], 'timeout': 10, 'worker': 'prettier'},
+        '.md': {'command': ['npx', 'prettier', '--write'], 'timeout': 10, 'worker': 'prettier'},
+        '.yaml': {'command': ['npx', 'prettier', '--write'], 'timeout': 10, 'worker': 'prettier'},
+        '.yml': {'command': ['npx', 'prettier', '--write'], 'timeout': 10, 'worker': 'prettier'},
+        '.py': {'command': ['black', '--quiet'], 'timeout': 10, 'worker': 'black'},
         '.go': {'command': ['gofmt', '-w'], 'timeout': 10},
         '.rs': {'command': ['rustfmt'], 'timeout': 10},
     }
 
 
-def get_agent_hints() -> Tuple[Dict[str, str], List[Tuple[str, str]]]:
-    """Get agent hints and dangerous patterns."""
+def _default_format() -> Dict[str, Any]:
+    return {
+        # 'sync' formats during PostToolUse; 'async' only queues the file for a
+        # background worker and the Stop event flushes the queue.
+        'mode': 'sync',
+        # Seconds a queued file must stay unedited before it is formatted.
+        'debounce': 0.5,
+        'queue_workers': 4,
+        # Seconds the background worker waits on an empty queue before exiting.
+        'queue_idle_exit': 30,
+        # Upper bound on how long the Stop flush waits for formatting.
+        'flush_timeout': 25,
+        # Seconds before an unused warm formatter worker is shut down.
+        'worker_idle_timeout': 300,
+        # Files already formatted under the same configuration are skipped.
+        'cache_max_entries': 2048,
+        # Project files whose changes invalidate the formatted-state cache.
+        'config_files': [
+            '.prettierrc',
+            '.prettierrc.json',
+            '.prettierrc.yaml',
+            '.prettierrc.yml',
+            '.prettierrc.js',
+            '.prettierrc.cjs',
+            'prettier.config.js',
+            '.prettierignore',
+            '.editorconfig',
+            'package.json',
+            'pyproject.toml',
+            'rustfmt.toml',
+            '.rustfmt.toml',
+        ],
+    }
+
+
+def _default_log() -> Dict[str, Any]:
+    return {
+        'max_bytes': 10 * 1024 * 1024,
+        'backups': 5,
+        'compress': True,
+    }
+
+
+def _default_metrics() -> Dict[str, Any]:
+    return {
+        'file': 'hook-metrics.jsonl',
+        # Fraction of a hook's configured timeout reported as "near timeout".
+        'near_timeout': 0.8,
+    }
+
+
+def _default_environment() -> Dict[str, Any]:
+    return {
+        # Probe every command in the Brewfile at SessionStart (opt-in).
+        'toolchain': False,
+        'workers': 16,
+        # Seconds each command gets to answer its version query.
+        'timeout': 5,
+        # Formulae whose command differs from the formula name; '' means the
+        # formula installs no command (libraries, shell plugins).
+        'binaries': {
+            'awscli': 'aws',
+            'coreutils': 'gls',
+            'git-delta': 'delta',
+            'httpie': 'http',
+            'make': 'gmake',
+            'neovim': 'nvim',
+            'python': 'python3',
+            'ripgrep': 'rg',
+            'soft-serve': 'soft',
+            'sqlite': 'sqlite3',
+            'tlrc': 'tldr',
+            'antidote': '',
+            'nvm': '',
+            'snappy': '',
+        },
+        # Version queries for commands that do not understand --version.
+        'version_args': {
+            'go': ['version'],
+            'mas': ['version'],
+            'wrk': ['-v'],
+        },
+        # Commands whose version may be queried; any other Brewfile command
+        # is only looked up on PATH, since the Brewfile comes from the project.
+        'probe': [
+            'aws', 'bat', 'cmake', 'delta', 'fd', 'fzf', 'gh', 'git', 'gls', 'gmake',
+            'go', 'http', 'jq', 'mas', 'node', 'nvim', 'python3', 'rg', 'ruby',
+            'shellcheck', 'soft', 'sqlite3', 'tldr', 'wrk', 'yq',
+        ],
+    }
+
+
+def _default_notify() -> Dict[str, Any]:
+    return {
+        # Seconds to gather events before showing one merged notification.
+        'window': 1.5,
+        'title': 'Claude Code',
+        # 'auto' picks osascript, notify-send or powershell.exe, whichever exists.
+        'backend': 'auto',
+        # Minimum seconds between two notifications of the same urgency.
+        'min_interval': {'low': 30, 'normal': 5, 'critical': 0},
+        'events': {
+            'Stop': {
+                'message': 'Task completed',
+                'plural': '{count} tasks completed',
+                'sound': 'Ping',
+                'urgency': 'low',
+            },
+            'Notification': {
+                'message': 'Claude needs your input',
+                'plural': 'Claude needs your input ({count} requests)',
+                'sound': 'Glass',
+                'urgency': 'normal',
+            },
+        },
+    }
+
+
+def _default_prompts() -> Dict[str, Any]:
     hints = {
         r'\b(review|check|look at)\b.*\b(code|changes|pr|pull request)\b':
             'Tip: Consider using the reviewer agent for thorough code reviews.',
@@ -105,17 +283,16 @@ def get_agent_hints() -> Tuple[Dict[str, str], List[Tuple[str, str]]]:
 
     dangerous = [
         (r'\brm\s+-rf\s+[/~]', '⚠️ Warning: Recursive delete from root/home detected'),
-        (r'\bgit\s+push\s+.*--force', '⚠️ Warning: Force push detected - this rewrites history'),
+        (r'\bgit\s+push\b.{0,256}?--force', '⚠️ Warning: Force push detected - this rewrites history'),
         (r'\bgit\s+reset\s+--hard', '⚠️ Warning: Hard reset will lose uncommitted changes'),
         (r'\bdrop\s+database\b', '⚠️ Warning: DROP DATABASE command detected'),
         (r'\btruncate\s+table\b', '⚠️ Warning: TRUNCATE TABLE will delete all data'),
     ]
 
-    return hints, dangerous
+    return {'hints': hints, 'dangerous': dangerous}
 
 
-def get_security_reminders() -> List[Dict[str, Any]]:
-    """Get security reminder rules for risky patterns."""
+def _default_reminders() -> List[Dict[str, Any]]:
     return [
         {
             'rule_name': 'github_actions_workflow',
@@ -187,3 +364,180 @@ def get_security_reminders() -> List[Dict[str, Any]]:
             ),
         },
     ]
+
+
+DEFAULT_SECTIONS = {
+    'protected': _default_protected,
+    'secrets': _default_secrets,
+    'entropy': _default_entropy,
+    'scan': _default_scan,
+    'formatters': _default_formatters,
+    'format': _default_format,
+    'log': _default_log,
+    'metrics': _default_metrics,
+    'environment': _default_environment,
+    'notify': _default_notify,
+    'prompts': _default_prompts,
+    'reminders': _default_reminders,
+}
+
+# What a project's .claude/hooks-config.json may change in these sections
+# (see layered_config.check_restrictions); anything else it sets in them
+# makes the file ignored. Sections naming commands to run are user-only.
+PROJECT_RESTRICTIONS = {
+    'protected': {'blocked': 'append', 'warned': 'append'},
+    'secrets': {'patterns': 'append'},
+    'entropy': {
+        'action': ('off', 'warn', 'block'),
+        'min_length': 'lower',
+        'hex_threshold': 'lower',
+        'base64_threshold': 'lower',
+    },
+    'scan': {'max_scan_size': 'lower', 'oversize': ('warn', 'block')},
+    'reminders': 'append',
+    'formatters': None,
+    'environment': None,
+}
+
+SCHEMA = {
+    'protected': {'blocked': ['str'], 'warned': ['str']},
+    'secrets': {'patterns': [('regex', 'str')], 'skip_files': ['str']},
+    'entropy': {
+        'action': 'str',
+        'min_length': 'int',
+        'max_length': 'int',
+        'hex_threshold': 'number',
+        'base64_threshold': 'number',
+        'allowlist': ['regex'],
+    },
+    'scan': {
+        'max_scan_size': 'int',
+        'oversize': 'str',
+        'cache_min_size': 'int',
+        'cache_max_entries': 'int',
+    },
+    'formatters': {'*': {'command': ['str'], 'timeout': 'number', 'worker?': 'str'}},
+    'format': {
+        'mode': 'str',
+        'debounce': 'number',
+        'queue_workers': 'int',
+        'queue_idle_exit': 'number',
+        'flush_timeout': 'number',
+        'worker_idle_timeout': 'number',
+        'cache_max_entries': 'int',
+        'config_files': ['str'],
+    },
+    'log': {'max_bytes': 'int', 'backups': 'int', 'compress': 'bool'},
+    'metrics': {'file': 'str', 'near_timeout': 'number'},
+    'environment': {
+        'toolchain': 'bool',
+        'workers': 'int',
+        'timeout': 'number',
+        'binaries': {'*': 'str'},
+        'version_args': {'*': ['str']},
+        'probe': ['str'],
+    },
+    'notify': {
+        'window': 'number',
+        'title': 'str',
+        'backend': 'str',
+        'min_interval': {'*': 'number'},
+        'events': {'*': {'message': 'str', 'plural': 'str', 'sound': 'str', 'urgency': 'str'}},
+    },
+    'prompts': {
+        'hints': {'*': 'str', 'keys': 'regex'},
+        'dangerous': [('regex', 'str')],
+    },
+    'reminders': [{
+        'rule_name': 'str',
+        'reminder': 'str',
+        'substrings?': ['str'],
+        'path_substrings?': ['str'],
+        'path_suffixes?': ['str'],
+    }],
+}
+
+
+def defaults() -> Dict[str, Any]:
+    """Get the built-in configuration, before any hooks-config.json overrides."""
+    return {name: build() for name, build in DEFAULT_SECTIONS.items()}
+
+
+def get_config() -> Dict[str, Any]:
+    """Get the configuration merged from the defaults and hooks-config.json files."""
+    return load(DEFAULT_SECTIONS, SCHEMA, os.path.abspath(__file__), state_dir(), PROJECT_RESTRICTIONS)
+
+
+def get_config_key() -> Tuple:
+    """Get a key that changes whenever a configuration source is edited."""
+    return source_key(source_paths(), os.path.abspath(__file__))
+
+
+def get_protected_patterns() -> Tuple[List[str], List[str]]:
+    """Get protected file patterns."""
+    section = get_config()['protected']
+    return section['blocked'], section['warned']
+
+
+def get_secret_patterns() -> Tuple[List[Tuple[str, str]], set]:
+    """Get secret detection patterns."""
+    section = get_config()['secrets']
+    return section['patterns'], set(section['skip_files'])
+
+
+def get_entropy_settings() -> Dict[str, Any]:
+    """Get settings for high-entropy token detection."""
+    return get_config()['entropy']
+
+
+def get_scan_settings() -> Dict[str, Any]:
+    """Get limits for scanning large contents for secrets."""
+    return get_config()['scan']
+
+
+def get_formatters() -> Dict[str, Dict[str, Any]]:
+    """Get formatter configuration."""
+    return get_config()['formatters']
+
+
+def get_format_settings() -> Dict[str, Any]:
+    """Get settings for how format-on-edit runs formatters."""
+    return get_config()['format']
+
+
+def get_log_settings() -> Dict[str, Any]:
+    """Get rotation settings for the hook JSONL logs in .claude/."""
+    return get_config()['log']
+
+
+def state_dir() -> str:
+    """Get the directory for hook state a project must not be able to write."""
+    default = os.path.join(os.path.expanduser('~'), '.claude', 'hooks-state')
+    return os.environ.get('CLAUDE_HOOKS_STATE', default)
+
+
+def get_metrics_settings() -> Dict[str, Any]:
+    """Get latency instrumentation settings (opt-in via CLAUDE_HOOKS_METRICS=1)."""
+    enabled = os.environ.get('CLAUDE_HOOKS_METRICS', '') not in ('', '0')
+    return dict(get_config()['metrics'], enabled=enabled)
+
+
+def get_environment_settings() -> Dict[str, Any]:
+    """Get settings for the SessionStart environment check."""
+    return get_config()['environment']
+
+
+def get_notify_settings() -> Dict[str, Any]:
+    """Get settings for coalesced desktop notifications."""
+    return get_config()['notify']
+
+
+def get_agent_hints() -> Tuple[Dict[str, str], List[Tuple[str, str]]]:
+    """Get agent hints and dangerous patterns."""
+    section = get_config()['prompts']
+    return section['hints'], section['dangerous']
+
+
+def get_security_reminders() -> List[Dict[str, Any]]:
+    """Get security reminder rules for risky patterns."""
+    return get_config()['reminders']
@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""
+Spool-directory queue for background formatting.
+
+Each queued file is one entry in .claude/format-queue/ named by a hash of its
+path, so re-queuing a file deduplicates and refreshes the entry's mtime
+(debouncing bursts of edits). Entries are claimed by renaming them while
+holding a per-file lock, which lets a flush wait for in-flight formats. The
+lock file is removed by its holder once the entry is done, so an idle queue
+leaves an empty directory.
+"""
+import fcntl
+import hashlib
+import os
+import subprocess
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, List, Optional
+
+WORKING_SUFFIX = '.working'
+LOCK_SUFFIX = '.lock'
+
+
+class FormatQueue:
+    """Queue of files waiting to be formatted, shared by hooks and the worker."""
+
+    def __init__(self, state_dir: str):
+        self.dir = Path(state_dir) / 'format-queue'
+        self.worker_lock_path = Path(state_dir) / 'format-queue.lock'
+
+    def _entry_name(self, file_path: str) -> str:
+        return hashlib.blake2b(file_path.encode('utf-8'), digest_size=12).hexdigest()
+
+    def enqueue(self, file_path: str):
+        """Queue a file; re-queuing an already queued file only refreshes it."""
+        file_path = os.path.abspath(file_path)
+        self.dir.mkdir(parents=True, exist_ok=True)
+        entry = self.dir / self._entry_name(file_path)
+        tmp_path = self.dir / f'{entry.name}.{os.getpid()}.tmp'
+        tmp_path.write_text(file_path)
+        os.replace(tmp_path, entry)
+
+    def pending(self) -> List[Path]:
+        """Return queued entries that nobody has claimed yet."""
+        try:
+            names = os.listdir(self.dir)
+        except OSError:
+            return []
+        return [self.dir / name for name in names if '.' not in name]
+
+    def _lock(self, name: str, blocking: bool = True) -> Optional[int]:
+        path = self.dir / f'{name}{LOCK_SUFFIX}'
+        while True:
+            fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX if blocking else fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                os.close(fd)
+                return None
+            # The previous holder may have unlinked the file after we opened
+            # it; a lock on that orphan excludes no one, so lock the new file.
+            try:
+                if os.fstat(fd).st_ino == os.stat(path).st_ino:
+                    return fd
+            except FileNotFoundError:
+                pass
+            os.close(fd)
+
+    def _unlock(self, name: str, fd: int):
+        """Remove the lock file while still holding it, then release it."""
+        try:
+            os.unlink(self.dir / f'{name}{LOCK_SUFFIX}')
+        except FileNotFoundError:
+            pass
+        os.close(fd)
+
+    def process(self, entry: Path, format_file: Callable[[str], None]) -> bool:
+        """Claim and format one entry under its per-file lock."""
+        lock_fd = self._lock(entry.name, blocking=False)
+        if lock_fd is None:
+            return False
+        claimed = self.dir / f'{entry.name}{WORKING_SUFFIX}'
+        try:
+            try:
+                os.rename(entry, claimed)
+            except FileNotFoundError:
+                return False
+            file_path = claimed.read_text()
+            try:
+                format_file(file_path)
+            finally:
+                claimed.unlink()
+            return True
+        finally:
+            self._unlock(entry.name, lock_fd)
+
+    def _wait_for_claimed(self, deadline: float):
+        """Block until formats claimed by other processes have finished."""
+        try:
+            names = os.listdir(self.dir)
+        except OSError:
+            return
+        for name in names:
+            if not name.endswith(WORKING_SUFFIX):
+                continue
+            entry_name = name[:-len(WORKING_SUFFIX)]
+            while time.monotonic() < deadline:
+                fd = self._lock(entry_name, blocking=False)
+                if fd is not None:
+                    self._unlock(entry_name, fd)
+                    break
+                time.sleep(0.05)
+
+    def flush(self, format_file: Callable[[str], None], workers: int, timeout: float):
+        """Format everything queued now, ignoring the debounce, and wait for in-flight work."""
+        deadline = time.monotonic() + timeout
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            while time.monotonic() < deadline:
+                entries = self.pending()
+                list(pool.map(lambda entry: self.process(entry, format_file), entries))
+                self._wait_for_claimed(deadline)
+                if not self.pending():
+                    return
+
+    def ensure_worker(self, command: List[str]):
+        """Start the background worker unless one already holds the queue lock."""
+        self.worker_lock_path.parent.mkdir(parents=True, exist_ok=True)
+        fd = os.open(self.worker_lock_path, os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            return
+        finally:
+            os.close(fd)
+
+        subprocess.Popen(
+            command,
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            start_new_session=True,
+        )
+
+    def run_worker(self, format_file: Callable[[str], None], workers: int,
+                   debounce: float, idle_exit: float):
+        """Format queued files in the background until the queue stays idle."""
+        self.worker_lock_path.parent.mkdir(parents=True, exist_ok=True)
+        fd = os.open(self.worker_lock_path, os.O_RDWR | os.O_CREAT, 0o600)
+
+        try:
+            while True:
+                try:
+                    fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except OSError:
+                    return
+                self._serve(format_file, workers, debounce, idle_exit)
+                fcntl.flock(fd, fcntl.LOCK_UN)
+                # An entry queued while we were exiting saw the lock held and
+                # started no worker; pick it up rather than strand it.
+                if not self.pending():
+                    return
+        finally:
+            os.close(fd)
+
+    def _serve(self, format_file: Callable[[str], None], workers: int,
+               debounce: float, idle_exit: float):
+        in_flight = set()
+        idle_since = time.monotonic()
+
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            while True:
+                now = time.time()
+                entries = self.pending()
+                for entry in entries:
+                    if entry.name in in_flight:
+                        continue
+                    try:
+                        if now - entry.stat().st_mtime < debounce:
+                            continue
+                    except OSError:
+                        continue
+                    in_flight.add(entry.name)
+                    future = pool.submit(self.process, entry, format_file)
+                    future.add_done_callback(lambda _, name=entry.name: in_flight.discard(name))
+
+                if entries or in_flight:
+                    idle_since = time.monotonic()
+                elif time.monotonic() - idle_since > idle_exit:
+                    return
+                time.sleep(min(max(debounce / 2, 0.05), 0.25))
@@ -0,0 +1,240 @@
+#!/usr/bin/env python3
+"""
+Warm formatter workers for long-lived hook hosts (e.g. the hook daemon).
+
+Idle workers are kept per toolchain and project: Prettier runs as a
+persistent Node process (scripts/prettier-worker.js) and Black runs
+in-process through its Python API. A format checks a worker out for its
+duration, so formats in other threads run in parallel on other workers.
+Workers idle for longer than the configured timeout are shut down. Any failure returns False so the caller can use the subprocess path;
+a toolchain that cannot run at all (no node, no prettier, no black) is not
+tried again for that project while the pool lives.
+"""
+import json
+import os
+import select
+import shutil
+import subprocess
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple
+
+SCRIPTS_DIR = Path(__file__).resolve().parent.parent / 'scripts'
+
+
+class WorkerError(Exception):
+    """Raised when a worker cannot serve a request."""
+
+
+class WorkerUnavailable(WorkerError):
+    """Raised when a worker's toolchain is missing, so retrying cannot help."""
+
+
+class PrettierWorker:
+    """Persistent Node process that formats files with the project's Prettier."""
+
+    def __init__(self, project_dir: str):
+        node = shutil.which('node')
+        if not node:
+            raise WorkerUnavailable("node not found")
+        self.proc = subprocess.Popen(
+            [node, str(SCRIPTS_DIR / 'prettier-worker.js')],
+            cwd=project_dir,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+        )
+        self._buffer = b''
+
+    def _read_line(self, timeout: float) -> bytes:
+        deadline = time.monotonic() + timeout
+        fd = self.proc.stdout.fileno()
+        while b'\n' not in self._buffer:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise WorkerError("prettier worker timed out")
+            ready, _, _ = select.select([fd], [], [], remaining)
+            if not ready:
+                continue
+            chunk = os.read(fd, 65536)
+            if not chunk:
+                raise WorkerError("prettier worker exited")
+            self._buffer += chunk
+        line, _, self._buffer = self._buffer.partition(b'\n')
+        return line
+
+    def format(self, file_path: str, timeout: float):
+        try:
+            self.proc.stdin.write(json.dumps({'file': file_path}).encode('utf-8') + b'\n')
+            self.proc.stdin.flush()
+        except OSError as e:
+            # A worker without Prettier exits right after saying so.
+            error = WorkerError(f"prettier worker unavailable: {e}")
+            timeout = 0.5
+        else:
+            error = None
+
+        try:
+            reply = json.loads(self._read_line(timeout))
+        except WorkerError:
+            if error:
+                raise error
+            raise
+        except ValueError:
+            raise WorkerError("prettier worker sent an invalid reply")
+        if reply.get('fatal'):
+            raise WorkerUnavailable(reply['fatal'])
+        if error:
+            raise error
+        if not reply.get('ok'):
+            raise RuntimeError(reply.get('error', 'prettier failed'))
+
+    def close(self):
+        try:
+            self.proc.stdin.close()
+            self.proc.wait(timeout=2)
+        except Exception:
+            self.proc.kill()
+
+
+class BlackWorker:
+    """Black running in this process through its Python API."""
+
+    def __init__(self, project_dir: str):
+        try:
+            import black
+        except ImportError:
+            raise WorkerUnavailable("black is not importable")
+        self.black = black
+        self.mode = self._load_mode(project_dir)
+
+    def _load_mode(self, project_dir: str):
+        """Build a black.Mode from [tool.black] in the project's pyproject.toml."""
+        black = self.black
+        pyproject = Path(project_dir) / 'pyproject.toml'
+        if not pyproject.is_file():
+            return black.Mode()
+
+        config = black.parse_pyproject_toml(str(pyproject))
+        target_versions = {
+            black.TargetVersion[version.upper()]
+            for version in config.get('target_version', [])
+        }
+        return black.Mode(
+            target_versions=target_versions,
+            line_length=config.get('line_length', black.DEFAULT_LINE_LENGTH),
+            string_normalization=not config.get('skip_string_normalization', False),
+            magic_trailing_comma=not config.get('skip_magic_trailing_comma', False),
+            preview=config.get('preview', False),
+        )
+
+    def format(self, file_path: str, timeout: float):
+        self.black.format_file_in_place(
+            Path(file_path),
+            fast=False,
+            mode=self.mode,
+            write_back=self.black.WriteBack.YES,
+        )
+
+    def close(self):
+        pass
+
+
+WORKER_TYPES = {
+    'prettier': PrettierWorker,
+    'black': BlackWorker,
+}
+
+
+class FormatterPool:
+    """Keep warm workers per (toolchain, project) and reap idle ones."""
+
+    def __init__(self, idle_timeout: float = 300):
+        self.idle_timeout = idle_timeout
+        # Idle workers with the time each was last used; the lock only guards
+        # these lists, never a format.
+        self.workers: Dict[Tuple[str, str], List[Tuple[object, float]]] = {}
+        # (toolchain, project) pairs whose toolchain is missing.
+        self.unavailable: Set[Tuple[str, str]] = set()
+        self.lock = threading.Lock()
+        self._reaper: Optional[threading.Thread] = None
+
+    def _start_reaper(self):
+        if self._reaper is None:
+            self._reaper = threading.Thread(target=self._reap_loop, daemon=True)
+            self._reaper.start()
+
+    def _reap_loop(self):
+        while True:
+            time.sleep(max(self.idle_timeout / 4, 1))
+            self.reap_idle()
+
+    def reap_idle(self):
+        """Shut down workers that have not been used within the idle timeout."""
+        now = time.monotonic()
+        stale = []
+        with self.lock:
+            for key, idle in list(self.workers.items()):
+                fresh = [entry for entry in idle if now - entry[1] <= self.idle_timeout]
+                stale.extend(entry[0] for entry in idle if now - entry[1] > self.idle_timeout)
+                if fresh:
+                    self.workers[key] = fresh
+                else:
+                    del self.workers[key]
+        for worker in stale:
+            worker.close()
+
+    def format(self, toolchain: str, file_path: str, project_dir: str, timeout: float) -> bool:
+        """Format a file with a warm worker; return False if the caller should fall back."""
+        worker_type = WORKER_TYPES.get(toolchain)
+        if worker_type is None:
+            return False
+
+        key = (toolchain, project_dir)
+        with self.lock:
+            if key in self.unavailable:
+                return False
+            self._start_reaper()
+            idle = self.workers.get(key)
+            worker = idle.pop()[0] if idle else None
+
+        if worker is None:
+            try:
+                worker = worker_type(project_dir)
+            except WorkerUnavailable:
+                with self.lock:
+                    self.unavailable.add(key)
+                return False
+            except Exception:
+                return False
+
+        try:
+            worker.format(file_path, timeout)
+        except (WorkerError, OSError) as e:
+            worker.close()
+            if isinstance(e, WorkerUnavailable):
+                with self.lock:
+                    self.unavailable.add(key)
+            return False
+        except Exception:
+            # The file failed to format but the worker itself is healthy.
+            self._check_in(key, worker)
+            raise
+        self._check_in(key, worker)
+        return True
+
+    def _check_in(self, key: Tuple[str, str], worker):
+        """Return a worker to the idle list after a format."""
+        with self.lock:
+            self.workers.setdefault(key, []).append((worker, time.monotonic()))
+
+_pool: Optional[FormatterPool] = None
+
+
+def get_pool(idle_timeout: float = 300) -> FormatterPool:
+    """Return the process-wide formatter pool."""
+    global _pool
+    if _pool is None:
+        _pool = FormatterPool(idle_timeout)
+    return _pool
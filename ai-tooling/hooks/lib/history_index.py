@@ -0,0 +1,282 @@
+#!/usr/bin/env python3
+"""
+Incremental SQLite index over the command history written by log-commands.
+
+Sources are .claude/command-history.jsonl, its rotated .gz segments and the
+legacy plain-text command-history.log. Each source records the inode and
+byte offset indexed so far, so an update only reads what was appended since.
+Command text and descriptions are indexed with FTS5 (trigram tokenizer when
+available, for substring matches) and timestamps with a B-tree index.
+"""
+import gzip
+import hashlib
+import json
+import os
+import re
+import sqlite3
+from datetime import datetime
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from hook_log import JsonlLog
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    id INTEGER PRIMARY KEY,
+    key BLOB NOT NULL UNIQUE,
+    ts TEXT NOT NULL,
+    epoch REAL NOT NULL,
+    command TEXT NOT NULL,
+    description TEXT,
+    session_id TEXT,
+    cwd TEXT
+);
+CREATE INDEX IF NOT EXISTS entries_epoch ON entries (epoch);
+CREATE TABLE IF NOT EXISTS sources (
+    path TEXT PRIMARY KEY,
+    inode INTEGER,
+    offset INTEGER NOT NULL
+);
+"""
+
+FTS_TRIGGER = """
+CREATE TRIGGER IF NOT EXISTS entries_fts_insert AFTER INSERT ON entries BEGIN
+    INSERT INTO entries_fts (rowid, command, description)
+    VALUES (new.id, new.command, new.description);
+END;
+"""
+
+# Segments are immutable once written; an offset of -1 marks them done.
+DONE = -1
+BATCH_SIZE = 5000
+TRIGRAM_MIN = 3
+
+LEGACY_ENTRY = re.compile(r'^\[(\d{4}-\d\d-\d\d \d\d:\d\d:\d\d)\] (.*)$')
+LEGACY_DESCRIPTION = '  Description: '
+
+
+def parse_time(value: str) -> float:
+    """Return the epoch for an ISO 8601 timestamp (naive means local time)."""
+    return datetime.fromisoformat(value).timestamp()
+
+
+def entry_key(ts: str, session_id: Optional[str], command: str) -> bytes:
+    """Identity of an entry, so re-reading a source never duplicates it."""
+    digest = hashlib.blake2b(digest_size=16)
+    for part in (ts, session_id or '', command):
+        digest.update(part.encode('utf-8', 'surrogatepass') + b'\0')
+    return digest.digest()
+
+
+class HistoryIndex:
+    """Search index for one project's command history."""
+
+    def __init__(self, claude_dir: str, db_path: Optional[str] = None):
+        self.claude_dir = claude_dir
+        self.jsonl_path = os.path.join(claude_dir, 'command-history.jsonl')
+        self.legacy_path = os.path.join(claude_dir, 'command-history.log')
+        self.db = sqlite3.connect(db_path or os.path.join(claude_dir, 'command-history.db'),
+                                  timeout=30, isolation_level=None)
+        self.db.execute('PRAGMA journal_mode=WAL')
+        self.db.execute('PRAGMA synchronous=NORMAL')
+        self.db.executescript(SCHEMA)
+        self.has_fts, self.trigram = self._create_fts()
+
+    def _create_fts(self) -> Tuple[bool, bool]:
+        """Create the full-text table, preferring the trigram tokenizer."""
+        row = self.db.execute(
+            "SELECT sql FROM sqlite_master WHERE name = 'entries_fts'").fetchone()
+        if row:
+            return True, 'trigram' in row[0]
+
+        for tokenize in ("'trigram'", None):
+            options = f', tokenize={tokenize}' if tokenize else ''
+            try:
+                self.db.execute(
+                    'CREATE VIRTUAL TABLE entries_fts USING fts5('
+                    f"command, description, content='entries', content_rowid='id'{options})")
+            except sqlite3.OperationalError:
+                continue
+            self.db.execute(FTS_TRIGGER)
+            self.db.execute("INSERT INTO entries_fts (entries_fts) VALUES ('rebuild')")
+            return True, tokenize is not None
+        return False, False
+
+    def close(self):
+        self.db.close()
+
+    # -- indexing ----------------------------------------------------------
+
+    def update(self) -> int:
+        """Index everything appended since the last update; return new entries."""
+        self.db.execute('BEGIN IMMEDIATE')
+        try:
+            added = 0
+            segments = JsonlLog(self.jsonl_path).segments()
+            for segment in segments:
+                added += self._index_segment(segment)
+            # Forget segments pruned by rotation.
+            for (path,) in self.db.execute(
+                    'SELECT path FROM sources WHERE offset = ?', (DONE,)).fetchall():
+                if path not in segments:
+                    self.db.execute('DELETE FROM sources WHERE path = ?', (path,))
+            for path, parse in ((self.legacy_path, self._parse_legacy),
+                                (self.jsonl_path, self._parse_jsonl)):
+                added += self._index_live(path, parse)
+            self.db.execute('COMMIT')
+        except BaseException:
+            self.db.execute('ROLLBACK')
+            raise
+        return added
+
+    def _source(self, path: str) -> Tuple[Optional[int], int]:
+        row = self.db.execute(
+            'SELECT inode, offset FROM sources WHERE path = ?', (path,)).fetchone()
+        return (row[0], row[1]) if row else (None, 0)
+
+    def _set_source(self, path: str, inode: Optional[int], offset: int):
+        self.db.execute('INSERT OR REPLACE INTO sources (path, inode, offset) VALUES (?, ?, ?)',
+                        (path, inode, offset))
+
+    def _index_segment(self, path: str) -> int:
+        if self._source(path)[1] == DONE:
+            return 0
+        try:
+            with (gzip.open if path.endswith('.gz') else open)(path, 'rb') as f:
+                added, _ = self._insert(self._parse_jsonl(f, 0))
+        except (OSError, EOFError):
+            return 0  # still being written by a rotation
+        self._set_source(path, None, DONE)
+        return added
+
+    def _index_live(self, path: str, parse) -> int:
+        try:
+            f = open(path, 'rb')
+        except OSError:
+            return 0
+        with f:
+            stat = os.fstat(f.fileno())
+            inode, offset = self._source(path)
+            # A new inode or a shorter file means the log was rotated; its
+            # old contents are in a segment and duplicates are ignored.
+            if inode != stat.st_ino or stat.st_size < offset:
+                offset = 0
+            if stat.st_size == offset:
+                return 0
+            f.seek(offset)
+            added, offset = self._insert(parse(f, offset))
+        self._set_source(path, stat.st_ino, offset)
+        return added
+
+    def _last_id(self) -> int:
+        return self.db.execute('SELECT coalesce(max(id), 0) FROM entries').fetchone()[0]
+
+    def _insert(self, records: Iterable[Tuple[Dict[str, Any], int]]) -> Tuple[int, int]:
+        """Insert parsed records in batches; return (added, final offset)."""
+        added = 0
+        offset = 0
+        batch: List[Tuple] = []
+
+        def flush():
+            nonlocal added
+            before = self._last_id()
+            self.db.executemany(
+                'INSERT OR IGNORE INTO entries '
+                '(key, ts, epoch, command, description, session_id, cwd) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?)', batch)
+            added += self._last_id() - before
+            batch.clear()
+
+        for record, offset in records:
+            if record is None:
+                continue
+            ts = record['ts']
+            batch.append((entry_key(ts, record.get('session_id'), record['command']),
+                          ts, record['epoch'], record['command'], record.get('description'),
+                          record.get('session_id'), record.get('cwd')))
+            if len(batch) >= BATCH_SIZE:
+                flush()
+        if batch:
+            flush()
+        return added, offset
+
+    def _parse_jsonl(self, f, offset: int) -> Iterator[Tuple[Optional[Dict[str, Any]], int]]:
+        """Yield (record, offset after it); a trailing partial line is left for later."""
+        for line in f:
+            if not line.endswith(b'\n'):
+                break
+            offset += len(line)
+            try:
+                record = json.loads(line)
+                record['epoch'] = parse_time(record['ts'])
+                if not isinstance(record.get('command'), str):
+                    raise ValueError('missing command')
+            except (ValueError, KeyError, TypeError):
+                yield None, offset
+                continue
+            yield record, offset
+        yield None, offset
+
+    def _parse_legacy(self, f, offset: int) -> Iterator[Tuple[Optional[Dict[str, Any]], int]]:
+        """Parse the old '[timestamp] command' / '  Description:' text format."""
+        record = None
+        for raw in f:
+            offset += len(raw)
+            line = raw.decode('utf-8', 'replace').rstrip('\n')
+            match = LEGACY_ENTRY.match(line)
+            if match:
+                if record:
+                    yield record, offset - len(raw)
+                ts = match.group(1).replace(' ', 'T')
+                record = {'ts': ts, 'epoch': parse_time(ts), 'command': match.group(2)}
+            elif record is None:
+                continue
+            elif line.startswith(LEGACY_DESCRIPTION):
+                record['description'] = line[len(LEGACY_DESCRIPTION):]
+            else:
+                record['command'] += '\n' + line
+        yield record, offset
+
+    # -- queries -----------------------------------------------------------
+
+    def search(self, terms: List[str] = (), description: Optional[str] = None,
+               since: Optional[float] = None, until: Optional[float] = None,
+               session_id: Optional[str] = None, limit: int = 50) -> List[Dict[str, Any]]:
+        """Return matching entries, newest first."""
+        clauses: List[str] = []
+        params: List[Any] = []
+        match: List[str] = []
+
+        def text(column: str, value: str):
+            if self.has_fts and (not self.trigram or len(value) >= TRIGRAM_MIN):
+                match.append(f'{column} : "{value.replace(chr(34), chr(34) * 2)}"')
+            else:
+                escaped = value.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+                clauses.append(f"e.{column} LIKE ? ESCAPE '\\'")
+                params.append(f'%{escaped}%')
+
+        for term in terms:
+            text('command', term)
+        if description:
+            text('description', description)
+        if since is not None:
+            clauses.append('e.epoch >= ?')
+            params.append(since)
+        if until is not None:
+            clauses.append('e.epoch < ?')
+            params.append(until)
+        if session_id:
+            clauses.append('e.session_id = ?')
+            params.append(session_id)
+
+        sql = 'SELECT e.ts, e.command, e.description, e.session_id, e.cwd FROM entries e'
+        if match:
+            sql += ' JOIN entries_fts f ON f.rowid = e.id'
+            clauses.insert(0, 'entries_fts MATCH ?')
+            params.insert(0, ' AND '.join(match))
+        if clauses:
+            sql += ' WHERE ' + ' AND '.join(clauses)
+        sql += ' ORDER BY e.epoch DESC, e.id DESC LIMIT ?'
+        params.append(limit)
+
+        columns = ('ts', 'command', 'description', 'session_id', 'cwd')
+        return [dict(zip(columns, row)) for row in self.db.execute(sql, params)]
@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+Long-lived server that hosts BaseHook subclasses over a Unix domain socket.
+
+Protocol (one request per connection):
+  client -> server: one JSON header line {"hook", "args", "cwd", "env"}
+                    followed by the raw hook payload, then EOF
+  server -> client: one JSON object {"exit_code", "stdout", "stderr"}
+                    or {"error": "..."} when the hook was not run and the
+                    client should run it in-process
+
+Requests are served one at a time, since each one sets the process's
+environment and working directory. When any hook module (lib/ or scripts/)
+changes on disk the daemon refuses the request and exits rather than
+reloading in place: modules bound each other's names at import, so only a
+fresh process is sure to run the edited code. The next client starts one.
+"""
+import fcntl
+import io
+import json
+import os
+import socket
+from typing import Any, Dict, List, Optional, Tuple
+
+import config
+from base_hook import BaseHook
+from hook_loader import load_hook_class
+
+LIB_DIR = os.path.dirname(os.path.abspath(__file__))
+SCRIPTS_DIR = os.path.join(os.path.dirname(LIB_DIR), 'scripts')
+
+IDLE_TIMEOUT = float(os.environ.get('CLAUDE_HOOKS_DAEMON_IDLE', 15 * 60))
+MAX_HEADER_SIZE = 1024 * 1024
+# Warm instances kept across projects and configuration edits.
+MAX_WARM_HOOKS = 64
+
+
+def socket_path() -> str:
+    """Return the socket path shared by the daemon and its clients."""
+    default = os.path.join(os.path.expanduser('~'), '.claude', 'hooks-daemon.sock')
+    return os.environ.get('CLAUDE_HOOKS_SOCKET', default)
+
+
+def read_request(conn: socket.socket) -> Tuple[Dict[str, Any], bytes]:
+    """Read a header line and payload from a client connection."""
+    chunks = []
+    while True:
+        chunk = conn.recv(65536)
+        if not chunk:
+            break
+        chunks.append(chunk)
+    data = b''.join(chunks)
+    header, _, payload = data.partition(b'\n')
+    if len(header) > MAX_HEADER_SIZE:
+        raise ValueError("Request header too large")
+    return json.loads(header), payload
+
+
+class HookDaemon:
+    """Serve hook invocations sequentially from warm hook instances."""
+
+    def __init__(self):
+        self.hooks: Dict[Tuple[str, Tuple[str, ...], Tuple], BaseHook] = {}
+        self.watched = self._snapshot()
+
+    def _snapshot(self) -> Dict[str, float]:
+        mtimes = {}
+        for directory in (LIB_DIR, SCRIPTS_DIR):
+            for name in os.listdir(directory):
+                if name.endswith('.py'):
+                    path = os.path.join(directory, name)
+                    try:
+                        mtimes[path] = os.stat(path).st_mtime
+                    except OSError:
+                        continue
+        return mtimes
+
+    def code_changed(self) -> bool:
+        """Return True if a hook module was added, removed or edited since start."""
+        return self._snapshot() != self.watched
+
+    def get_hook(self, name: str, args: List[str]) -> BaseHook:
+        # Hooks read their configuration when constructed, so an instance is
+        # only reused while the project's hooks-config.json sources are unchanged.
+        key = (name, tuple(args), config.get_config_key())
+        hook = self.hooks.get(key)
+        if hook is None:
+            hook = load_hook_class(name)(*args)
+            hook.long_lived = True
+            if len(self.hooks) >= MAX_WARM_HOOKS:
+                self.hooks.clear()
+            self.hooks[key] = hook
+        return hook
+
+    def handle(self, request: Dict[str, Any], payload: bytes) -> Dict[str, Any]:
+        env = request.get('env')
+        if env is not None:
+            os.environ.clear()
+            os.environ.update(env)
+        if request.get('cwd'):
+            os.chdir(request['cwd'])
+
+        hook = self.get_hook(request['hook'], request.get('args', []))
+
+        stdout, stderr = io.StringIO(), io.StringIO()
+        stdin = io.StringIO(payload.decode('utf-8', errors='replace'))
+        exit_code = hook.invoke(stdin, stdout, stderr)
+        return {'exit_code': exit_code, 'stdout': stdout.getvalue(), 'stderr': stderr.getvalue()}
+
+    def serve(self, server: socket.socket):
+        server.settimeout(IDLE_TIMEOUT)
+        while True:
+            try:
+                conn, _ = server.accept()
+            except socket.timeout:
+                return
+            with conn:
+                conn.settimeout(30)
+                restart = self.code_changed()
+                if restart:
+                    self.hooks.clear()
+                    response = {'error': 'hook code changed; daemon restarting'}
+                else:
+                    try:
+                        request, payload = read_request(conn)
+                        response = self.handle(request, payload)
+                    except Exception as e:
+                        response = {'error': f"{type(e).__name__}: {e}"}
+                try:
+                    conn.sendall(json.dumps(response).encode('utf-8'))
+                except OSError:
+                    pass
+            if restart:
+                return
+
+
+def acquire_lock(path: str) -> Optional[int]:
+    """Take the daemon lock, or return None if another daemon holds it."""
+    fd = os.open(path + '.lock', os.O_RDWR | os.O_CREAT, 0o600)
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        os.close(fd)
+        return None
+    return fd
+
+
+def main() -> int:
+    path = socket_path()
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    lock_fd = acquire_lock(path)
+    if lock_fd is None:
+        return 0
+
+    if os.path.exists(path):
+        os.unlink(path)
+
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    old_umask = os.umask(0o077)
+    try:
+        server.bind(path)
+    finally:
+        os.umask(old_umask)
+    server.listen(64)
+
+    try:
+        HookDaemon().serve(server)
+    finally:
+        server.close()
+        try:
+            os.unlink(path)
+        except OSError:
+            pass
+        os.close(lock_fd)
+    return 0
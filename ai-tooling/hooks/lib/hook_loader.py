@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+"""Load hook classes from their scripts without executing them as __main__."""
+import importlib.util
+import os
+import re
+from typing import Type
+
+from base_hook import BaseHook
+
+
+SCRIPTS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'scripts')
+
+_HOOK_NAME = re.compile(r'^[a-z0-9][a-z0-9-]*$')
+
+
+def hook_script_path(name: str) -> str:
+    """Return the script path for a hook name like ``protect-files``."""
+    if not _HOOK_NAME.match(name):
+        raise ValueError(f"Invalid hook name: {name!r}")
+    return os.path.join(SCRIPTS_DIR, f'{name}.py')
+
+
+def load_hook_class(name: str) -> Type[BaseHook]:
+    """Import ``scripts/<name>.py`` and return the BaseHook subclass it defines."""
+    path = hook_script_path(name)
+    if not os.path.isfile(path):
+        raise ValueError(f"Hook not found: {path}")
+
+    module_name = 'hook_' + name.replace('-', '_')
+    spec = importlib.util.spec_from_file_location(module_name, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+
+    for value in vars(module).values():
+        if (
+            isinstance(value, type)
+            and issubclass(value, BaseHook)
+            and value.__module__ == module_name
+        ):
+            return value
+
+    raise ValueError(f"No BaseHook subclass defined in {path}")
@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+Structured JSONL logs shared by the hooks.
+
+Every record is appended with a single os.write() on an O_APPEND descriptor,
+so records from parallel hook processes never interleave. Files are rotated
+by size into gzip-compressed segments: writers hold a shared lock on
+``<log>.lock`` from open to write and rotation renames the file under the
+exclusive lock, so no write can land in a segment once it is compressed.
+Long-lived hosts can use buffered logs, which batch records and flush them
+on a short timer.
+"""
+import atexit
+import json
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+
+DEFAULT_MAX_BYTES = 10 * 1024 * 1024
+DEFAULT_BACKUPS = 5
+
+
+def timestamp() -> str:
+    """Return the local time as an ISO 8601 string with milliseconds."""
+    now = time.time()
+    local = time.localtime(now)
+    offset = time.strftime('%z', local)
+    return (f"{time.strftime('%Y-%m-%dT%H:%M:%S', local)}.{int(now % 1 * 1000):03d}"
+            f"{offset[:3]}:{offset[3:]}")
+
+
+class JsonlLog:
+    """Append-only JSONL file with size-based rotation."""
+
+    def __init__(self, path: str, max_bytes: int = DEFAULT_MAX_BYTES,
+                 backups: int = DEFAULT_BACKUPS, compress: bool = True,
+                 buffered: bool = False, flush_interval: float = 1.0,
+                 buffer_size: int = 64 * 1024):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self.compress = compress
+        self.buffered = buffered
+        self.flush_interval = flush_interval
+        self.buffer_size = buffer_size
+        self._buffer: List[bytes] = []
+        self._buffered_bytes = 0
+        self._lock = threading.Lock()
+        self._timer: Optional[threading.Timer] = None
+
+    def write(self, record: Dict[str, Any]):
+        """Append one record (a ``ts`` field is added if missing)."""
+        record.setdefault('ts', timestamp())
+        line = (json.dumps(record, ensure_ascii=False) + '\n').encode('utf-8')
+
+        if not self.buffered:
+            self._append(line)
+            return
+
+        with self._lock:
+            self._buffer.append(line)
+            self._buffered_bytes += len(line)
+            if self._buffered_bytes >= self.buffer_size:
+                self._flush_locked()
+            elif self._timer is None:
+                self._timer = threading.Timer(self.flush_interval, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def flush(self):
+        """Write out buffered records."""
+        with self._lock:
+            self._flush_locked()
+
+    def _flush_locked(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if self._buffer:
+            data = b''.join(self._buffer)
+            self._buffer = []
+            self._buffered_bytes = 0
+            self._append(data)
+
+    def _lock_file(self, exclusive: bool) -> int:
+        """Open and flock the log's lock file; close the descriptor to release it."""
+        fd = os.open(self.path + '.lock', os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            import fcntl
+        except ImportError:
+            return fd
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+        except OSError:
+            pass
+        return fd
+
+    def _append(self, data: bytes):
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        lock_fd = self._lock_file(exclusive=False)
+        try:
+            fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+            try:
+                os.write(fd, data)
+                size = os.fstat(fd).st_size
+            finally:
+                os.close(fd)
+        finally:
+            os.close(lock_fd)
+        if self.max_bytes and size > self.max_bytes:
+            self.rotate()
+
+    def segments(self) -> List[str]:
+        """Return rotated segments, oldest first."""
+        import glob
+        return sorted(glob.glob(glob.escape(self.path) + '.*.gz') +
+                      glob.glob(glob.escape(self.path) + '.[0-9]*[0-9]'))
+
+    def rotate(self):
+        """Move the live file aside, compress it and prune old segments."""
+        lock_fd = self._lock_file(exclusive=True)
+        try:
+            try:
+                if os.path.getsize(self.path) <= self.max_bytes:
+                    return  # another process rotated it first
+            except OSError:
+                return
+            # Microseconds keep names unique (and in order) across rotations
+            # of one process within a second.
+            now = time.time()
+            stamp = f"{time.strftime('%Y%m%d%H%M%S', time.localtime(now))}{int(now % 1 * 1e6):06d}"
+            segment = f"{self.path}.{stamp}-{os.getpid()}"
+            os.rename(self.path, segment)
+        finally:
+            os.close(lock_fd)
+
+        # Writers open the file under the shared lock, so none can still be
+        # writing to the segment; compress it without holding up new writes.
+        if self.compress:
+            import gzip
+            import shutil
+            with open(segment, 'rb') as src, gzip.open(segment + '.gz', 'wb') as dst:
+                shutil.copyfileobj(src, dst)
+            os.unlink(segment)
+
+        for old in self.segments()[:-self.backups or None]:
+            try:
+                os.unlink(old)
+            except OSError:
+                pass  # pruned by a concurrent rotation
+
+
+_logs: Dict[Tuple[str, bool], JsonlLog] = {}
+
+
+def get_log(path: str, buffered: bool = False, **options: Any) -> JsonlLog:
+    """Return a shared JsonlLog for path; buffered logs are flushed at exit."""
+    key = (path, buffered)
+    log = _logs.get(key)
+    if log is None:
+        log = JsonlLog(path, buffered=buffered, **options)
+        _logs[key] = log
+        if buffered:
+            atexit.register(log.flush)
+    return log
+
+
+def flush_all():
+    """Flush every buffered log."""
+    for log in _logs.values():
+        log.flush()
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""Small persistent LRU caches stored as a single JSON file."""
+import json
+import os
+from typing import Any, Dict, Optional
+
+
+# Characters hashed per encoded slice, so large contents are never encoded whole.
+_HASH_CHUNK = 1024 * 1024
+
+
+def content_digest(text: str) -> str:
+    """Return a fast, collision-resistant digest of text."""
+    import hashlib
+    digest = hashlib.blake2b(digest_size=16)
+    for start in range(0, len(text), _HASH_CHUNK):
+        digest.update(text[start:start + _HASH_CHUNK].encode('utf-8', 'surrogatepass'))
+    return digest.hexdigest()
+
+
+def file_digest(path: str) -> str:
+    """Return the digest of a file's bytes, read in chunks."""
+    import hashlib
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(_HASH_CHUNK), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def fingerprint(*parts: Any) -> str:
+    """Return a digest identifying a configuration (patterns, settings...)."""
+    return content_digest(json.dumps(parts, sort_keys=True, default=repr))
+
+
+def signing_key(directory: str) -> bytes:
+    """Return the secret kept in directory for signing cache entries, creating it once."""
+    path = os.path.join(directory, 'cache.key')
+    try:
+        with open(path, 'rb') as f:
+            key = f.read()
+        if len(key) >= 32:
+            return key
+    except OSError:
+        pass
+    import tempfile
+
+    os.makedirs(directory, mode=0o700, exist_ok=True)
+    key = os.urandom(32)
+    # A unique name per writer: threads of one process race here too.
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.cache.key', suffix='.tmp')
+    with os.fdopen(fd, 'wb') as f:
+        f.write(key)
+    try:
+        os.link(tmp_path, path)  # first writer wins; everyone uses its key
+    except FileExistsError:
+        pass
+    finally:
+        os.unlink(tmp_path)
+    with open(path, 'rb') as f:
+        return f.read()
+
+
+class JsonLRUCache:
+    """LRU key/value store persisted as one JSON file.
+
+    The file records the fingerprint it was written under; loading it with a
+    different fingerprint starts empty, so a configuration change can never
+    serve entries computed under the old one. With a signing key, each entry
+    carries an HMAC of its key and value, and an entry that fails the check
+    (edited or planted in the file) reads as missing.
+    """
+
+    def __init__(self, path: str, max_entries: int = 1024, fingerprint: str = '',
+                 key: Optional[bytes] = None):
+        self.path = path
+        self.max_entries = max_entries
+        self.fingerprint = fingerprint
+        self.key = key
+        self._entries: Optional[Dict[str, Any]] = None
+        self._dirty = False
+
+    def _mac(self, key: str, value: Any) -> str:
+        import hmac
+        message = json.dumps([self.fingerprint, key, value], sort_keys=True)
+        return hmac.new(self.key, message.encode('utf-8'), 'blake2b').hexdigest()
+
+    def _load(self) -> Dict[str, Any]:
+        if self._entries is None:
+            try:
+                with open(self.path) as f:
+                    data = json.load(f)
+            except (OSError, ValueError):
+                data = {}
+            if isinstance(data, dict) and data.get('fingerprint') == self.fingerprint:
+                self._entries = dict(data.get('entries', {}))
+            else:
+                self._entries = {}
+        return self._entries
+
+    def get(self, key: str, default: Any = None) -> Any:
+        entries = self._load()
+        if key not in entries:
+            return default
+        value = entries[key]
+        if self.key is not None:
+            import hmac
+            if not (isinstance(value, list) and len(value) == 2 and isinstance(value[1], str)
+                    and hmac.compare_digest(value[1], self._mac(key, value[0]))):
+                del entries[key]  # drop the forged entry
+                self._dirty = True
+                return default
+        # Moving an entry costs a rewrite of the file, so only entries in the
+        # older half, the ones eviction reaches first, are moved to the end.
+        if list(entries).index(key) < len(entries) // 2:
+            entries[key] = entries.pop(key)
+            self._dirty = True
+        return value[0] if self.key is not None else value
+
+    def set(self, key: str, value: Any):
+        entries = self._load()
+        entries.pop(key, None)
+        entries[key] = [value, self._mac(key, value)] if self.key is not None else value
+        while len(entries) > self.max_entries:
+            del entries[next(iter(entries))]
+        self._dirty = True
+
+    def save(self):
+        """Write the cache back atomically if it changed."""
+        if not self._dirty or self._entries is None:
+            return
+        import tempfile
+
+        directory = os.path.dirname(self.path) or '.'
+        try:
+            os.makedirs(directory, exist_ok=True)
+            # A unique name per writer: threads of one process save too.
+            fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.' + os.path.basename(self.path),
+                                            suffix='.tmp')
+        except OSError:
+            return
+        try:
+            with os.fdopen(fd, 'w') as f:
+                json.dump({'fingerprint': self.fingerprint, 'entries': self._entries}, f)
+            os.replace(tmp_path, self.path)
+            self._dirty = False
+        except OSError:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
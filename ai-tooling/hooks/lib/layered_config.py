@@ -0,0 +1,280 @@
+#!/usr/bin/env python3
+"""
+Layered hook configuration.
+
+Built-in defaults are overlaid with ~/.claude/hooks-config.json and then the
+project's .claude/hooks-config.json. The merged, validated result is compiled
+with marshal into a cache in the caller's (per-user) cache directory, keyed
+on every source's mtime and size, so a normal invocation costs a few stat()
+calls and one marshal.loads() with no JSON parsing or validation. The
+result is kept for the life of the process; with no config files at all the
+default sections are only built as they are read.
+
+Merge rules: objects merge key by key, ``null`` removes a key, any other
+value replaces it, and ``"name+": [...]`` appends to the list ``name``.
+The project file is held to per-key restrictions (see check_restrictions)
+so a repository can tighten restricted settings but never loosen them.
+"""
+import marshal
+import os
+import sys
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+
+CONFIG_NAME = 'hooks-config.json'
+# Bump when the cache layout or merge rules change.
+CACHE_VERSION = 3
+
+_SCALARS = {
+    'str': (str,),
+    'int': (int,),
+    'number': (int, float),
+    'bool': (bool,),
+}
+
+_memo: Dict[Tuple, Dict[str, Any]] = {}
+
+
+class ConfigError(ValueError):
+    """A configuration file does not match the schema."""
+
+
+class LazySections(dict):
+    """Default sections, each built by its factory the first time it is read."""
+
+    def __init__(self, factories: Dict[str, Callable[[], Any]]):
+        super().__init__()
+        self.factories = factories
+
+    def __missing__(self, name: str) -> Any:
+        value = self[name] = self.factories[name]()
+        return value
+
+
+def source_paths(project_dir: Optional[str] = None) -> List[str]:
+    """Return the config files in override order (global, then project)."""
+    if project_dir is None:
+        project_dir = os.environ.get('CLAUDE_PROJECT_DIR', os.getcwd())
+    return [
+        os.path.join(os.path.expanduser('~'), '.claude', CONFIG_NAME),
+        os.path.join(project_dir, '.claude', CONFIG_NAME),
+    ]
+
+
+def source_key(paths: List[str], defaults_path: str) -> Tuple:
+    """Identify the sources by (path, mtime, size); missing files are left out."""
+    key: List[Tuple[str, int, int]] = []
+    for path in [defaults_path] + paths:
+        try:
+            st = os.stat(path)
+        except OSError:
+            continue
+        key.append((path, st.st_mtime_ns, st.st_size))
+    return (CACHE_VERSION, tuple(key))
+
+
+def load(sections: Dict[str, Callable[[], Any]], schema: Dict[str, Any],
+         defaults_path: str, cache_dir: str, restrictions: Dict[str, Any],
+         project_dir: Optional[str] = None) -> Dict[str, Any]:
+    """Return the merged configuration, from the compiled cache when it is current.
+
+    sections maps each section name to a factory for its defaults;
+    restrictions are the check_restrictions rules for the project file. The
+    result is shared by every caller in the process and must not be modified.
+    """
+    paths = source_paths(project_dir)
+    key = source_key(paths, defaults_path)
+    config = _memo.get(key)
+    if config is not None:
+        return config
+
+    if len(key[1]) == 1:
+        config = LazySections(sections)  # no config files: nothing to merge
+    else:
+        present = [path for path, _, _ in key[1][1:]]
+        import zlib
+        # One cache per set of sources; the key inside still has to match.
+        name = f"hooks-config-{zlib.crc32(chr(0).join(present).encode('utf-8')):08x}.cache"
+        cache_path = os.path.join(cache_dir, name)
+        data = _read_cache(cache_path, key)
+        if data is None:
+            restricted = {paths[-1]: restrictions}
+            defaults = {name: build_section() for name, build_section in sections.items()}
+            config, errors = build(defaults, schema, present, restricted)
+            data = marshal.dumps((config, errors))
+            _write_cache(cache_path, marshal.dumps((key, data)))
+        config, errors = marshal.loads(data)
+        for error in errors:
+            print(f"hooks-config: {error}", file=sys.stderr)
+    if len(_memo) > 16:
+        _memo.clear()
+    _memo[key] = config
+    return config
+
+
+def _read_cache(cache_path: str, key: Tuple) -> Optional[bytes]:
+    try:
+        with open(cache_path, 'rb') as f:
+            cached_key, data = marshal.loads(f.read())
+    except (OSError, ValueError, EOFError, TypeError):
+        return None
+    return data if cached_key == key else None
+
+
+def _write_cache(cache_path: str, blob: bytes):
+    tmp_path = f'{cache_path}.{os.getpid()}.tmp'
+    try:
+        os.makedirs(os.path.dirname(cache_path), mode=0o700, exist_ok=True)
+        with open(tmp_path, 'wb') as f:
+            f.write(blob)
+        os.replace(tmp_path, cache_path)
+    except OSError:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+
+
+def build(config: Dict[str, Any], schema: Dict[str, Any], paths: List[str],
+          restricted: Optional[Dict[str, Dict[str, Any]]] = None
+          ) -> Tuple[Dict[str, Any], List[str]]:
+    """Merge and validate each file over config; a file with errors is skipped.
+
+    restricted maps a path to the restrictions its file must respect.
+    """
+    import json
+
+    errors = []
+    for path in paths:
+        try:
+            with open(path, encoding='utf-8') as f:
+                override = json.load(f)
+            if not isinstance(override, dict):
+                raise ConfigError('top level must be an object')
+            check_restrictions(override, config, (restricted or {}).get(path, {}))
+            config = validate(merge(config, override), schema)
+        except (OSError, ValueError) as e:
+            errors.append(f"{path}: {e}; file ignored")
+    return config, errors
+
+
+def check_restrictions(override: Dict[str, Any], config: Dict[str, Any],
+                       restrictions: Dict[str, Any]):
+    """Reject anything in override that would loosen a restricted setting.
+
+    restrictions maps a section to None (it cannot be set at all), 'append'
+    (a list section that may only be extended with ``"name+"``) or a dict of
+    rules for its keys; keys without a rule cannot be set. A key rule is
+    'append' (only ``"key+"``), 'lower' (a number no higher than the current
+    one) or a tuple of allowed values from loosest to strictest, of which
+    only the current value or a stricter one may be chosen.
+    """
+    for section, rules in restrictions.items():
+        for key in (section, section + '+'):
+            if key in override:
+                _check_rule(key, override[key], config.get(section), rules)
+
+
+def _check_rule(where: str, value: Any, current: Any, rule: Any):
+    name = where[:-1] if where.endswith('+') else where
+    if rule is None:
+        raise ConfigError(f"{name}: cannot be set here")
+    if rule == 'append':
+        if not where.endswith('+'):
+            raise ConfigError(f"{name}: can only be extended here (use '{name.rsplit('.', 1)[-1]}+')")
+        return
+    if where.endswith('+'):
+        raise ConfigError(f"{name}: '+' only extends lists")
+    if rule == 'lower':
+        if not isinstance(value, (int, float)) or isinstance(value, bool) or value > current:
+            raise ConfigError(f"{name}: can only be lowered here (from {current!r})")
+        return
+    if isinstance(rule, tuple):
+        floor = rule.index(current) if current in rule else 0
+        if value not in rule or rule.index(value) < floor:
+            stricter = ', '.join(repr(v) for v in rule[floor:])
+            raise ConfigError(f"{name}: can only be made stricter here ({stricter})")
+        return
+
+    if not isinstance(value, dict):
+        raise ConfigError(f"{name}: expected an object")
+    for key in value:
+        field = key[:-1] if key.endswith('+') else key
+        if field not in rule:
+            raise ConfigError(f"{name}.{field}: cannot be set here")
+        _check_rule(f"{name}.{key}", value[key], (current or {}).get(field), rule[field])
+
+
+def merge(base: Any, override: Any) -> Any:
+    """Overlay override onto base following the module's merge rules."""
+    if not isinstance(base, dict) or not isinstance(override, dict):
+        return override
+    merged = dict(base)
+    for key, value in override.items():
+        if key.endswith('+'):
+            name = key[:-1]
+            current = merged.get(name, [])
+            if not isinstance(current, (list, tuple)) or not isinstance(value, list):
+                raise ConfigError(f"{name}: '+' only extends lists")
+            merged[name] = list(current) + value
+        elif value is None:
+            merged.pop(key, None)
+        else:
+            merged[key] = merge(merged.get(key), value)
+    return merged
+
+
+def validate(value: Any, spec: Any, where: str = '') -> Any:
+    """Check value against spec and return it normalized (pairs become tuples).
+
+    A spec is a scalar name ('str', 'int', 'number', 'bool', 'regex'), a
+    one-item list (a list of that spec), a tuple (a fixed-length array), or a
+    dict: ``{'*': spec}`` for a mapping with any keys (checked against the
+    optional ``'keys'`` spec), otherwise an object whose keys are required
+    unless they end in '?'.
+    """
+    label = where or 'config'
+    if isinstance(spec, str):
+        if spec == 'regex':
+            if not isinstance(value, str):
+                raise ConfigError(f"{label}: expected a regex string")
+            import re
+            try:
+                re.compile(value)
+            except re.error as e:
+                raise ConfigError(f"{label}: invalid regex ({e})")
+            return value
+        if not isinstance(value, _SCALARS[spec]) or (spec != 'bool' and isinstance(value, bool)):
+            raise ConfigError(f"{label}: expected {spec}, got {type(value).__name__}")
+        return value
+
+    if isinstance(spec, list):
+        if not isinstance(value, (list, tuple)):
+            raise ConfigError(f"{label}: expected a list")
+        return [validate(item, spec[0], f"{where}[{i}]") for i, item in enumerate(value)]
+
+    if isinstance(spec, tuple):
+        if not isinstance(value, (list, tuple)) or len(value) != len(spec):
+            raise ConfigError(f"{label}: expected a list of {len(spec)} items")
+        return tuple(validate(item, s, f"{where}[{i}]")
+                     for i, (item, s) in enumerate(zip(value, spec)))
+
+    if not isinstance(value, dict):
+        raise ConfigError(f"{label}: expected an object")
+    prefix = f"{where}." if where else ''
+    if '*' in spec:
+        for k in value:
+            validate(k, spec.get('keys', 'str'), f"{prefix}{k}")
+        return {k: validate(v, spec['*'], f"{prefix}{k}") for k, v in value.items()}
+
+    fields = {name.rstrip('?'): name for name in spec}
+    unknown = sorted(set(value) - set(fields))
+    if unknown:
+        raise ConfigError(f"{prefix}{unknown[0]}: unknown setting")
+    result = {}
+    for name, field in fields.items():
+        if name in value:
+            result[name] = validate(value[name], spec[field], f"{prefix}{name}")
+        elif not field.endswith('?'):
+            raise ConfigError(f"{prefix}{name}: required")
+    return result
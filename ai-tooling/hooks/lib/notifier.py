@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+"""
+Coalescing desktop notifications.
+
+Hook events are appended to notify-state.json in the per-user hook state
+directory under a file lock and return at once. The first event of a window starts a detached flusher, which
+waits out the window, merges everything pending into one message ("3 tasks
+completed; Claude needs your input") and shows it with a single notifier
+process. Each urgency has a minimum interval between notifications; events
+arriving inside it wait and are merged into the next one.
+"""
+import fcntl
+import json
+import os
+import subprocess
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+
+URGENCIES = ('low', 'normal', 'critical')
+
+
+class Notifier:
+    """Pending notifications shared by the hooks and the flusher.
+
+    clock and sleep stand in for time.time and time.sleep, so a test can run
+    the flusher through its windows without waiting them out.
+    """
+
+    def __init__(self, state_dir: str, settings: Dict[str, Any],
+                 clock: Callable[[], float] = time.time,
+                 sleep: Callable[[float], None] = time.sleep):
+        self.settings = settings
+        self.clock = clock
+        self.sleep = sleep
+        self.state_path = os.path.join(state_dir, 'notify-state.json')
+        self.lock_path = os.path.join(state_dir, 'notify.lock')
+        self.flusher_lock_path = os.path.join(state_dir, 'notify-flusher.lock')
+
+    def _locked(self, path: str, blocking: bool = True) -> Optional[int]:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX if blocking else fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            os.close(fd)
+            return None
+        return fd
+
+    def _load(self) -> Dict[str, Any]:
+        try:
+            with open(self.state_path) as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            state = {}
+        if not isinstance(state, dict):
+            state = {}
+        state.setdefault('pending', {})
+        state.setdefault('last_sent', {})
+        return state
+
+    def _save(self, state: Dict[str, Any]):
+        tmp_path = f'{self.state_path}.{os.getpid()}.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(state, f)
+        os.replace(tmp_path, self.state_path)
+
+    def post(self, event: str, message: Optional[str] = None):
+        """Record an event; the flusher shows it once the window closes."""
+        fd = self._locked(self.lock_path)
+        try:
+            state = self._load()
+            entry = state['pending'].setdefault(event, {'count': 0})
+            entry['count'] += 1
+            if message:
+                entry['message'] = message
+            # The first event opens the window; a later one only shortens a
+            # wait imposed by the rate limit.
+            window_end = self.clock() + self.settings['window']
+            state['flush_at'] = min(state.get('flush_at', window_end), window_end)
+            self._save(state)
+        finally:
+            os.close(fd)
+
+    def pending(self) -> bool:
+        return bool(self._load()['pending'])
+
+    def ensure_flusher(self, command: List[str]):
+        """Start the flusher unless one is already running."""
+        fd = self._locked(self.flusher_lock_path, blocking=False)
+        if fd is None:
+            return
+        os.close(fd)
+        subprocess.Popen(
+            command,
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            start_new_session=True,
+        )
+
+    def run_flusher(self):
+        """Show pending notifications as their windows close, then exit."""
+        fd = os.open(self.flusher_lock_path, os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            while True:
+                try:
+                    fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except OSError:
+                    return
+                self._flush()
+                fcntl.flock(fd, fcntl.LOCK_UN)
+                # An event posted while we were exiting saw the lock held and
+                # started no flusher; show it rather than strand it.
+                if not self.pending():
+                    return
+        finally:
+            os.close(fd)
+
+    def _flush(self):
+        while True:
+            fd = self._locked(self.lock_path)
+            try:
+                state = self._load()
+                if not state['pending']:
+                    state.pop('flush_at', None)
+                    self._save(state)
+                    return
+                now = self.clock()
+                due = state.get('flush_at', now)
+                notification = None
+                if now >= due:
+                    message, sound, urgency = self.summarize(state['pending'])
+                    if not message:
+                        # Only events no longer configured: drop them.
+                        state['pending'] = {}
+                        state.pop('flush_at', None)
+                        self._save(state)
+                        return
+                    interval = self.settings['min_interval'].get(urgency, 0)
+                    allowed_at = state['last_sent'].get(urgency, 0) + interval
+                    if now >= allowed_at:
+                        notification = message, sound, urgency
+                        state['pending'] = {}
+                        state['last_sent'][urgency] = now
+                        state.pop('flush_at', None)
+                    else:
+                        state['flush_at'] = due = allowed_at
+                    self._save(state)
+            finally:
+                os.close(fd)
+
+            if notification is not None:
+                self.show(*notification)
+                return
+            # Wake at least once a window: a new event may have moved flush_at.
+            self.sleep(min(max(due - now, 0.01), self.settings['window']))
+
+    def summarize(self, pending: Dict[str, Dict[str, Any]]) -> Tuple[str, str, str]:
+        """Merge pending events into one (message, sound, urgency)."""
+        events = self.settings['events']
+        parts = []
+        top = None
+        for name, entry in pending.items():
+            spec = events.get(name)
+            if spec is None:
+                continue
+            count = entry['count']
+            if count > 1:
+                parts.append(spec['plural'].format(count=count))
+            else:
+                parts.append(entry.get('message') or spec['message'])
+            if top is None or _rank(spec['urgency']) > _rank(top['urgency']):
+                top = spec
+        if top is None:
+            return '', '', 'low'
+        return '; '.join(parts), top['sound'], top['urgency']
+
+    def show(self, message: str, sound: str, urgency: str):
+        """Display one notification with the platform's notifier."""
+        import shutil
+
+        title = self.settings['title']
+        backend = self.settings['backend']
+        if backend == 'auto':
+            backend = next((name for name in ('osascript', 'notify-send', 'powershell.exe')
+                            if shutil.which(name)), 'none')
+
+        if backend == 'osascript':
+            command = ['osascript', '-e', f'display notification {_applescript(message)} '
+                       f'with title {_applescript(title)} sound name {_applescript(sound)}']
+        elif backend == 'notify-send':
+            command = ['notify-send', title, message, f'--urgency={urgency}']
+        elif backend == 'powershell.exe':
+            command = ['powershell.exe', '-Command', _toast_script(title, message)]
+        else:
+            return
+        try:
+            subprocess.run(command, stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL,
+                           stderr=subprocess.DEVNULL, timeout=10)
+        except (OSError, subprocess.SubprocessError):
+            pass
+
+
+def _rank(urgency: str) -> int:
+    return URGENCIES.index(urgency) if urgency in URGENCIES else 1
+
+
+def _applescript(text: str) -> str:
+    return '"' + text.replace('\\', '\\\\').replace('"', '\\"') + '"'
+
+
+def _toast_script(title: str, message: str) -> str:
+    from xml.sax.saxutils import escape
+
+    template = (f'<toast><visual><binding template="ToastText02"><text id="1">{escape(title)}</text>'
+                f'<text id="2">{escape(message)}</text></binding></visual></toast>')
+    app_id = title.replace("'", "''")
+    return (
+        "[Windows.UI.Notifications.ToastNotificationManager, Windows.UI.Notifications, "
+        "ContentType = WindowsRuntime] | Out-Null\n"
+        "[Windows.Data.Xml.Dom.XmlDocument, Windows.Data.Xml.Dom.XmlDocument, "
+        "ContentType = WindowsRuntime] | Out-Null\n"
+        f"$xml = New-Object Windows.Data.Xml.Dom.XmlDocument\n"
+        f"$xml.LoadXml('{template.replace(chr(39), chr(39) * 2)}')\n"
+        "$toast = [Windows.UI.Notifications.ToastNotification]::new($xml)\n"
+        f"[Windows.UI.Notifications.ToastNotificationManager]::CreateToastNotifier('{app_id}')"
+        ".Show($toast)"
+    )
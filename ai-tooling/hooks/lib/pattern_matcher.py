@@ -1,8 +1,14 @@
 #!/usr/bin/env python3
 """Pattern matching utilities for hooks."""
 import os
+import re
+import sys
 import fnmatch
-from typing import List, Optional
+from functools import lru_cache
+from typing import Dict, List, Optional, Pattern, Sequence, Tuple
+
+
+_MAGIC = re.compile(r'[*?[]')
 
 
 def normalize_file_path(file_path: str) -> str:
@@ -16,17 +22,316 @@ def normalize_file_path(file_path: str) -> str:
     return file_path
 
 
-def matches_pattern(file_path: str, patterns: List[str]) -> Optional[str]:
-    """Check if file path matches any pattern."""
-    file_path = normalize_file_path(file_path)
+class PathMatcher:
+    """Match paths against many globs with the semantics of ``matches_pattern``.
+
+    Patterns are indexed once: exact basenames and paths go into hash maps,
+    ``*<suffix>`` globs are bucketed by extension, ``<dir>/*`` globs by first
+    directory and ``**/<dir>/*`` globs by directory name. Only the remaining
+    globs are compiled into one combined regex. When several patterns match,
+    the earliest one in the list wins, as with a linear scan.
+    """
+
+    def __init__(self, patterns: Sequence[str]):
+        self.patterns = list(patterns)
+        self.exact_names: Dict[str, int] = {}
+        self.exact_paths: Dict[str, int] = {}
+        self.suffixes: Dict[str, List[Tuple[int, str]]] = {}
+        self.prefixes: Dict[str, List[Tuple[int, str]]] = {}
+        self.segments: Dict[str, int] = {}
+        regex_parts = []
+
+        for index, pattern in enumerate(self.patterns):
+            if not self._index(index, pattern):
+                regex_parts.append(f'(?P<p{index}>{fnmatch.translate(pattern)})')
+
+        self.regex = re.compile('|'.join(regex_parts)) if regex_parts else None
+
+    @staticmethod
+    def _add(table: Dict, key: str, value):
+        table.setdefault(key, []).append(value)
+
+    def _index(self, index: int, pattern: str) -> bool:
+        """Place a pattern in a lookup table; return False if it needs the regex."""
+        if not _MAGIC.search(pattern):
+            table = self.exact_paths if '/' in pattern else self.exact_names
+            table.setdefault(pattern, index)
+            return True
+
+        collapsed = re.sub(r'\*+', '*', pattern)
+        body = collapsed[1:]
+        if collapsed.startswith('*') and body and not _MAGIC.search(body):
+            tail = body.rsplit('/', 1)[-1]
+            if '.' in tail:
+                self._add(self.suffixes, tail[tail.rindex('.'):], (index, body))
+                return True
+
+        head = collapsed[:-1]
+        if collapsed.endswith('*') and '/' in head and not _MAGIC.search(head):
+            self._add(self.prefixes, head.split('/', 1)[0], (index, head))
+            return True
+
+        if collapsed.startswith('*/') and collapsed.endswith('/*'):
+            segment = collapsed[2:-2]
+            if segment and '/' not in segment and not _MAGIC.search(segment):
+                self.segments.setdefault(segment, index)
+                return True
+
+        return False
+
+    def match(self, file_path: str) -> Optional[str]:
+        """Return the first pattern matching the path or its basename."""
+        file_path = normalize_file_path(file_path)
+        basename = os.path.basename(file_path)
+        hits = []
+
+        for table, key in ((self.exact_names, basename), (self.exact_paths, file_path)):
+            if key in table:
+                hits.append(table[key])
+
+        if '.' in basename:
+            for index, suffix in self.suffixes.get(basename[basename.rindex('.'):], ()):
+                if file_path.endswith(suffix):
+                    hits.append(index)
+
+        for index, prefix in self.prefixes.get(file_path.split('/', 1)[0], ()):
+            if file_path.startswith(prefix):
+                hits.append(index)
+
+        if self.segments:
+            for segment in file_path.split('/')[1:-1]:
+                if segment in self.segments:
+                    hits.append(self.segments[segment])
+
+        if self.regex is not None:
+            for candidate in (file_path, basename):
+                found = self.regex.match(candidate)
+                if found:
+                    hits.append(int(found.lastgroup[1:]))
+
+        return self.patterns[min(hits)] if hits else None
+
+
+# One ``\b(word|two words)\b`` term of a hint pattern; terms are joined by '.*'.
+_HINT_TERM = re.compile(r'\\b\((?:\?:)?(\w(?:[\w ]*\w)?(?:\|\w(?:[\w ]*\w)?)*)\)\\b')
+
+
+class HintMatcher:
+    """Find the first of several keyword patterns that matches, in linear time.
+
+    Patterns shaped like ``\b(review|check)\b.*\b(code|pr)\b`` (literal
+    alternatives joined by ``.*``) are not run as regexes, whose ``.*``
+    backtracks across long lines. Each keyword is located on its own in the
+    case-folded text, and a pattern matches when its terms occur in order on
+    one line (``.`` never crosses a newline). Every term keeps a cursor that
+    only moves forward, and a line lacking a later term is skipped up to that
+    term's next occurrence, so each keyword is scanned for at most once.
+    Patterns of any other shape fall back to ``re.search``.
+    """
+
+    def __init__(self, patterns: Sequence[str], flags: int = 0):
+        self.patterns = list(patterns)
+        self.flags = flags
+        self.ignore_case = bool(flags & re.IGNORECASE)
+        # Per pattern, the keywords of each term (None: use re.search).
+        self.terms: List[Optional[List[Tuple[str, ...]]]] = []
+        self._words: Dict[str, Pattern] = {}
+
+        for pattern in self.patterns:
+            parts = [_HINT_TERM.fullmatch(part) for part in pattern.split('.*')]
+            if not all(parts):
+                self.terms.append(None)
+                continue
+            self.terms.append([
+                tuple(word.lower() if self.ignore_case else word
+                      for word in part.group(1).split('|'))
+                for part in parts
+            ])
 
-    for pattern in patterns:
-        if fnmatch.fnmatch(file_path, pattern):
-            return pattern
-        if fnmatch.fnmatch(os.path.basename(file_path), pattern):
-            return pattern
+    def _find_word(self, text: str, word: str, pos: int) -> Tuple[int, int]:
+        """Return the span of the first whole-word occurrence at or after pos."""
+        # A leading literal lets re skip ahead with a fast substring search,
+        # which a leading \b would prevent; the left boundary is checked here.
+        regex = self._words.get(word)
+        if regex is None:
+            regex = self._words[word] = re.compile(re.escape(word) + r'\b')
+        match = regex.search(text, pos)
+        while match:
+            start = match.start()
+            if start == 0 or not _is_word(text[start - 1]):
+                return match.span()
+            match = regex.search(text, start + 1)
+        return _NO_HIT
 
-    return None
+    def _in_order_on_a_line(self, text: str, terms: List[Tuple[str, ...]]) -> bool:
+        """Check whether the terms occur in order with no newline in between."""
+        cursors: Dict[Tuple[int, str], Tuple[int, int]] = {}
+
+        def next_hit(number: int, pos: int) -> Tuple[int, int]:
+            # Of the hits starting at or after pos, the one ending first
+            # leaves the most room for the following terms.
+            best = _NO_HIT
+            for word in terms[number]:
+                hit = cursors.get((number, word))
+                if hit is None or hit[0] < pos:
+                    hit = cursors[(number, word)] = self._find_word(text, word, pos)
+                if hit[1] < best[1]:
+                    best = hit
+            return best
+
+        pos = 0
+        while True:
+            start, ready = next_hit(0, pos)
+            if start == _NO_HIT[0]:
+                return False
+            line_end = text.find('\n', start)
+            if line_end < 0:
+                line_end = len(text)
+            for number in range(1, len(terms)):
+                start, end = next_hit(number, ready)
+                if start >= line_end:
+                    break
+                ready = end
+            else:
+                return True
+            if start == _NO_HIT[0]:
+                return False
+            # No line before the one holding that term's next hit can match.
+            pos = text.rfind('\n', line_end, start) + 1
+
+    def first_match(self, text: str) -> Optional[int]:
+        """Return the index of the first pattern that matches text, or None."""
+        folded = text.lower() if self.ignore_case else text
+
+        for index, terms in enumerate(self.terms):
+            if terms is None:
+                if re.search(self.patterns[index], text, self.flags):
+                    return index
+            elif len(terms) == 1:
+                if any(self._find_word(folded, word, 0) != _NO_HIT for word in terms[0]):
+                    return index
+            elif self._in_order_on_a_line(folded, terms):
+                return index
+        return None
+
+
+class SubstringMatcher:
+    """Find which groups of literal substrings occur in a text, in one pass.
+
+    Every substring is compiled into a single regex shaped like a trie
+    (``ev(?:al|ery)``), so the regex engine walks the text once instead of
+    once per substring. A hit also reports the substrings that are prefixes of
+    it, and the search resumes one character after each hit's start so that
+    overlapping substrings are found. Once hits stop adding groups, the
+    substrings whose groups have all been found are dropped from the regex,
+    so a text repeating one substring is not walked hit by hit. A handful
+    of substrings is cheaper to look for one by one with ``in``.
+    """
+
+    def __init__(self, groups: Sequence[Sequence[str]]):
+        self.groups: Dict[str, List[int]] = {}
+        self.always = set()
+        for index, substrings in enumerate(groups):
+            for substring in substrings:
+                if substring:
+                    self.groups.setdefault(substring, []).append(index)
+                else:
+                    self.always.add(index)
+        self._outputs: Dict[str, frozenset] = {}
+        self._regexes: Dict[frozenset, Optional[Pattern]] = {}
+        self.regex = None
+        if len(self.groups) > _SCAN_EACH_UP_TO:
+            self.regex = self._regex_without(frozenset())
+
+    def _regex_without(self, found: frozenset) -> Optional[Pattern]:
+        """Compile the substrings that could still add a group to found."""
+        if found not in self._regexes:
+            if len(self._regexes) > 64:
+                self._regexes.clear()
+            words = [word for word, groups in self.groups.items()
+                     if not found.issuperset(groups)]
+            self._regexes[found] = re.compile(_trie_pattern(words)) if words else None
+        return self._regexes[found]
+
+    def _groups_at(self, word: str) -> frozenset:
+        """Groups of word and of every substring that is a prefix of it."""
+        groups = self._outputs.get(word)
+        if groups is None:
+            groups = frozenset(index for end in range(1, len(word) + 1)
+                               for index in self.groups.get(word[:end], ()))
+            self._outputs[word] = groups
+        return groups
+
+    def matches(self, text: str) -> set:
+        """Return the indexes of the groups with a substring occurring in text."""
+        found = set(self.always)
+        if len(self.groups) <= _SCAN_EACH_UP_TO:
+            for word, groups in self.groups.items():
+                if word in text:
+                    found.update(groups)
+            return found
+
+        regex = self.regex if not found else self._regex_without(frozenset(found))
+        pos = wasted = 0
+        while regex is not None:
+            match = regex.search(text, pos)
+            if match is None:
+                break
+            new = self._groups_at(match.group()) - found
+            if new:
+                found |= new
+            else:
+                wasted += 1
+                if wasted == _RECOMPILE_AFTER:
+                    regex = self._regex_without(frozenset(found))
+                    wasted = 0
+            pos = match.start() + 1
+        return found
+
+
+# Up to this many substrings, separate ``in`` scans beat the combined regex.
+_SCAN_EACH_UP_TO = 32
+# Hits adding no new group that are tolerated before the regex is rebuilt.
+_RECOMPILE_AFTER = 32
+
+
+def _trie_pattern(words: Sequence[str]) -> str:
+    """Build a regex matching the longest of words at a position."""
+    trie: Dict[str, Dict] = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[''] = {}  # end of a word
+
+    def emit(node: Dict[str, Dict]) -> str:
+        branches = [re.escape(char) + emit(child)
+                    for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ''
+        body = branches[0] if len(branches) == 1 else f"(?:{'|'.join(branches)})"
+        # Optional and greedy: the longer words below this node are tried first.
+        return f'(?:{body})?' if '' in node else body
+
+    return emit(trie)
+
+
+_NO_HIT = (sys.maxsize, sys.maxsize)
+
+
+def _is_word(char: str) -> bool:
+    """Whether char counts as a word character for ``\b``."""
+    return char.isalnum() or char == '_'
+
+
+@lru_cache(maxsize=32)
+def _compiled_matcher(patterns: Tuple[str, ...]) -> PathMatcher:
+    return PathMatcher(patterns)
+
+
+def matches_pattern(file_path: str, patterns: List[str]) -> Optional[str]:
+    """Check if file path matches any pattern."""
+    return _compiled_matcher(tuple(patterns)).match(file_path)
 
 
 def is_test_file(file_path: str) -> bool:
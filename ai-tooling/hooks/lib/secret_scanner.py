@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+"""Single-pass multi-pattern scanner used for secret detection."""
+import re
+from typing import Dict, List, Optional, Pattern, Sequence, Tuple
+
+try:
+    from re import _parser as sre_parse  # Python 3.11+
+except ImportError:  # pragma: no cover - older interpreters
+    import sre_parse
+
+
+# Case-insensitive anchors are found by lowering this much of the content at
+# a time, so memory stays flat however large the content is.
+FOLD_CHUNK_SIZE = 1024 * 1024
+
+# Anchors shorter than this filter too little to be worth a lookup.
+MIN_ANCHOR_LENGTH = 3
+
+_GLOBAL_FLAGS = re.compile(r'^\(\?([aiLmsux]+)\)')
+
+
+def _scope_flags(pattern: str) -> str:
+    """Turn leading global flags like ``(?i)`` into a scoped group."""
+    match = _GLOBAL_FLAGS.match(pattern)
+    if not match:
+        return pattern
+    return f'(?{match.group(1)}:{pattern[match.end():]})'
+
+
+def _common_prefix(texts: List[str]) -> str:
+    """Return the longest prefix shared by every string."""
+    if not texts:
+        return ''
+    shortest, longest = min(texts), max(texts)
+    for index, char in enumerate(shortest):
+        if char != longest[index]:
+            return shortest[:index]
+    return shortest
+
+
+def _leading_literal(items) -> Tuple[str, bool]:
+    """Return the literal every match starts with and whether it spans all items."""
+    chars: List[str] = []
+    for op, av in items:
+        if op is sre_parse.LITERAL:
+            chars.append(chr(av))
+            continue
+        if op is sre_parse.SUBPATTERN:
+            _, add_flags, del_flags, sub_items = av
+            if add_flags or del_flags:
+                return ''.join(chars), False
+            text, complete = _leading_literal(sub_items)
+            chars.append(text)
+            if complete:
+                continue
+        elif op is sre_parse.BRANCH:
+            chars.append(_common_prefix([_leading_literal(alt)[0] for alt in av[1]]))
+        return ''.join(chars), False
+    return ''.join(chars), True
+
+
+def _literal_runs(items) -> List[str]:
+    """Return each run of consecutive top-level literals."""
+    runs = []
+    current: List[str] = []
+    for op, av in items:
+        if op is sre_parse.LITERAL:
+            current.append(chr(av))
+            continue
+        if current:
+            runs.append(''.join(current))
+            current = []
+    if current:
+        runs.append(''.join(current))
+    return runs
+
+
+def extract_anchor(pattern: str, flags: int = 0) -> Tuple[Optional[str], bool, bool]:
+    """Find a literal every match of ``pattern`` must contain.
+
+    Returns ``(anchor, at_start, ignore_case)``. ``at_start`` is True when the
+    anchor is the leading literal, so no match can begin before it.
+    """
+    try:
+        parsed = sre_parse.parse(pattern, flags)
+    except (re.error, OverflowError):
+        return None, False, False
+
+    ignore_case = bool(parsed.state.flags & re.IGNORECASE)
+    items = list(parsed)
+
+    leading, _ = _leading_literal(items)
+    if len(leading) >= MIN_ANCHOR_LENGTH:
+        return leading, True, ignore_case
+
+    if any(op is sre_parse.BRANCH for op, _ in items):
+        return None, False, ignore_case
+
+    runs = [run for run in _literal_runs(items) if len(run) >= MIN_ANCHOR_LENGTH]
+    if not runs:
+        return None, False, ignore_case
+    return max(runs, key=len), False, ignore_case
+
+
+class PatternScanner:
+    """Scan content for many labelled regexes in one pass.
+
+    A literal anchor is derived for each pattern (``ghp_``, ``sk-``, ``AIza``,
+    ``xox``, ``eyJ``, ``-----BEGIN``, ``://`` ...). Patterns whose anchor is
+    absent are dropped before scanning, the scan starts at the earliest
+    anchor, and every remaining pattern is searched through one combined
+    regex that stops as soon as each pattern has been found.
+
+    With ``binary=True`` the patterns are compiled as bytes and content may be
+    any buffer (bytes, mmap...); it is searched in place, never copied whole.
+    """
+
+    def __init__(self, patterns: Sequence[Tuple[str, str]], flags: int = 0,
+                 binary: bool = False):
+        self.patterns = list(patterns)
+        self.flags = flags
+        self.binary = binary
+        self._sources = [_scope_flags(pattern) for pattern, _ in self.patterns]
+        self._anchors = [extract_anchor(pattern, flags) for pattern, _ in self.patterns]
+        if binary:
+            self._sources = [source.encode('utf-8') for source in self._sources]
+            self._anchors = [(anchor.encode('utf-8') if anchor is not None else None,
+                              at_start, ignore_case)
+                             for anchor, at_start, ignore_case in self._anchors]
+        self._combined: Dict[Tuple[int, ...], Pattern] = {}
+
+    def _compile(self, indices: Tuple[int, ...]) -> Pattern:
+        regex = self._combined.get(indices)
+        if regex is None:
+            if self.binary:
+                source = b'|'.join(b'(?P<p%d>%s)' % (i, self._sources[i]) for i in indices)
+            else:
+                source = '|'.join(f'(?P<p{i}>{self._sources[i]})' for i in indices)
+            regex = re.compile(source, self.flags)
+            self._combined[indices] = regex
+        return regex
+
+    def _find_folded(self, content, anchors, end: int) -> Dict[str, int]:
+        """Return the first offset (or -1) of each anchor, ignoring case."""
+        if not (self.binary or content.isascii()):
+            # Outside ASCII, lower() can change a string's length ('İ' becomes
+            # two characters), so fold as the patterns do, on the content itself.
+            positions = {}
+            for anchor in anchors:
+                match = re.compile(re.escape(anchor), re.IGNORECASE).search(content, 0, end)
+                positions[anchor] = match.start() if match else -1
+            return positions
+
+        positions = dict.fromkeys(anchors, -1)
+        remaining = {anchor.lower(): anchor for anchor in anchors}
+        overlap = max(map(len, remaining), default=1) - 1
+        for start in range(0, end, FOLD_CHUNK_SIZE):
+            # One lowered chunk serves every anchor; chunks overlap so an
+            # anchor across a boundary is still found.
+            chunk = content[start:min(start + FOLD_CHUNK_SIZE + overlap, end)].lower()
+            for lowered in list(remaining):
+                position = chunk.find(lowered)
+                if position >= 0:
+                    positions[remaining.pop(lowered)] = start + position
+            if not remaining:
+                break
+        return positions
+
+    def candidates(self, content: str, end: Optional[int] = None) -> Tuple[List[int], int]:
+        """Return the patterns that can match and the offset to scan from."""
+        end = len(content) if end is None else end
+        folded = self._find_folded(content, {anchor for anchor, _, ignore_case in self._anchors
+                                             if anchor is not None and ignore_case}, end)
+        exact: Dict[str, int] = {}
+        candidates = []
+        start = end
+
+        for index, (anchor, at_start, ignore_case) in enumerate(self._anchors):
+            if anchor is None:
+                candidates.append(index)
+                start = 0
+                continue
+            if ignore_case:
+                position = folded[anchor]
+            else:
+                position = exact.get(anchor)
+                if position is None:
+                    position = exact[anchor] = content.find(anchor, 0, end)
+            if position < 0:
+                continue
+            candidates.append(index)
+            start = min(start, position if at_start else 0)
+
+        return candidates, start
+
+    def find(self, content: str, first_only: bool = False,
+             end: Optional[int] = None) -> List[Tuple[int, int]]:
+        """Return (pattern index, offset of its first match) for each pattern found."""
+        end = len(content) if end is None else end
+        remaining, position = self.candidates(content, end)
+        found = []
+
+        while remaining:
+            match = self._compile(tuple(remaining)).search(content, position, end)
+            if not match:
+                break
+            index = int(match.lastgroup[1:])
+            found.append((index, match.start()))
+            if first_only:
+                break
+            remaining.remove(index)
+            position = match.start()
+
+        return found
+
+    def find_all(self, content: str, end: Optional[int] = None) -> List[Tuple[int, int]]:
+        """Return (pattern index, offset) for every match of every pattern, by offset.
+
+        Each candidate pattern is searched on its own, so matches of different
+        patterns that overlap are all reported.
+        """
+        end = len(content) if end is None else end
+        remaining, position = self.candidates(content, end)
+        found = [(index, match.start())
+                 for index in remaining
+                 for match in self._compile((index,)).finditer(content, position, end)]
+        return sorted(found, key=lambda item: (item[1], item[0]))
+
+    def scan(self, content: str, first_only: bool = False,
+             end: Optional[int] = None) -> List[str]:
+        """Return the labels of patterns found in content[:end], in pattern order."""
+        found = self.find(content, first_only, end)
+        return [self.patterns[index][1] for index in sorted(index for index, _ in found)]
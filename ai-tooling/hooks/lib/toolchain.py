@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""
+Toolchain validation driven by a Homebrew Brewfile.
+
+The formulae listed in the Brewfile (or, without one, Brewfile.lock.json) are
+resolved against PATH, and those on the user's environment.probe list are
+asked for their version concurrently; the project's Brewfile never chooses
+what runs. Results are cached, signed, in the per-user state directory under
+a fingerprint of PATH and the mtimes of its directories, and each entry is
+re-checked against its binary's mtime and size, so a repeat session costs a
+few stat() calls and no subprocesses.
+"""
+import os
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+
+_BREW_LINE = re.compile(r'''^\s*brew\s+["']([^"']+)["']''')
+_VERSION = re.compile(r'\d+(?:\.\d+)+')
+
+
+def find_brewfile(project_dir: str) -> Optional[str]:
+    """Return the Brewfile brew bundle would use for this project, if any.
+
+    A lock file is only used when neither Brewfile exists.
+    """
+    home = os.path.expanduser('~')
+    candidates = [
+        os.environ.get('HOMEBREW_BUNDLE_FILE', ''),
+        os.path.join(project_dir, 'Brewfile'),
+        os.path.join(home, '.Brewfile'),
+        os.path.join(project_dir, 'Brewfile.lock.json'),
+        os.path.join(home, '.Brewfile.lock.json'),
+    ]
+    for path in candidates:
+        if path and os.path.isfile(path):
+            return path
+    return None
+
+
+def read_formulae(brewfile: str) -> Dict[str, Optional[str]]:
+    """Map each formula of a Brewfile to the version pinned in its lock file.
+
+    Tap-qualified names (``owner/tap/name``) are reduced to the formula name;
+    casks are skipped since they install applications rather than commands.
+    """
+    import json
+
+    if brewfile.endswith('.lock.json'):
+        lock_path, names = brewfile, None
+    else:
+        lock_path = brewfile + '.lock.json'
+        names = []
+        with open(brewfile, encoding='utf-8') as f:
+            for line in f:
+                match = _BREW_LINE.match(line)
+                if match:
+                    names.append(match.group(1).rsplit('/', 1)[-1])
+
+    try:
+        with open(lock_path, encoding='utf-8') as f:
+            locked = json.load(f)['entries']['brew']
+        versions = {name.rsplit('/', 1)[-1]: entry.get('version')
+                    for name, entry in locked.items()}
+    except (OSError, ValueError, KeyError, TypeError, AttributeError):
+        versions = {}
+
+    if names is None:
+        names = list(versions)
+    return {name: versions.get(name) for name in dict.fromkeys(names)}
+
+
+class PathIndex:
+    """Resolve command names against PATH, listing each directory once."""
+
+    def __init__(self, path: Optional[str] = None):
+        if path is None:
+            path = os.environ.get('PATH', os.defpath)
+        self.dirs = [d for d in dict.fromkeys(path.split(os.pathsep)) if d]
+        self._listings: Dict[str, frozenset] = {}
+
+    def _listing(self, directory: str) -> frozenset:
+        listing = self._listings.get(directory)
+        if listing is None:
+            try:
+                listing = frozenset(os.listdir(directory))
+            except OSError:
+                listing = frozenset()
+            self._listings[directory] = listing
+        return listing
+
+    def which(self, name: str) -> Optional[str]:
+        """Return the first executable called name on PATH, like shutil.which."""
+        for directory in self.dirs:
+            if name in self._listing(directory):
+                candidate = os.path.join(directory, name)
+                if os.access(candidate, os.X_OK) and not os.path.isdir(candidate):
+                    return candidate
+        return None
+
+    def fingerprint(self) -> List[Tuple[str, int]]:
+        """Directory mtimes, which change whenever a command is added or removed."""
+        stamps = []
+        for directory in self.dirs:
+            try:
+                stamps.append((directory, os.stat(directory).st_mtime_ns))
+            except OSError:
+                stamps.append((directory, 0))
+        return stamps
+
+
+def _stamp(path: str) -> Optional[List[int]]:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return [st.st_mtime_ns, st.st_size]
+
+
+def probe_version(path: str, args: List[str], timeout: float) -> Optional[str]:
+    """Run a command's version query and return the first version number it prints."""
+    import subprocess
+
+    try:
+        result = subprocess.run([path, *args], stdin=subprocess.DEVNULL,
+                                capture_output=True, text=True, errors='replace',
+                                timeout=timeout)
+    except (OSError, subprocess.SubprocessError):
+        return None
+    match = _VERSION.search(result.stdout) or _VERSION.search(result.stderr)
+    return match.group(0) if match else None
+
+
+def _probe(binary: str, index: PathIndex, settings: Dict[str, Any]) -> Dict[str, Any]:
+    path = index.which(binary)
+    if path is None:
+        return {'path': None}
+    if binary not in settings['probe']:
+        return {'path': path, 'stamp': _stamp(path), 'version': None}
+    args = settings['version_args'].get(binary, ['--version'])
+    return {'path': path, 'stamp': _stamp(path),
+            'version': probe_version(path, args, settings['timeout'])}
+
+
+def _same_release(found: str, locked: str) -> bool:
+    """Compare major.minor, ignoring Homebrew's _N revision suffix."""
+    return found.split('.')[:2] == locked.split('_')[0].split('.')[:2]
+
+
+def check_toolchain(settings: Dict[str, Any], project_dir: str,
+                    cache_dir: str) -> Tuple[List[str], List[str]]:
+    """Validate the Brewfile's commands; return (info, warnings) lines."""
+    from json_cache import JsonLRUCache, fingerprint, signing_key
+
+    brewfile = find_brewfile(project_dir)
+    if brewfile is None:
+        return [], []
+    try:
+        formulae = read_formulae(brewfile)
+    except OSError as e:
+        return [], [f"Could not read {brewfile}: {e}"]
+
+    binaries = {}
+    for formula in formulae:
+        binary = settings['binaries'].get(formula, formula)
+        if binary:  # libraries and shell plugins map to ''
+            binaries[formula] = binary
+
+    index = PathIndex()
+    # Entries describe commands, not the Brewfile, so every project shares them.
+    cache = JsonLRUCache(os.path.join(cache_dir, 'toolchain-cache.json'),
+                         max_entries=max(len(binaries) * 2, 256),
+                         fingerprint=fingerprint(index.fingerprint(), settings),
+                         key=signing_key(cache_dir))
+    results: Dict[str, Dict[str, Any]] = {}
+    stale = []
+    for binary in dict.fromkeys(binaries.values()):
+        entry = cache.get(binary)
+        if entry is not None and (entry['path'] is None or _stamp(entry['path']) == entry['stamp']):
+            results[binary] = entry
+        else:
+            stale.append(binary)
+
+    if stale:
+        from concurrent.futures import ThreadPoolExecutor
+
+        with ThreadPoolExecutor(max_workers=max(1, min(settings['workers'], len(stale)))) as pool:
+            for binary, entry in zip(stale, pool.map(lambda b: _probe(b, index, settings), stale)):
+                results[binary] = entry
+                cache.set(binary, entry)
+        cache.save()
+
+    warnings = []
+    missing = [formula for formula, binary in binaries.items() if results[binary]['path'] is None]
+    for formula in missing:
+        warnings.append(f"{formula} not found (listed in {os.path.basename(brewfile)})")
+    for formula, binary in binaries.items():
+        found, locked = results[binary].get('version'), formulae[formula]
+        if found and locked and not _same_release(found, locked):
+            warnings.append(f"{formula} {found} installed, lock file has {locked}")
+
+    info = [f"Toolchain: {len(binaries) - len(missing)} of {len(binaries)} "
+            f"{os.path.basename(brewfile)} commands available"]
+    return info, warnings
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Run a chain of hooks against a single decoded payload.
+Steps run in order and a blocking step (exit 2) short-circuits the rest,
+so cheap path checks skip the expensive content scan.
+
+Usage: dispatch.py <chain>   (chains are defined in hooks/lib/config.py)
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'lib'))
+
+from base_hook import BaseHook
+from config import get_dispatch_chains
+from hook_loader import load_hook_class
+
+
+class DispatchHook(BaseHook):
+    """Hook that runs a configured chain of hooks in one process."""
+
+    def __init__(self, chain: str = 'pre-edit'):
+        super().__init__('dispatch')
+        steps, chains = get_dispatch_chains()
+        if chain not in chains:
+            raise ValueError(f"Unknown dispatch chain: {chain}")
+
+        classes = {}
+        self.hooks = []
+        for step in chains[chain]:
+            script, args = steps[step]
+            if script not in classes:
+                classes[script] = load_hook_class(script)
+            self.hooks.append((step, classes[script](*args)))
+
+    def execute(self) -> int:
+        verdict = 0
+
+        for step, hook in self.hooks:
+            start = time.perf_counter()
+            hook.input_data = self.input_data
+            hook.stdout, hook.stderr = self.stdout, self.stderr
+            hook.long_lived = self.long_lived
+            try:
+                exit_code = hook.execute()
+            except Exception as e:
+                hook.handle_error(e)
+                exit_code = 0
+            self.time_step(step, start)
+
+            verdict = max(verdict, exit_code)
+            if exit_code == 2:
+                break
+
+        return verdict
+
+
+if __name__ == '__main__':
+    DispatchHook(*sys.argv[1:2]).run()
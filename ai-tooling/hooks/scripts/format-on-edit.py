@@ -3,48 +3,148 @@
 Auto-format files after Claude edits them.
 Detects file type and runs appropriate formatter.
 
+Registered for Stop with --flush, which formats anything async mode queued;
+with an empty queue (always so in sync mode) it exits before loading more.
+
 Original Source: https://github.com/CloudAI-X/claude-workflow
 """
 import sys
 import os
-import subprocess
-import shutil
-from pathlib import Path
+from typing import Optional
+
+if __name__ == '__main__' and '--flush' in sys.argv[1:]:
+    queue_dir = os.path.join(os.environ.get('CLAUDE_PROJECT_DIR', os.getcwd()), '.claude', 'format-queue')
+    try:
+        if not os.listdir(queue_dir):
+            sys.exit(0)
+    except OSError:
+        sys.exit(0)
 
-sys.path.insert(0, str(Path(__file__).parent.parent / 'lib'))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'lib'))
 
 from base_hook import BaseHook
-from config import get_formatters
+from config import get_format_settings, get_formatters
 
 
 class FormatOnEditHook(BaseHook):
     """Hook to auto-format files after editing."""
 
-    def __init__(self):
+    def __init__(self, *flags: str):
         super().__init__('format-on-edit')
+        self.flush_only = '--flush' in flags
         self.formatters = get_formatters()
+        self.settings = get_format_settings()
 
     def execute(self) -> int:
+        if self.flush_only or self.input_data.get('hook_event_name') == 'Stop':
+            self.flush_queue()
+            return 0
+
         file_path = self.get_file_path()
 
         if not file_path or not os.path.exists(file_path):
             return 0
 
+        if self.settings['mode'] == 'async':
+            if self.formatter_for(file_path):
+                from format_queue import FormatQueue
+                queue = FormatQueue(self.claude_dir())
+                queue.enqueue(file_path)
+                queue.ensure_worker([sys.executable, os.path.abspath(__file__), '--drain'])
+            return 0
+
+        self.format_file(file_path)
+        return 0
+
+    def formatter_for(self, file_path: str):
+        """Return the formatter configuration for a file, if it has a command."""
         ext = os.path.splitext(file_path)[1].lower()
         formatter_config = self.formatters.get(ext)
+        if not formatter_config or not formatter_config.get('command'):
+            return None
+        return formatter_config
 
-        if not formatter_config:
-            return 0
+    def format_file(self, file_path: str):
+        """Format one file unless it is already in a known formatted state."""
+        formatter_config = self.formatter_for(file_path)
+        if not formatter_config or not os.path.exists(file_path):
+            return
+
+        from json_cache import JsonLRUCache, file_digest
+
+        cache = JsonLRUCache(
+            os.path.join(self.claude_dir(), 'format-cache.json'),
+            max_entries=self.settings['cache_max_entries'],
+        )
+        key = os.path.abspath(file_path)
+        stamp = self.config_stamp(formatter_config)
+
+        if cache.get(key) != f"{stamp}:{file_digest(file_path)}":
+            if self.run_formatter(file_path, formatter_config):
+                cache.set(key, f"{stamp}:{file_digest(file_path)}")
+
+        cache.save()
 
-        command = formatter_config.get('command', [])
+    def safe_format_file(self, file_path: str):
+        """Format a queued file, logging instead of raising on errors."""
+        try:
+            self.format_file(file_path)
+        except Exception as e:
+            self.log_error(f"Formatter error for {file_path}: {str(e)}")
+
+    def flush_queue(self):
+        """Format every queued file before the turn ends."""
+        from format_queue import FormatQueue
+
+        FormatQueue(self.claude_dir()).flush(
+            self.safe_format_file,
+            workers=self.settings['queue_workers'],
+            timeout=self.settings['flush_timeout'],
+        )
+
+    def drain_queue(self):
+        """Background worker: format queued files until the queue stays idle."""
+        from format_queue import FormatQueue
+
+        self.long_lived = True
+        FormatQueue(self.claude_dir()).run_worker(
+            self.safe_format_file,
+            workers=self.settings['queue_workers'],
+            debounce=self.settings['debounce'],
+            idle_exit=self.settings['queue_idle_exit'],
+        )
+
+    def config_stamp(self, formatter_config) -> str:
+        """Fingerprint the formatter command and the project's formatter config files."""
+        from json_cache import fingerprint
+
+        project_dir = os.environ.get('CLAUDE_PROJECT_DIR', os.getcwd())
+        stamps = []
+        for name in self.settings['config_files']:
+            try:
+                stat = os.stat(os.path.join(project_dir, name))
+            except OSError:
+                continue
+            stamps.append((name, stat.st_mtime_ns, stat.st_size))
+        return fingerprint(formatter_config, stamps)
+
+    def run_formatter(self, file_path: str, formatter_config) -> bool:
+        """Run the configured formatter; return True if it succeeded."""
+        command = formatter_config['command']
         timeout = formatter_config.get('timeout', 10)
 
-        if not command:
-            return 0
+        worker = formatter_config.get('worker')
+        if self.long_lived and worker:
+            formatted = self.format_with_worker(worker, file_path, timeout)
+            if formatted is not None:
+                return formatted
+
+        import shutil
+        import subprocess
 
         formatter_bin = command[0]
         if not shutil.which(formatter_bin):
-            return 0
+            return False
 
         try:
             cmd = command + [file_path]
@@ -57,14 +157,32 @@ class FormatOnEditHook(BaseHook):
 
             if result.returncode != 0 and result.stderr:
                 self.log_error(f"Formatter failed for {file_path}: {result.stderr}")
+            return result.returncode == 0
 
         except subprocess.TimeoutExpired:
             self.log_error(f"Formatter timeout for {file_path}")
         except Exception as e:
             self.log_error(f"Formatter error for {file_path}: {str(e)}")
 
-        return 0
+        return False
+
+    def format_with_worker(self, worker: str, file_path: str, timeout: float) -> Optional[bool]:
+        """Format through a warm worker; return None to fall back to a subprocess."""
+        from formatter_pool import get_pool
+
+        project_dir = os.environ.get('CLAUDE_PROJECT_DIR', os.getcwd())
+        pool = get_pool(self.settings['worker_idle_timeout'])
+        try:
+            if pool.format(worker, os.path.abspath(file_path), project_dir, timeout):
+                return True
+        except Exception as e:
+            self.log_error(f"Formatter failed for {file_path}: {str(e)}")
+            return False
+        return None
 
 
 if __name__ == '__main__':
-    FormatOnEditHook().run()
+    if '--drain' in sys.argv[1:]:
+        FormatOnEditHook().drain_queue()
+    else:
+        FormatOnEditHook(*sys.argv[1:]).run()
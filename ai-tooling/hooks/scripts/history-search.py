@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Search the command history recorded by log-commands.
+
+Usage: history-search.py [TEXT...] [--description TEXT] [--since WHEN]
+                         [--until WHEN] [--session ID] [--limit N] [--json]
+WHEN is an ISO date/time (2025-01-31, 2025-01-31T14:00) or an age such as
+30m, 12h or 7d. The index (.claude/command-history.db) is brought up to date
+incrementally before every query.
+"""
+import argparse
+import json
+import os
+import re
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / 'lib'))
+
+from history_index import HistoryIndex, parse_time
+
+AGE_UNITS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400, 'w': 604800}
+
+
+def parse_when(value: str) -> float:
+    """Return the epoch for an ISO timestamp or a relative age like '7d'."""
+    match = re.fullmatch(r'(\d+(?:\.\d+)?)([smhdw])', value.strip())
+    if match:
+        return time.time() - float(match.group(1)) * AGE_UNITS[match.group(2)]
+    try:
+        return parse_time(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid time: {value!r}")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description='Search the command history.')
+    parser.add_argument('text', nargs='*', help='substrings the command must contain')
+    parser.add_argument('-d', '--description', help='substring of the description')
+    parser.add_argument('--since', type=parse_when, help='only entries at or after WHEN')
+    parser.add_argument('--until', type=parse_when, help='only entries before WHEN')
+    parser.add_argument('--session', help='only entries from this session id')
+    parser.add_argument('-n', '--limit', type=int, default=50, help='maximum results (default 50)')
+    parser.add_argument('--json', action='store_true', help='print results as JSON lines')
+    parser.add_argument('--project-dir', default=os.environ.get('CLAUDE_PROJECT_DIR', os.getcwd()),
+                        help='project whose .claude directory holds the history')
+    args = parser.parse_args(argv)
+
+    claude_dir = os.path.join(args.project_dir, '.claude')
+    if not os.path.isdir(claude_dir):
+        print(f"No .claude directory in {args.project_dir}", file=sys.stderr)
+        return 1
+
+    index = HistoryIndex(claude_dir)
+    try:
+        index.update()
+        results = index.search(args.text, description=args.description, since=args.since,
+                               until=args.until, session_id=args.session, limit=args.limit)
+    finally:
+        index.close()
+
+    for entry in reversed(results):
+        if args.json:
+            print(json.dumps({k: v for k, v in entry.items() if v is not None}))
+            continue
+        print(f"[{entry['ts']}] {entry['command']}")
+        if entry['description']:
+            print(f"  Description: {entry['description']}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
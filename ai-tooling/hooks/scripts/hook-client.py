@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Thin client that forwards a hook invocation to the hook daemon.
+
+Usage: hook-client.py [--timeout SECONDS] <hook-name> [args...]
+Example (claude-settings.json):
+  "command": "python3 ~/.claude/hooks/scripts/hook-client.py --timeout 20 dispatch pre-edit",
+  "timeout": 20
+
+Stdin is forwarded to the daemon and its stdout, stderr and exit code are
+relayed back. If the daemon is not running it is started in the background
+and this call runs the hook in-process, as it does whenever the daemon
+declines the request. Once a request is sent the hook is never run a second
+time here: the daemon may already be running it, and two runs of a formatter
+would write the same file at once. Pass the hook's timeout from
+claude-settings.json as --timeout so the client gives up (and says so) just
+before Claude would kill it.
+"""
+import json
+import os
+import socket
+import subprocess
+import sys
+
+HOOKS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+LIB_DIR = os.path.join(HOOKS_DIR, 'lib')
+DAEMON_SCRIPT = os.path.join(HOOKS_DIR, 'scripts', 'hook-daemon.py')
+
+sys.path.insert(0, LIB_DIR)
+
+from hook_daemon import socket_path
+
+CONNECT_TIMEOUT = 0.5
+# Seconds kept back from --timeout to report the missing answer.
+TIMEOUT_MARGIN = 0.5
+
+
+class NoAnswer(Exception):
+    """The request reached the daemon but no response came back."""
+
+
+def start_daemon():
+    """Spawn the daemon detached from this process."""
+    try:
+        subprocess.Popen(
+            [sys.executable, DAEMON_SCRIPT],
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            start_new_session=True,
+        )
+    except OSError:
+        pass
+
+
+def call_daemon(hook: str, args, payload: bytes, timeout):
+    """Send the request to the daemon; return its response, or None if it did not run the hook.
+
+    Raises NoAnswer when the request was sent but no response arrived.
+    """
+    if not hasattr(socket, 'AF_UNIX'):
+        return None
+
+    header = {'hook': hook, 'args': args, 'cwd': os.getcwd(), 'env': dict(os.environ)}
+    conn = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        conn.settimeout(CONNECT_TIMEOUT)
+        conn.connect(socket_path())
+        # A request cut short here has an incomplete payload, which the
+        # daemon cannot decode, so running the hook in-process is still safe.
+        conn.settimeout(timeout)
+        conn.sendall(json.dumps(header).encode('utf-8') + b'\n' + payload)
+        conn.shutdown(socket.SHUT_WR)
+    except OSError as e:
+        conn.close()
+        if isinstance(e, (FileNotFoundError, ConnectionRefusedError)):
+            start_daemon()
+        return None
+
+    try:
+        chunks = []
+        while True:
+            chunk = conn.recv(65536)
+            if not chunk:
+                break
+            chunks.append(chunk)
+        response = json.loads(b''.join(chunks))
+    except (OSError, ValueError) as e:
+        raise NoAnswer(str(e) or type(e).__name__)
+    finally:
+        conn.close()
+
+    if 'error' in response:
+        return None
+    return response
+
+
+def run_in_process(hook: str, args, payload: bytes) -> int:
+    """Fallback: load the hook class here and run it directly."""
+    import io
+    from hook_loader import load_hook_class
+
+    stdin = io.StringIO(payload.decode('utf-8', errors='replace'))
+    return load_hook_class(hook)(*args).invoke(stdin)
+
+
+def main() -> int:
+    argv = sys.argv[1:]
+    timeout = None
+    if argv[:1] == ['--timeout'] and len(argv) > 1:
+        timeout = max(float(argv[1]) - TIMEOUT_MARGIN, TIMEOUT_MARGIN)
+        argv = argv[2:]
+    if not argv:
+        print("Usage: hook-client.py [--timeout SECONDS] <hook-name> [args...]", file=sys.stderr)
+        return 0
+
+    hook, args = argv[0], argv[1:]
+    payload = sys.stdin.buffer.read()
+
+    try:
+        response = call_daemon(hook, args, payload, timeout)
+    except NoAnswer as e:
+        print(f"hook-client: no answer from the hook daemon for {hook} ({e}); "
+              f"not re-running it", file=sys.stderr)
+        return 0
+    if response is None:
+        try:
+            return run_in_process(hook, args, payload)
+        except Exception as e:
+            print(f"hook-client: {type(e).__name__}: {e}", file=sys.stderr)
+            return 0
+
+    sys.stdout.write(response.get('stdout', ''))
+    sys.stderr.write(response.get('stderr', ''))
+    return response.get('exit_code', 0)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,15 @@
+#!/usr/bin/env python3
+"""
+Hook daemon entry point.
+Hosts the hook classes in one warm process; started lazily by hook-client.py.
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'lib'))
+
+from hook_daemon import main
+
+
+if __name__ == '__main__':
+    sys.exit(main())
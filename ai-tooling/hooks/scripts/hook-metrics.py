@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+Report hook latency recorded with CLAUDE_HOOKS_METRICS=1.
+
+Usage: hook-metrics.py [--project-dir DIR] [--settings FILE] [--since-hours N]
+
+Prints p50/p95/p99 of the total time per hook and per (hook, event), the
+mean per-phase timings, and how often an invocation came within the
+configured fraction of its timeout in claude-settings.json.
+"""
+import argparse
+import gzip
+import json
+import math
+import os
+import re
+import sys
+import time
+from collections import defaultdict
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+sys.path.insert(0, str(Path(__file__).parent.parent / 'lib'))
+
+from config import get_metrics_settings
+from hook_log import JsonlLog
+
+PLUGIN_ROOT = Path(__file__).parent.parent.parent
+DEFAULT_TIMEOUT = 60
+COMMAND_HOOK = re.compile(r'scripts/([\w-]+)\.py(?:\s+([\w-]+))?')
+
+
+def read_records(path: str) -> Iterator[Dict[str, Any]]:
+    """Yield metrics records from the log and its rotated segments."""
+    for name in JsonlLog(path).segments() + [path]:
+        try:
+            f = gzip.open(name, 'rt') if name.endswith('.gz') else open(name)
+        except OSError:
+            continue
+        with f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                if isinstance(record, dict) and 'total_ms' in record:
+                    yield record
+
+
+def load_timeouts(settings_path: Optional[str]) -> Dict[Tuple[str, str], float]:
+    """Map (event, hook name) to its timeout in seconds."""
+    candidates = [settings_path] if settings_path else [
+        os.path.expanduser('~/.claude/settings.json'),
+        str(PLUGIN_ROOT / 'claude-settings.json'),
+    ]
+    for candidate in candidates:
+        try:
+            with open(candidate) as f:
+                settings = json.load(f)
+        except (OSError, ValueError):
+            continue
+        if isinstance(settings, dict) and settings.get('hooks'):
+            break
+    else:
+        return {}
+
+    timeouts = {}
+    for event, groups in settings.get('hooks', {}).items():
+        for group in groups:
+            for hook in group.get('hooks', []):
+                match = COMMAND_HOOK.search(hook.get('command', ''))
+                if not match:
+                    continue
+                script, arg = match.groups()
+                name = arg if script == 'hook-client' and arg else script
+                timeouts[(event, name)] = hook.get('timeout', DEFAULT_TIMEOUT)
+    return timeouts
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of sorted values."""
+    return values[max(0, math.ceil(pct / 100 * len(values)) - 1)]
+
+
+def summarize(rows: List[Dict[str, Any]], near: Optional[float]) -> List[str]:
+    totals = sorted(row['total_ms'] + row.get('startup_ms', 0) for row in rows)
+
+    def mean(key: str) -> str:
+        values = [row[key] for row in rows if key in row]
+        return f"{sum(values) / len(values):8.1f}" if values else f"{'-':>8}"
+
+    cells = [f"{len(rows):6d}"]
+    cells += [f"{percentile(totals, pct):8.1f}" for pct in (50, 95, 99)]
+    cells += [mean(key) for key in ('startup_ms', 'decode_ms', 'execute_ms')]
+    if near is None:
+        cells.append(f"{'-':>10}")
+    else:
+        hits = sum(1 for total in totals if total >= near)
+        cells.append(f"{hits:4d} {100 * hits / len(rows):4.1f}%")
+    return cells
+
+
+def main(argv=None) -> int:
+    settings = get_metrics_settings()
+    parser = argparse.ArgumentParser(description='Report hook latency percentiles.')
+    parser.add_argument('--project-dir', default=os.environ.get('CLAUDE_PROJECT_DIR', os.getcwd()))
+    parser.add_argument('--settings', help='claude settings file with hook timeouts')
+    parser.add_argument('--since-hours', type=float, help='only invocations from the last N hours')
+    args = parser.parse_args(argv)
+
+    path = os.path.join(args.project_dir, '.claude', settings['file'])
+    cutoff = time.time() - args.since_hours * 3600 if args.since_hours else None
+    by_hook: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+    by_event: Dict[Tuple[str, str], List[Dict[str, Any]]] = defaultdict(list)
+
+    for record in read_records(path):
+        if cutoff is not None:
+            try:
+                if datetime.fromisoformat(record['ts']).timestamp() < cutoff:
+                    continue
+            except (KeyError, ValueError):
+                continue
+        hook = record.get('hook', '?')
+        by_hook[hook].append(record)
+        by_event[(hook, record.get('event', '-'))].append(record)
+        for step, elapsed in record.get('steps', {}).items():
+            by_hook[f"{hook}:{step}"].append({'total_ms': elapsed})
+
+    if not by_hook:
+        print(f"No metrics in {path} (enable with CLAUDE_HOOKS_METRICS=1)", file=sys.stderr)
+        return 1
+
+    timeouts = load_timeouts(args.settings)
+    fraction = settings['near_timeout']
+    header = (f"{'count':>6} {'p50':>8} {'p95':>8} {'p99':>8} "
+              f"{'startup':>8} {'decode':>8} {'execute':>8} {'near-timeout':>10}")
+
+    print("Per hook (ms; totals include process start-up)")
+    print(f"{'hook':<32} {header}")
+    for hook in sorted(by_hook):
+        limits = [t for (_, name), t in timeouts.items() if name == hook]
+        near = min(limits) * 1000 * fraction if limits else None
+        print(f"{hook:<32} {' '.join(summarize(by_hook[hook], near))}")
+
+    print()
+    print(f"Per hook and event (near-timeout = within {fraction:.0%} of the configured timeout)")
+    print(f"{'hook / event':<32} {header}")
+    for hook, event in sorted(by_event):
+        timeout = timeouts.get((event, hook))
+        near = timeout * 1000 * fraction if timeout else None
+        label = f"{hook} / {event}"
+        print(f"{label:<32} {' '.join(summarize(by_event[(hook, event)], near))}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -4,35 +4,37 @@ Log all bash commands executed by Claude for auditing.
 
 Original Source: https://github.com/CloudAI-X/claude-workflow
 """
-import json
 import sys
 import os
-from datetime import datetime
-from pathlib import Path
 
-def main():
-    try:
-        input_data = json.load(sys.stdin)
-        command = input_data.get('tool_input', {}).get('command', '')
-        description = input_data.get('tool_input', {}).get('description', 'No description')
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'lib'))
 
-        if not command:
-            sys.exit(0)
+from base_hook import BaseHook
+
+
+class LogCommandsHook(BaseHook):
+    """Hook to append executed bash commands to the command history."""
 
-        log_dir = Path(os.environ.get('CLAUDE_PROJECT_DIR', os.getcwd())) / '.claude'
-        log_dir.mkdir(exist_ok=True)
-        log_file = log_dir / 'command-history.log'
+    def __init__(self):
+        super().__init__('log-commands')
+
+    def execute(self) -> int:
+        command = self.get_command()
+        description = self.input_data.get('tool_input', {}).get('description', 'No description')
+
+        if not command:
+            return 0
 
-        timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-        with open(log_file, 'a') as f:
-            f.write(f"[{timestamp}] {command}\n")
-            if description and description != 'No description':
-                f.write(f"  Description: {description}\n")
+        record = {'command': command}
+        if description and description != 'No description':
+            record['description'] = description
+        if self.input_data.get('session_id'):
+            record['session_id'] = self.input_data['session_id']
+        record['cwd'] = os.getcwd()
 
-    except Exception:
-        pass
+        self.write_log('command-history.jsonl', record)
+        return 0
 
-    sys.exit(0)
 
 if __name__ == '__main__':
-    main()
+    LogCommandsHook().run()
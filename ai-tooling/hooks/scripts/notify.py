@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+"""
+Notification and Stop hook - desktop notifications, coalesced.
+
+The hook only records the event and returns; a detached flusher shows one
+merged notification per window ("3 tasks completed") and rate-limits each
+urgency (see lib/notifier.py and the notify section of hooks-config.json).
+"""
+import sys
+import os
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'lib'))
+
+from base_hook import BaseHook
+from config import get_notify_settings, state_dir
+
+
+class NotifyHook(BaseHook):
+    """Hook to queue a desktop notification for the current event."""
+
+    def __init__(self):
+        super().__init__('notify')
+        self.settings = get_notify_settings()
+
+    def notifier(self):
+        from notifier import Notifier
+        return Notifier(state_dir(), self.settings)
+
+    def execute(self) -> int:
+        event = self.input_data.get('hook_event_name', 'Notification')
+        if event not in self.settings['events']:
+            return 0
+
+        notifier = self.notifier()
+        notifier.post(event, self.input_data.get('message'))
+        notifier.ensure_flusher([sys.executable, os.path.abspath(__file__), '--flush'])
+        return 0
+
+
+if __name__ == '__main__':
+    if '--flush' in sys.argv[1:]:
+        NotifyHook().notifier().run_flusher()
+    else:
+        NotifyHook().run()
@@ -0,0 +1,57 @@
+#!/usr/bin/env node
+// Long-lived Prettier worker for format-on-edit.
+// Reads one JSON request per line ({"file": "<path>"}) from stdin and answers
+// each with {"ok": true} or {"ok": false, "error": "<message>"} on stdout.
+// Exits with {"ok": false, "fatal": ...} when Prettier cannot be resolved.
+const fs = require("fs");
+const path = require("path");
+const readline = require("readline");
+
+function loadPrettier() {
+  try {
+    return require(require.resolve("prettier", { paths: [process.cwd()] }));
+  } catch (error) {
+    return null;
+  }
+}
+
+const prettier = loadPrettier();
+if (!prettier) {
+  process.stdout.write(JSON.stringify({ ok: false, fatal: "prettier not found" }) + "\n");
+  process.exit(1);
+}
+
+const ignorePath = path.join(process.cwd(), ".prettierignore");
+
+async function formatFile(file) {
+  const info = await prettier.getFileInfo(file, { ignorePath, resolveConfig: true });
+  if (info.ignored || !info.inferredParser) {
+    return;
+  }
+  const options = (await prettier.resolveConfig(file)) || {};
+  const source = fs.readFileSync(file, "utf8");
+  const output = await prettier.format(source, { ...options, filepath: file });
+  if (output !== source) {
+    fs.writeFileSync(file, output);
+  }
+}
+
+let queue = Promise.resolve();
+const lines = readline.createInterface({ input: process.stdin });
+
+lines.on("line", (line) => {
+  queue = queue.then(async () => {
+    let reply;
+    try {
+      await formatFile(JSON.parse(line).file);
+      reply = { ok: true };
+    } catch (error) {
+      reply = { ok: false, error: String((error && error.message) || error) };
+    }
+    process.stdout.write(JSON.stringify(reply) + "\n");
+  });
+});
+
+lines.on("close", () => {
+  queue.then(() => process.exit(0));
+});
@@ -5,14 +5,14 @@ Blocks edits to production configs, lock files, and sensitive directories.
 
 Original Source: https://github.com/CloudAI-X/claude-workflow
 """
+import os
 import sys
-from pathlib import Path
 
-sys.path.insert(0, str(Path(__file__).parent.parent / 'lib'))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'lib'))
 
 from base_hook import BaseHook
 from config import get_protected_patterns
-from pattern_matcher import matches_pattern
+from pattern_matcher import PathMatcher
 
 
 class ProtectFilesHook(BaseHook):
@@ -21,6 +21,8 @@ class ProtectFilesHook(BaseHook):
     def __init__(self):
         super().__init__('protect-files')
         self.blocked_patterns, self.warn_patterns = get_protected_patterns()
+        self.blocked_matcher = PathMatcher(self.blocked_patterns)
+        self.warn_matcher = PathMatcher(self.warn_patterns)
 
     def execute(self) -> int:
         file_path = self.get_file_path()
@@ -28,17 +30,17 @@ class ProtectFilesHook(BaseHook):
         if not file_path:
             return 0
 
-        blocked = matches_pattern(file_path, self.blocked_patterns)
+        blocked = self.blocked_matcher.match(file_path)
         if blocked:
-            print(f"🚫 BLOCKED: {file_path}")
-            print(f"   Matches protected pattern: {blocked}")
-            print("   Use --force if this is intentional")
+            print(f"🚫 BLOCKED: {file_path}", file=self.stdout)
+            print(f"   Matches protected pattern: {blocked}", file=self.stdout)
+            print("   Use --force if this is intentional", file=self.stdout)
             return 2
 
-        warned = matches_pattern(file_path, self.warn_patterns)
+        warned = self.warn_matcher.match(file_path)
         if warned:
-            print(f"⚠️ WARNING: Editing sensitive file: {file_path}")
-            print(f"   Matches pattern: {warned}")
+            print(f"⚠️ WARNING: Editing sensitive file: {file_path}", file=self.stdout)
+            print(f"   Matches pattern: {warned}", file=self.stdout)
 
         return 0
 
@@ -0,0 +1,634 @@
+#!/usr/bin/env python3
+"""
+Audit the regex pattern sets in the hook configuration.
+
+Usage: regex-audit.py [--set NAME] [--size BYTES] [--budget-ms MS] [--json]
+
+Every pattern set in config.py (merged with any hooks-config.json) is parsed
+and checked for nested quantifiers, quantifiers that overlap what follows
+them, prefixes that a search restarts on inside a run, and patterns made
+redundant by another one in the same set. Each pattern is then timed against
+worst-case inputs generated from its structure, growing up to --size, in a
+child process so that a catastrophic pattern cannot hang the audit. The time
+allowed is BUDGET_RATIO times a baseline regex timed first on the same
+machine, so the verdict does not depend on how fast that machine is.
+
+Exits 1 when a pattern is over budget, times out, nests unbounded
+quantifiers or is redundant.
+"""
+import argparse
+import json
+import math
+import os
+import re
+import subprocess
+import sys
+import time
+from typing import Any, Dict, FrozenSet, List, Optional, Sequence, Tuple
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'lib'))
+
+try:
+    from re import _parser as sre_parse  # Python 3.11+
+except ImportError:  # pragma: no cover - older interpreters
+    import sre_parse
+
+from config import get_config
+from pattern_matcher import HintMatcher
+
+MAXREPEAT = sre_parse.MAXREPEAT
+REPEATS = tuple(op for op in (sre_parse.MAX_REPEAT, sre_parse.MIN_REPEAT,
+                              getattr(sre_parse, 'POSSESSIVE_REPEAT', None)) if op is not None)
+ZERO_WIDTH = (sre_parse.AT, sre_parse.ASSERT, sre_parse.ASSERT_NOT)
+
+# Characters the analysis reasons about; enough to tell the classes apart.
+PROBE = frozenset([chr(c) for c in range(32, 127)] + ['\n', '\t', '\x00', 'é'])
+
+CATEGORIES = {
+    'CATEGORY_DIGIT': r'\d',
+    'CATEGORY_NOT_DIGIT': r'\D',
+    'CATEGORY_SPACE': r'\s',
+    'CATEGORY_NOT_SPACE': r'\S',
+    'CATEGORY_WORD': r'\w',
+    'CATEGORY_NOT_WORD': r'\W',
+}
+ANCHORS = {
+    'AT_BOUNDARY': r'\b',
+    'AT_NON_BOUNDARY': r'\B',
+    'AT_BEGINNING': '^',
+    'AT_BEGINNING_STRING': r'\A',
+    'AT_END': '$',
+    'AT_END_STRING': r'\Z',
+}
+
+SIZES_DIVISORS = (64, 16, 4, 1)
+# Allowed time per pattern, in linear passes of BASELINE_PATTERN over an
+# input of the same size (--budget-ms sets an absolute one).
+BUDGET_RATIO = 12.0
+BASELINE_PATTERN = r'(?<![a-z])[a-z]+@'
+MEASURE_TIMEOUT = 60
+
+
+# -- pattern sets ---------------------------------------------------------------
+
+def pattern_sets(config: Dict[str, Any]) -> Dict[str, List[Dict[str, Any]]]:
+    """Return every regex the hooks run, grouped as configured."""
+    secrets = [{'pattern': pattern, 'label': label, 'flags': 0, 'kind': 'regex'}
+               for pattern, label in config['secrets']['patterns']]
+    dangerous = [{'pattern': pattern, 'label': label, 'flags': re.IGNORECASE, 'kind': 'regex'}
+                 for pattern, label in config['prompts']['dangerous']]
+    hints = [{'pattern': pattern, 'label': hint, 'flags': re.IGNORECASE, 'kind': 'hint'}
+             for pattern, hint in config['prompts']['hints'].items()]
+    return {'secrets': secrets, 'dangerous': dangerous, 'hints': hints}
+
+
+# -- structure ----------------------------------------------------------------
+
+def _flatten(items) -> List[Tuple[Any, Any]]:
+    """Inline groups that carry no flags, so sequences read left to right."""
+    flat = []
+    for op, av in items:
+        if op is sre_parse.SUBPATTERN and not av[1] and not av[2]:
+            sub = list(av[3])
+            if not (len(sub) == 1 and sub[0][0] is sre_parse.BRANCH):
+                flat.extend(_flatten(sub))
+                continue
+        flat.append((op, av))
+    return flat
+
+
+def _variants(char: str, ignore_case: bool) -> Tuple[str, ...]:
+    return (char, char.lower(), char.upper()) if ignore_case else (char,)
+
+
+def _in_set(items, char: str, ignore_case: bool) -> bool:
+    negate = bool(items) and items[0][0] is sre_parse.NEGATE
+    hit = False
+    for op, av in items:
+        if op is sre_parse.NEGATE:
+            continue
+        for variant in _variants(char, ignore_case):
+            if op is sre_parse.LITERAL:
+                hit = variant == chr(av)
+            elif op is sre_parse.RANGE:
+                hit = av[0] <= ord(variant) <= av[1]
+            elif op is sre_parse.CATEGORY:
+                hit = bool(re.fullmatch(CATEGORIES.get(str(av), r'[\s\S]'), variant))
+            if hit:
+                return not negate
+    return negate
+
+
+def chars(op, av, flags: int) -> Optional[FrozenSet[str]]:
+    """Probe characters a single-character element matches (None: not one)."""
+    ignore_case = bool(flags & re.IGNORECASE)
+    if op is sre_parse.LITERAL:
+        return frozenset(c for c in PROBE if chr(av) in _variants(c, ignore_case))
+    if op is sre_parse.NOT_LITERAL:
+        return frozenset(c for c in PROBE if chr(av) not in _variants(c, ignore_case))
+    if op is sre_parse.ANY:
+        return PROBE if flags & re.DOTALL else PROBE - {'\n'}
+    if op is sre_parse.IN:
+        return frozenset(c for c in PROBE if _in_set(av, c, ignore_case))
+    return None
+
+
+def _sub_flags(av, flags: int) -> int:
+    return (flags | av[1]) & ~av[2]
+
+
+def consumes(items, flags: int) -> FrozenSet[str]:
+    """Every probe character some part of items can consume."""
+    found = set()
+    for op, av in items:
+        single = chars(op, av, flags)
+        if single is not None:
+            found |= single
+        elif op is sre_parse.SUBPATTERN:
+            found |= consumes(av[3], _sub_flags(av, flags))
+        elif op is sre_parse.BRANCH:
+            for alt in av[1]:
+                found |= consumes(alt, flags)
+        elif op in REPEATS or op is getattr(sre_parse, 'ATOMIC_GROUP', None):
+            found |= consumes(av[2] if op in REPEATS else av, flags)
+    return frozenset(found)
+
+
+def first(items, flags: int) -> Tuple[FrozenSet[str], bool]:
+    """Characters a match of items can start with, and whether it can be empty."""
+    found = set()
+    for op, av in items:
+        single = chars(op, av, flags)
+        if single is not None:
+            return frozenset(found | single), False
+        if op in ZERO_WIDTH:
+            continue
+        if op is sre_parse.SUBPATTERN:
+            sub, nullable = first(av[3], _sub_flags(av, flags))
+        elif op is sre_parse.BRANCH:
+            alts = [first(alt, flags) for alt in av[1]]
+            sub = frozenset().union(*(f for f, _ in alts))
+            nullable = any(n for _, n in alts)
+        elif op in REPEATS:
+            sub, nullable = first(av[2], flags)
+            nullable = nullable or av[0] == 0
+        else:
+            return PROBE, True  # back-references and the like: assume anything
+        found |= sub
+        if not nullable:
+            return frozenset(found), False
+    return frozenset(found), True
+
+
+def render(items) -> str:
+    """Approximate source text for a parsed fragment, for messages."""
+    out = []
+    for op, av in items:
+        if op is sre_parse.LITERAL:
+            out.append(re.escape(chr(av)))
+        elif op is sre_parse.NOT_LITERAL:
+            out.append(f'[^{re.escape(chr(av))}]')
+        elif op is sre_parse.ANY:
+            out.append('.')
+        elif op is sre_parse.IN:
+            body = ''
+            for item_op, item_av in av:
+                if item_op is sre_parse.NEGATE:
+                    body += '^'
+                elif item_op is sre_parse.LITERAL:
+                    body += re.escape(chr(item_av))
+                elif item_op is sre_parse.RANGE:
+                    body += f'{re.escape(chr(item_av[0]))}-{re.escape(chr(item_av[1]))}'
+                elif item_op is sre_parse.CATEGORY:
+                    body += CATEGORIES.get(str(item_av), '?')
+            out.append(f'[{body}]')
+        elif op is sre_parse.AT:
+            out.append(ANCHORS.get(str(av), ''))
+        elif op is sre_parse.SUBPATTERN:
+            sub = list(av[3])
+            if len(sub) == 1 and sub[0][0] is sre_parse.BRANCH:
+                inner = '|'.join(render(alt) for alt in sub[0][1][1])
+            else:
+                inner = render(sub)
+            out.append(f"({'' if av[0] else '?:'}{inner})")
+        elif op is sre_parse.BRANCH:
+            out.append('(?:' + '|'.join(render(alt) for alt in av[1]) + ')')
+        elif op in REPEATS:
+            low, high, body = av
+            text = render(body)
+            if len(body) > 1 or (body and body[0][0] is sre_parse.BRANCH):
+                text = f'(?:{text})'
+            quantifier = {(0, MAXREPEAT): '*', (1, MAXREPEAT): '+', (0, 1): '?'}.get((low, high))
+            if quantifier is None:
+                quantifier = (f'{{{low}}}' if low == high else
+                              f'{{{low},}}' if high == MAXREPEAT else f'{{{low},{high}}}')
+            if op is sre_parse.MIN_REPEAT:
+                quantifier += '?'
+            elif op is not sre_parse.MAX_REPEAT:
+                quantifier += '+'
+            out.append(text + quantifier)
+        else:
+            out.append('(…)')
+    return ''.join(out)
+
+
+def _unbounded(op, av) -> bool:
+    return op in REPEATS and av[1] == MAXREPEAT
+
+
+def _recurs(items, run: FrozenSet[str], flags: int) -> bool:
+    """Whether a match of items can start again inside a run of run's characters."""
+    for op, av in items:
+        single = chars(op, av, flags)
+        if single is not None:
+            if not single & run:
+                return False
+        elif op is sre_parse.ASSERT_NOT and av[0] < 0:
+            # A lookbehind that rejects every run character only lets a
+            # match start at the beginning of a run.
+            behind = consumes(av[1], flags)
+            if run <= behind:
+                return False
+        elif op is sre_parse.SUBPATTERN:
+            if not _recurs(av[3], run, _sub_flags(av, flags)):
+                return False
+        elif op is sre_parse.BRANCH:
+            if not any(_recurs(alt, run, flags) for alt in av[1]):
+                return False
+        elif op in REPEATS:
+            if av[0] and not _recurs(av[2], run, flags):
+                return False
+    return True
+
+
+def _has_nested(items) -> bool:
+    for op, av in items:
+        if _unbounded(op, av):
+            return True
+        if op is sre_parse.SUBPATTERN and _has_nested(av[3]):
+            return True
+        if op is sre_parse.BRANCH and any(_has_nested(alt) for alt in av[1]):
+            return True
+        if op in REPEATS and _has_nested(av[2]):
+            return True
+    return False
+
+
+def _check_nesting(items, findings: List[Tuple[str, str]]):
+    for op, av in items:
+        if op in REPEATS:
+            if av[1] > 1 and _has_nested(av[2]):
+                findings.append(('error', f"nested quantifier {render([(op, av)])}: "
+                                          "backtracking can be exponential"))
+            _check_nesting(av[2], findings)
+        elif op is sre_parse.SUBPATTERN:
+            _check_nesting(av[3], findings)
+        elif op is sre_parse.BRANCH:
+            for alt in av[1]:
+                _check_nesting(alt, findings)
+
+
+def analyze(pattern: str, flags: int) -> List[Tuple[str, str]]:
+    """Return (severity, message) findings for one pattern."""
+    parsed = sre_parse.parse(pattern, flags)
+    flags = parsed.state.flags
+    findings: List[Tuple[str, str]] = []
+    _check_nesting(list(parsed), findings)
+
+    sequence = _flatten(list(parsed))
+    for index, (op, av) in enumerate(sequence):
+        if not _unbounded(op, av) or op is getattr(sre_parse, 'POSSESSIVE_REPEAT', None):
+            continue
+        run = consumes(av[2], flags)
+        rest = sequence[index + 1:]
+        follow, rest_nullable = first(rest, flags)
+        node = render([(op, av)])
+        overlap = run & follow
+        if overlap:
+            findings.append(('warning', f"{node} overlaps what follows it "
+                                        f"(e.g. {_pick(overlap)!r}): a failed match backtracks "
+                                        "through the whole run"))
+        if not rest_nullable and _recurs(sequence[:index], run, flags):
+            prefix = render(sequence[:index])
+            where = f"{prefix!r} can recur inside a run of {node}" if prefix else \
+                f"the search restarts at every position of a run of {node}"
+            findings.append(('warning', f"{where}, so each start rescans the run (quadratic)"))
+    return findings
+
+
+def _ranges(codes: Sequence[int]) -> Tuple[Tuple[int, int], ...]:
+    merged: List[List[int]] = []
+    for low, high in sorted((code, code) if isinstance(code, int) else code for code in codes):
+        if merged and low <= merged[-1][1] + 1:
+            merged[-1][1] = max(merged[-1][1], high)
+        else:
+            merged.append([low, high])
+    return tuple(map(tuple, merged))
+
+
+def canonical(items) -> Tuple:
+    """A form that is equal for patterns differing only in spelling."""
+    out = []
+    for op, av in items:
+        if op in (sre_parse.LITERAL, sre_parse.IN):
+            members = [(sre_parse.LITERAL, av)] if op is sre_parse.LITERAL else av
+            negate = any(item_op is sre_parse.NEGATE for item_op, _ in members)
+            codes = [item_av for item_op, item_av in members
+                     if item_op in (sre_parse.LITERAL, sre_parse.RANGE)]
+            categories = sorted(str(item_av) for item_op, item_av in members
+                                if item_op is sre_parse.CATEGORY)
+            out.append(('set', negate, _ranges(codes), tuple(categories)))
+        elif op is sre_parse.SUBPATTERN:
+            out.append(('group', av[1], av[2], canonical(av[3])))
+        elif op is sre_parse.BRANCH:
+            out.append(('branch', tuple(canonical(alt) for alt in av[1])))
+        elif op in REPEATS:
+            out.append((str(op), av[0], av[1], canonical(av[2])))
+        elif op in (sre_parse.ASSERT, sre_parse.ASSERT_NOT):
+            out.append((str(op), av[0], canonical(av[1])))
+        else:
+            out.append((str(op), str(av)))
+    return tuple(out)
+
+
+def _contains(wide: Tuple[Tuple[int, int], ...], narrow: Tuple[Tuple[int, int], ...]) -> bool:
+    return all(any(low >= w_low and high <= w_high for w_low, w_high in wide)
+               for low, high in narrow)
+
+
+def _intersects(a: Tuple[Tuple[int, int], ...], b: Tuple[Tuple[int, int], ...]) -> bool:
+    return any(low <= b_high and b_low <= high for low, high in a for b_low, b_high in b)
+
+
+def covers(wide: Tuple, narrow: Tuple, sets=_contains) -> bool:
+    """Whether wide matches everything narrow does, judged node by node.
+
+    With ``sets=_intersects`` it instead tells whether the two have the same
+    shape and character classes that overlap, so some text matches both.
+    """
+    if len(wide) != len(narrow):
+        return False
+    for a, b in zip(wide, narrow):
+        if a == b:
+            continue
+        if a[0] != b[0]:
+            return False
+        if a[0] == 'set':
+            if a[1] or b[1] or a[3] != b[3] or not sets(a[2], b[2]):
+                return False
+        elif a[0] == 'branch':
+            if len(a[1]) != len(b[1]) or not all(covers(x, y, sets) for x, y in zip(a[1], b[1])):
+                return False
+        elif a[1:-1] != b[1:-1] or not isinstance(a[-1], tuple) or not covers(a[-1], b[-1], sets):
+            return False
+    return True
+
+
+def redundant(entries: List[Dict[str, Any]]) -> Dict[int, Tuple[int, str]]:
+    """Map each pattern to an earlier one in the set that makes it redundant."""
+    forms: List[Optional[Tuple]] = []
+    found = {}
+    for index, entry in enumerate(entries):
+        try:
+            parsed = sre_parse.parse(entry['pattern'], entry['flags'])
+        except re.error:
+            forms.append(None)
+            continue
+        form = (parsed.state.flags, canonical(list(parsed)))
+        forms.append(form)
+        for earlier, other in enumerate(forms[:-1]):
+            if other is None or other[0] != form[0]:
+                continue
+            if other == form:
+                found[index] = (earlier, 'duplicates')
+            elif covers(form[1], other[1]):
+                found[index] = (earlier, 'matches everything matched by')
+            elif covers(other[1], form[1]):
+                found[index] = (earlier, 'only matches what is already matched by')
+            elif covers(other[1], form[1], _intersects):
+                found[index] = (earlier, 'has the same shape as and overlaps')
+            else:
+                continue
+            break
+    return found
+
+
+# -- worst-case inputs ------------------------------------------------------------
+
+def _pick(options: FrozenSet[str]) -> str:
+    """A deterministic representative, preferring letters and digits."""
+    ordered = sorted(options)
+    return next((c for c in ordered if c.isalnum()), ordered[0])
+
+
+def sample(items, flags: int) -> str:
+    """A short string following items' structure."""
+    out = []
+    for op, av in items:
+        single = chars(op, av, flags)
+        if single is not None:
+            out.append(chr(av) if op is sre_parse.LITERAL else _pick(single) if single else '')
+        elif op is sre_parse.SUBPATTERN:
+            out.append(sample(av[3], _sub_flags(av, flags)))
+        elif op is sre_parse.BRANCH:
+            out.append(sample(av[1][0], flags))
+        elif op in REPEATS:
+            out.append(sample(av[2], flags) * max(av[0], 1))
+    return ''.join(out)
+
+
+def worst_inputs(pattern: str, flags: int, size: int) -> Dict[str, str]:
+    """Inputs of about size characters aimed at each unbounded quantifier."""
+    parsed = sre_parse.parse(pattern, flags)
+    flags = parsed.state.flags
+    sequence = _flatten(list(parsed))
+    inputs = {}
+
+    def fill(unit: str, tail: str = '') -> str:
+        return unit * max(1, (size - len(tail)) // max(len(unit), 1)) + tail
+
+    for index, (op, av) in enumerate(sequence):
+        if not _unbounded(op, av):
+            continue
+        prefix = sample(sequence[:index], flags)
+        run = consumes(av[2], flags)
+        if not run:
+            continue
+        follow, _ = first(sequence[index + 1:], flags)
+        pump = _pick(run & follow or run)
+        stop = _pick(PROBE - run - follow or PROBE - run or PROBE)
+        inputs[f'run@{index}'] = prefix + fill(pump, stop)
+        inputs[f'restart@{index}'] = fill(prefix + pump)
+        separators = sorted(c for c in run if not c.isalnum())
+        if separators:
+            inputs[f'restart-sep@{index}'] = fill(prefix + separators[0])
+    inputs['repeat-sample'] = fill(sample(sequence, flags)[:-1] + ' ')
+    return inputs
+
+
+def _time(search, text: str) -> float:
+    """Milliseconds for one search; quick ones are repeated to steady them."""
+    best = None
+    for _ in range(3):
+        start = time.perf_counter()
+        search(text)
+        elapsed = (time.perf_counter() - start) * 1000
+        best = elapsed if best is None else min(best, elapsed)
+        if elapsed > 10:
+            break
+    return best
+
+
+def baseline_ms(size: int) -> float:
+    """Milliseconds BASELINE_PATTERN takes on a size-character run."""
+    search = re.compile(BASELINE_PATTERN).search
+    text = 'a' * size
+    return min(_time(search, text) for _ in range(3))
+
+
+def measure(spec: Dict[str, Any]) -> Dict[str, Any]:
+    """Time one pattern on growing worst-case inputs (runs in the child)."""
+    pattern, flags, budget = spec['pattern'], spec['flags'], spec['budget_ms']
+    if spec['kind'] == 'hint':
+        matcher = HintMatcher([pattern], flags)
+        if matcher.terms[0] is not None:
+            search = matcher.first_match
+        else:
+            search = re.compile(pattern, flags).search
+    else:
+        search = re.compile(pattern, flags).search
+
+    worst = {'input': None, 'ms': 0.0, 'size': 0, 'growth': None, 'over': False}
+    for name in worst_inputs(pattern, flags, 16):
+        previous = None
+        for divisor in SIZES_DIVISORS:
+            size = max(spec['size'] // divisor, 16)
+            text = worst_inputs(pattern, flags, size)[name]
+            elapsed = _time(search, text)
+            growth = None
+            if previous is not None and previous[1] >= 0.5:
+                growth = math.log(elapsed / previous[1]) / math.log(size / previous[0])
+            previous = (size, elapsed)
+            over = elapsed > budget
+            if (over, size, elapsed) > (worst['over'], worst['size'], worst['ms']):
+                worst = {'input': name, 'ms': round(elapsed, 2), 'size': size,
+                         'growth': None if growth is None else round(growth, 2), 'over': over}
+            if over:
+                break
+    return worst
+
+
+def measure_in_child(entry: Dict[str, Any], size: int, budget_ms: float) -> Dict[str, Any]:
+    spec = dict(entry, size=size, budget_ms=budget_ms)
+    try:
+        result = subprocess.run([sys.executable, __file__, '--measure'],
+                                input=json.dumps(spec), capture_output=True, text=True,
+                                timeout=MEASURE_TIMEOUT)
+    except subprocess.TimeoutExpired:
+        return {'input': None, 'ms': None, 'size': None, 'growth': None, 'over': True,
+                'timed_out': True}
+    if result.returncode != 0:
+        return {'input': None, 'ms': None, 'size': None, 'growth': None, 'over': True,
+                'error': result.stderr.strip().splitlines()[-1:] or ['failed']}
+    return json.loads(result.stdout)
+
+
+# -- report -----------------------------------------------------------------
+
+def audit(sets: Dict[str, List[Dict[str, Any]]], size: int, budget_ms: float) -> List[Dict[str, Any]]:
+    results = []
+    for set_name, entries in sets.items():
+        overlaps = redundant(entries)
+        for index, entry in enumerate(entries):
+            keyword = entry['kind'] == 'hint' and HintMatcher([entry['pattern']]).terms[0] is not None
+            try:
+                findings = [] if keyword else analyze(entry['pattern'], entry['flags'])
+            except re.error as e:
+                findings = [('error', f"does not compile: {e}")]
+            if index in overlaps:
+                earlier, relation = overlaps[index]
+                findings.append(('error', f"{relation} {entries[earlier]['label']!r}: "
+                                          "the content is scanned twice for one kind of match"))
+            timing = measure_in_child(entry, size, budget_ms)
+            if timing.get('timed_out'):
+                findings.append(('error', f"timed out after {MEASURE_TIMEOUT}s on worst-case input"))
+            elif timing.get('error'):
+                findings.append(('error', f"measurement failed: {timing['error'][0]}"))
+            elif timing['over']:
+                findings.append(('error', f"{timing['ms']:.0f}ms on {timing['size']} chars of "
+                                          f"{timing['input']} input (budget {budget_ms:.0f}ms)"))
+            results.append({
+                'set': set_name,
+                'label': entry['label'],
+                'pattern': entry['pattern'],
+                'matcher': 'keywords' if keyword else 'regex',
+                'timing': timing,
+                'findings': [{'severity': severity, 'message': message}
+                             for severity, message in findings],
+            })
+    return results
+
+
+def print_report(results: List[Dict[str, Any]], size: int, budget_ms: float):
+    print(f"Worst-case inputs up to {size} chars; budget {budget_ms:.0f}ms per pattern\n")
+    current = None
+    for result in results:
+        if result['set'] != current:
+            current = result['set']
+            print(f"{current}")
+        severities = {finding['severity'] for finding in result['findings']}
+        status = '❌' if 'error' in severities else '⚠️ ' if severities else '✅'
+        timing = result['timing']
+        cost = f"{timing['ms']:8.1f}ms" if timing.get('ms') is not None else f"{'-':>10}"
+        growth = f"n^{timing['growth']:.1f}" if timing.get('growth') is not None else ''
+        label = result['label'][:40]
+        print(f"  {status} {label:<40} {cost} {growth:>6}  {result['matcher']}")
+        for finding in result['findings']:
+            print(f"       {finding['severity']}: {finding['message']}")
+    print()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description='Audit the hook regex patterns.')
+    parser.add_argument('--set', action='append', dest='sets',
+                        help='only this pattern set (secrets, dangerous, hints); repeatable')
+    parser.add_argument('--size', type=int, default=256 * 1024,
+                        help='largest worst-case input in characters (default 256K)')
+    parser.add_argument('--budget-ms', type=float,
+                        help=f'time allowed per pattern on the largest input (default '
+                             f'{BUDGET_RATIO:g}x a baseline regex on the same input)')
+    parser.add_argument('--json', action='store_true', help='print results as JSON')
+    parser.add_argument('--measure', action='store_true', help=argparse.SUPPRESS)
+    options = parser.parse_args(argv)
+
+    if options.measure:
+        print(json.dumps(measure(json.load(sys.stdin))))
+        return 0
+
+    sets = pattern_sets(get_config())
+    if options.sets:
+        unknown = set(options.sets) - set(sets)
+        if unknown:
+            parser.error(f"unknown pattern set: {', '.join(sorted(unknown))}")
+        sets = {name: sets[name] for name in options.sets}
+
+    budget_ms = options.budget_ms
+    if budget_ms is None:
+        budget_ms = BUDGET_RATIO * baseline_ms(options.size)
+    results = audit(sets, options.size, budget_ms)
+    if options.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print_report(results, options.size, budget_ms)
+
+    failed = sum(1 for result in results
+                 if any(finding['severity'] == 'error' for finding in result['findings']))
+    if failed:
+        print(f"❌ {failed} pattern(s) need attention", file=sys.stderr)
+        return 1
+    print("✅ All patterns within budget", file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,344 @@
+#!/usr/bin/env python3
+"""
+Scan a whole repository, or only what a change adds, for secrets with the
+security-check rules.
+
+Usage: scan-secrets.py [ROOT] [--jobs N] [--json]
+       scan-secrets.py [ROOT] --staged | --range REV..REV [--json]
+
+Files come from ``git ls-files`` (tracked plus untracked, minus anything
+.gitignore excludes), so ignored build output is never read. Files named in
+skip_files, test files and binary files are skipped, as in the hook. The
+rest are scanned on a process pool; files are memory-mapped and searched in
+place as bytes, so a large file is never copied into a Python string. Unlike
+the hook, which stops at what it needs to block an edit, every line a pattern
+matches is reported.
+
+--staged and --range scan only the lines a diff adds. The diff is read in
+one streaming pass, and each file's verdict is cached under its old and new
+blob SHAs in the per-user hook state directory, so unchanged files are not
+rescanned between runs (a pre-commit check costs time in proportion to the
+diff, not the repository).
+
+Only the first scan.max_scan_size bytes of a file are scanned. A longer file
+is reported as not fully scanned, which counts as a finding when
+scan.oversize is 'block' and is a warning when it is 'warn'.
+
+Exits with 1 when anything is found.
+"""
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'lib'))
+
+from config import get_scan_settings, get_secret_patterns, state_dir
+from pattern_matcher import is_test_file
+from secret_scanner import PatternScanner
+
+# Files smaller than this are read; mapping them costs more than the copy.
+MMAP_MIN_SIZE = 64 * 1024
+# Like git, a NUL byte in the first 8000 bytes marks a file as binary.
+BINARY_SNIFF = 8000
+_NEWLINE = re.compile(b'\n')
+
+_scanner = None
+_limit = None
+
+
+def list_files(root):
+    """Return the repository's files relative to root, honouring .gitignore."""
+    try:
+        result = subprocess.run(
+            ['git', '-C', root, 'ls-files', '-z', '--cached', '--others', '--exclude-standard'],
+            capture_output=True, check=True,
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return walk_files(root)
+    paths = result.stdout.decode('utf-8', 'surrogateescape').split('\0')
+    return [path for path in dict.fromkeys(paths) if path]
+
+
+def walk_files(root):
+    """Fallback outside a git work tree: every file except those under .git."""
+    paths = []
+    for directory, dirs, files in os.walk(root):
+        dirs[:] = [d for d in dirs if d != '.git']
+        rel = os.path.relpath(directory, root)
+        paths.extend(os.path.normpath(os.path.join(rel, name)) for name in files)
+    return paths
+
+
+def select_files(paths, skip_files):
+    """Apply the hook's policy; return (files to scan, number skipped)."""
+    selected = [path for path in paths
+                if os.path.basename(path) not in skip_files and not is_test_file(path)]
+    return selected, len(paths) - len(selected)
+
+
+def _init_worker(patterns, limit):
+    global _scanner, _limit
+    _scanner = PatternScanner(patterns, binary=True)
+    _limit = limit
+
+
+def scan_file(path):
+    """Scan one file; return ([(label, line)...], bytes scanned, size) or None if binary."""
+    import mmap
+
+    try:
+        with open(path, 'rb') as f:
+            size = os.fstat(f.fileno()).st_size
+            if size == 0:
+                return [], 0, 0
+            if size < MMAP_MIN_SIZE:
+                data = f.read()
+            else:
+                data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        return None
+    try:
+        if data.find(b'\0', 0, BINARY_SNIFF) >= 0:
+            return None
+        end = min(size, _limit)
+        hits = {}
+        line, counted = 1, 0
+        for index, offset in _scanner.find_all(data, end=end):
+            # Matches come in offset order, so each newline is counted once.
+            line += len(_NEWLINE.findall(data, counted, offset))
+            counted = offset
+            hits[(_scanner.patterns[index][1], line)] = None
+        return list(hits), end, size
+    finally:
+        if not isinstance(data, bytes):
+            data.close()
+
+
+def scan_batch(root, paths):
+    """Scan a batch of files in a worker.
+
+    Returns (findings, [(path, bytes scanned, size)...] for files cut short,
+    files scanned, binary files, bytes scanned).
+    """
+    findings = []
+    truncated = []
+    scanned = binary = total = 0
+    for path in paths:
+        result = scan_file(os.path.join(root, path))
+        if result is None:
+            binary += 1
+            continue
+        hits, end, size = result
+        scanned += 1
+        total += end
+        if end < size:
+            truncated.append((path, end, size))
+        findings.extend((path, label, line) for label, line in hits)
+    return findings, truncated, scanned, binary, total
+
+
+def scan_paths(root, paths, jobs, patterns, limit):
+    """Scan files on a pool of jobs processes; return the merged scan_batch totals."""
+    from concurrent.futures import ProcessPoolExecutor
+
+    # Several batches per worker keep the pool busy when file sizes vary.
+    batch_size = max(1, min(256, len(paths) // (jobs * 8) or 1))
+    batches = [paths[i:i + batch_size] for i in range(0, len(paths), batch_size)]
+    findings = []
+    truncated = []
+    scanned = binary = total = 0
+    with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker,
+                             initargs=(patterns, limit)) as pool:
+        for result in pool.map(scan_batch, [root] * len(batches), batches):
+            findings.extend(result[0])
+            truncated.extend(result[1])
+            scanned += result[2]
+            binary += result[3]
+            total += result[4]
+    findings.sort(key=lambda finding: (finding[0], finding[2]))
+    truncated.sort()
+    return findings, truncated, scanned, binary, total
+
+
+def diff_command(root, staged, rev_range):
+    return ['git', '-C', root, 'diff', '--no-color', '--no-ext-diff', '--full-index',
+            '--unified=0', *(['--cached'] if staged else [rev_range])]
+
+
+def read_diff(lines, skip):
+    """Parse a unified diff; yield (path, blob key, [(line number, text)...]).
+
+    ``lines`` are the diff's lines as bytes and the key is the 'old..new' blob
+    SHA pair. No lines are collected for a file ``skip(path, key)`` accepts;
+    it is yielded with None, so a cached file costs only reading past it.
+    """
+    path = key = added = None
+    line_number = 0
+    in_hunk = False
+    for line in lines:
+        if line.startswith(b'diff --git '):
+            if path is not None and (added is None or added):
+                yield path, key, added
+            path = key = added = None
+            in_hunk = False
+        elif in_hunk:
+            if line.startswith(b'@@ '):
+                line_number = _hunk_start(line)
+            elif added is None:
+                continue
+            elif line.startswith(b'+'):
+                added.append((line_number, line[1:].rstrip(b'\n')))
+                line_number += 1
+            elif not line.startswith((b'-', b'\\')):
+                line_number += 1
+        elif line.startswith(b'index '):
+            key = line.split()[1].decode('ascii')
+            if key.endswith('0' * 40):
+                key = None  # content not hashed by git: never cache it
+        elif line.startswith(b'+++ '):
+            # git ends names that contain spaces with a tab.
+            target = line[4:].rstrip(b'\n').rstrip(b'\t')
+            if target != b'/dev/null':
+                path = _unquote(target)[2:]  # strip 'b/'
+        elif line.startswith(b'@@ ') and path is not None:
+            line_number = _hunk_start(line)
+            in_hunk = True
+            added = None if skip(path, key) else []
+    if path is not None and (added is None or added):
+        yield path, key, added
+
+
+def _hunk_start(line):
+    """First new-file line number of a '@@ -a,b +c,d @@' header."""
+    new = line.split(b' ')[2]
+    return int(new[1:].split(b',')[0])
+
+
+def _unquote(path):
+    """Decode a diff path, which git C-quotes when it has unusual characters."""
+    if path.startswith(b'"') and path.endswith(b'"'):
+        import ast
+        return ast.literal_eval('b' + path.decode('ascii')).decode('utf-8', 'surrogateescape')
+    return path.decode('utf-8', 'surrogateescape')
+
+
+def scan_added(scanner, added):
+    """Scan a file's added lines; return [(label, line number)...] for every match."""
+    from bisect import bisect_right
+
+    text = b'\n'.join(line for _, line in added)
+    starts = []
+    offset = 0
+    for _, line in added:
+        starts.append(offset)
+        offset += len(line) + 1
+    hits = [(scanner.patterns[index][1], added[bisect_right(starts, position) - 1][0])
+            for index, position in scanner.find_all(text)]
+    return list(dict.fromkeys(hits))
+
+
+def scan_diff(root, staged, rev_range, patterns, skip_files):
+    """Scan the lines a diff adds; return (findings, files scanned, files from cache)."""
+    from json_cache import JsonLRUCache, fingerprint, signing_key
+
+    scanner = PatternScanner(patterns, binary=True)
+    # Kept with the hook verdicts, outside the scanned repository and signed,
+    # so a repository cannot ship entries that clear its own changes.
+    directory = state_dir()
+    cache = JsonLRUCache(os.path.join(directory, 'secret-scan-cache.json'),
+                         max_entries=get_scan_settings()['cache_max_entries'],
+                         fingerprint=fingerprint(patterns, 'all-matches'),
+                         key=signing_key(directory))
+    findings = []
+    scanned = cached = 0
+
+    def excluded(path):
+        return os.path.basename(path) in skip_files or is_test_file(path)
+
+    def skip(path, key):
+        return excluded(path) or (key is not None and cache.get(key) is not None)
+
+    proc = subprocess.Popen(diff_command(root, staged, rev_range), stdout=subprocess.PIPE)
+    try:
+        for path, key, added in read_diff(proc.stdout, skip):
+            if excluded(path):
+                continue
+            if added is None:
+                hits = cache.get(key)
+                cached += 1
+            else:
+                hits = scan_added(scanner, added)
+                if key:
+                    cache.set(key, hits)
+                scanned += 1
+            findings.extend((path, label, line) for label, line in hits)
+    finally:
+        proc.stdout.close()
+        if proc.wait() != 0:
+            raise SystemExit(f"git diff failed in {root}")
+    cache.save()
+    return findings, scanned, cached
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description='Scan a repository or a diff for secrets.')
+    parser.add_argument('root', nargs='?', default=os.environ.get('CLAUDE_PROJECT_DIR', os.getcwd()),
+                        help='repository to scan (default: the project directory)')
+    parser.add_argument('-j', '--jobs', type=int, default=os.cpu_count() or 1,
+                        help='worker processes (default: one per CPU)')
+    parser.add_argument('--json', action='store_true', help='print findings as JSON lines')
+    diff = parser.add_mutually_exclusive_group()
+    diff.add_argument('--staged', action='store_true',
+                      help='scan only the lines added by the staged changes')
+    diff.add_argument('--range', metavar='REV..REV',
+                      help='scan only the lines added by a commit range')
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    patterns, skip_files = get_secret_patterns()
+    settings = get_scan_settings()
+    truncated = []
+    if args.staged or args.range:
+        findings, scanned, cached = scan_diff(args.root, args.staged, args.range,
+                                              patterns, skip_files)
+        summary = f"in {scanned} changed files ({cached} unchanged since the last scan)"
+    else:
+        paths, skipped = select_files(list_files(args.root), skip_files)
+        findings, truncated, scanned, binary, total = scan_paths(
+            args.root, paths, max(args.jobs, 1), patterns, settings['max_scan_size'])
+        summary = (f"in {scanned} files ({total / (1024 * 1024):.1f} MB; {skipped} skipped by "
+                   f"policy, {binary} binary or unreadable) on {args.jobs} workers")
+    elapsed = time.perf_counter() - start
+    blocking = settings['oversize'] == 'block'
+
+    if args.json:
+        for path, label, line in findings:
+            print(json.dumps({'file': path, 'line': line, 'type': label}))
+        if blocking:
+            for path, end, size in truncated:
+                print(json.dumps({'file': path, 'line': None, 'type': 'Not fully scanned',
+                                  'scanned': end, 'size': size}))
+    else:
+        for path, label, line in findings:
+            print(f"❌ {path}:{line}: Potential {label} detected")
+        if blocking:
+            for path, end, size in truncated:
+                print(f"❌ {path}: Only the first {end} of {size} bytes were scanned for secrets")
+    if not blocking:
+        for path, end, size in truncated:
+            print(f"⚠️ {path}: Only the first {end} of {size} bytes were scanned for secrets",
+                  file=sys.stderr)
+    failed = bool(findings) or (blocking and bool(truncated))
+    if not args.json:
+        partly = f", {len(truncated)} not fully scanned," if truncated else ''
+        print(f"{'⚠️ ' if failed else '✅'} {len(findings)} finding(s){partly} {summary} "
+              f"in {elapsed:.2f}s", file=sys.stderr)
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -6,89 +6,182 @@ Blocks commits that might contain secrets or security issues.
 Original Source: https://github.com/CloudAI-X/claude-workflow
 """
 import sys
-import re
 import os
-from pathlib import Path
 
-sys.path.insert(0, str(Path(__file__).parent.parent / 'lib'))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'lib'))
 
 from base_hook import BaseHook
-from config import get_secret_patterns, get_security_reminders
-from pattern_matcher import is_test_file, normalize_file_path
+from config import (get_entropy_settings, get_scan_settings, get_secret_patterns,
+                    get_security_reminders, state_dir)
+from pattern_matcher import SubstringMatcher, is_test_file, normalize_file_path
+from secret_scanner import PatternScanner
 
 
 class SecurityCheckHook(BaseHook):
     """Hook to check for secrets and security issues."""
 
-    def __init__(self):
+    CHECKS = ('secrets', 'reminders')
+
+    def __init__(self, *checks: str):
         super().__init__('security-check')
+        self.checks = checks or self.CHECKS
         self.secret_patterns, self.skip_files = get_secret_patterns()
+        self.scanner = PatternScanner(self.secret_patterns) if 'secrets' in self.checks else None
+        self.scan_settings = get_scan_settings()
+        self.patterns_fingerprint = None
+        self.verdicts = None
+        self.entropy_settings = get_entropy_settings()
+        self.entropy_detector = None
         self.security_reminders = get_security_reminders()
+        self.content_rules = None
+        self.path_rules = None
 
     def execute(self) -> int:
         file_path = self.get_file_path()
-        content = self.get_content()
 
         if not file_path:
             return 0
 
-        issues = self.check_for_secrets(content, file_path) if content else []
-        reminders = self.check_for_reminders(file_path, content)
+        parts = self.get_content_parts()
+
+        issues = []
+        reminders = []
+        if 'secrets' in self.checks:
+            self.verdicts = None
+            blocking = self.entropy_settings['action'] == 'block'
+            for index, content in parts:
+                for issue in self.check_for_secrets(content, file_path):
+                    issues.append(issue if index is None else f"{issue} in edits[{index}]")
+                for finding in self.check_for_entropy(content, file_path):
+                    if index is not None:
+                        finding = f"{finding} in edits[{index}]"
+                    if blocking:
+                        issues.append(finding)
+                    else:
+                        reminders.append(finding)
+            if self.verdicts is not None:
+                self.verdicts.save()
+
+        if 'reminders' in self.checks:
+            for _, content in parts or [(None, '')]:
+                reminders.extend(self.check_for_reminders(file_path, content))
+        reminders = list(dict.fromkeys(reminders))
 
         if issues:
-            print(f"🚫 BLOCKED - Security issue detected in {file_path}:")
+            print(f"🚫 BLOCKED - Security issue detected in {file_path}:", file=self.stdout)
             for issue in issues:
-                print(f"  - {issue}")
-            print("\nThis edit has been BLOCKED to prevent committing secrets.")
-            print("If this is a false positive, review and adjust patterns in hooks/lib/config.py")
+                print(f"  - {issue}", file=self.stdout)
+            print("\nThis edit has been BLOCKED to prevent committing secrets.", file=self.stdout)
+            print(
+                "If this is a false positive, review and adjust patterns in hooks/lib/config.py",
+                file=self.stdout,
+            )
             return 2
 
         if reminders:
             for reminder in reminders:
-                print(f"⚠️ {reminder}", file=sys.stderr)
+                print(f"⚠️ {reminder}", file=self.stderr)
 
         return 0
 
+    def exempt(self, file_path: str) -> bool:
+        """Whether the file is excluded from secret checks (lock files, tests...)."""
+        return os.path.basename(file_path) in self.skip_files or is_test_file(file_path)
+
     def check_for_secrets(self, content: str, file_path: str):
         """Check content for potential secrets."""
         issues = []
 
-        if os.path.basename(file_path) in self.skip_files:
+        if self.exempt(file_path):
             return issues
 
-        if is_test_file(file_path):
-            return issues
-
-        for pattern, secret_type in self.secret_patterns:
-            matches = re.findall(pattern, content)
-            if matches:
-                issues.append(f"Potential {secret_type} detected")
+        for secret_type in self.cached_scan(content, file_path):
+            issues.append(f"Potential {secret_type} detected")
+
+        max_scan_size = self.scan_settings['max_scan_size']
+        if len(content) > max_scan_size:
+            message = (
+                f"Only the first {max_scan_size} of {len(content)} characters "
+                f"of {file_path} were scanned for secrets"
+            )
+            self.log_error(message)
+            if self.scan_settings['oversize'] == 'block':
+                issues.append(message)
+            else:
+                print(f"⚠️ {message}", file=self.stderr)
 
         return issues
 
+    def check_for_entropy(self, content: str, file_path: str):
+        """Check content for random-looking tokens no secret pattern knows."""
+        if self.entropy_settings['action'] == 'off' or self.exempt(file_path):
+            return []
+
+        from entropy import EntropyDetector, redact
+
+        if self.entropy_detector is None:
+            self.entropy_detector = EntropyDetector(self.entropy_settings)
+        findings = self.entropy_detector.scan(content, limit=self.scan_settings['max_scan_size'])
+        return [f"Potential secret: high-entropy string {redact(token)} ({value:.1f} bits/char)"
+                for token, value in findings]
+
+    def verdict_cache(self):
+        """Open the verdict cache on first use (small edits never need it)."""
+        if self.verdicts is None:
+            from json_cache import JsonLRUCache, fingerprint, signing_key
+
+            if self.patterns_fingerprint is None:
+                self.patterns_fingerprint = fingerprint(self.secret_patterns, self.scan_settings)
+            # Kept outside the project and signed, so a verdict planted in a
+            # repository (or edited) is rescanned rather than trusted.
+            directory = state_dir()
+            self.verdicts = JsonLRUCache(
+                os.path.join(directory, 'security-verdicts.json'),
+                max_entries=self.scan_settings['cache_max_entries'],
+                fingerprint=self.patterns_fingerprint,
+                key=signing_key(directory),
+            )
+        return self.verdicts
+
+    def cached_scan(self, content: str, file_path: str):
+        """Scan content, reusing the stored verdict for content seen before."""
+        if len(content) < self.scan_settings['cache_min_size']:
+            return self.scan_content(content, file_path)
+
+        from json_cache import content_digest
+
+        verdicts = self.verdict_cache()
+        key = content_digest(content)
+        secret_types = verdicts.get(key)
+        if secret_types is None:
+            secret_types = self.scan_content(content, file_path)
+            verdicts.set(key, secret_types)
+        return secret_types
+
+    def scan_content(self, content: str, file_path: str):
+        """Scan up to max_scan_size characters in one pass over the content."""
+        return self.scanner.scan(content, end=min(len(content), self.scan_settings['max_scan_size']))
+
+    def reminder_index(self):
+        """Compile the reminder rules on first use."""
+        if self.content_rules is None:
+            rules = self.security_reminders
+            self.content_rules = SubstringMatcher([rule.get('substrings', []) for rule in rules])
+            self.path_rules = SubstringMatcher([rule.get('path_substrings', []) for rule in rules])
+        return self.content_rules, self.path_rules
+
     def check_for_reminders(self, file_path: str, content: str):
         """Check for non-blocking security reminders."""
-        reminders = []
+        content_rules, path_rules = self.reminder_index()
         normalized_path = normalize_file_path(file_path)
 
-        for rule in self.security_reminders:
-            path_substrings = rule.get('path_substrings', [])
-            path_suffixes = rule.get('path_suffixes', [])
-            substrings = rule.get('substrings', [])
-
-            if path_substrings:
-                if any(substring in normalized_path for substring in path_substrings):
-                    if not path_suffixes or any(
-                        normalized_path.endswith(suffix) for suffix in path_suffixes
-                    ):
-                        reminders.append(rule['reminder'])
-                        continue
-
-            if content and substrings:
-                if any(substring in content for substring in substrings):
-                    reminders.append(rule['reminder'])
+        matched = content_rules.matches(content) if content else set()
+        for index in path_rules.matches(normalized_path):
+            suffixes = self.security_reminders[index].get('path_suffixes')
+            if not suffixes or normalized_path.endswith(tuple(suffixes)):
+                matched.add(index)
 
-        return reminders
+        return [self.security_reminders[index]['reminder'] for index in sorted(matched)]
 
 
 if __name__ == "__main__":
@@ -2,18 +2,49 @@
 """
 Test script to validate hooks are working correctly.
 Run this to verify hook configuration and functionality.
+
+Usage:
+  test-hooks.py                      run the functional tests end to end
+  test-hooks.py --mode inprocess -j8 run them against imported hook classes
+                                     on a pool of 8 workers
+  test-hooks.py --bench [options]    benchmark hooks on synthetic payloads
+                                     (see --help for baseline comparison)
+  test-hooks.py --startup            check each hook's cold start against the
+                                     start-up budget (-X importtime breakdown)
 """
+import argparse
+import io
 import json
+import os
+import platform
+import re
+import shlex
+import statistics
 import subprocess
 import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
 HOOKS_DIR = Path(__file__).parent
 PLUGIN_ROOT = HOOKS_DIR.parent
 
+sys.path.insert(0, str(PLUGIN_ROOT / 'lib'))
+
+from hook_loader import load_hook_class
+
+MODES = ('subprocess', 'inprocess')
+
 
-def test_hook(hook_name, test_input):
+def test_hook(hook_name, test_input, args=(), mode='subprocess'):
     """Test a hook with given input."""
+    if mode == 'inprocess':
+        return test_hook_inprocess(hook_name, test_input, args)
+
     hook_path = HOOKS_DIR / f"{hook_name}.py"
 
     if not hook_path.exists():
@@ -21,7 +52,7 @@ def test_hook(hook_name, test_input):
 
     try:
         result = subprocess.run(
-            ['python3', str(hook_path)],
+            ['python3', str(hook_path), *args],
             input=json.dumps(test_input),
             capture_output=True,
             text=True,
@@ -37,9 +68,329 @@ def test_hook(hook_name, test_input):
         return False, str(e)
 
 
-def main():
+@lru_cache(maxsize=None)
+def hook_class(hook_name):
+    return load_hook_class(hook_name)
+
+
+def test_hook_inprocess(hook_name, test_input, args=()):
+    """Test a hook by invoking its class in this process.
+
+    A fresh instance is used per call and its output is captured in memory,
+    so calls are independent and can run concurrently.
+    """
+    stdout, stderr = io.StringIO(), io.StringIO()
+    try:
+        hook = hook_class(hook_name)(*args)
+        exit_code = hook.invoke(io.StringIO(json.dumps(test_input)), stdout, stderr)
+    except SystemExit as e:
+        exit_code = e.code if isinstance(e.code, int) else (0 if e.code is None else 1)
+    except Exception as e:
+        return False, f"{type(e).__name__}: {e}"
+
+    return True, {
+        'exit_code': exit_code,
+        'stdout': stdout.getvalue(),
+        'stderr': stderr.getvalue()
+    }
+
+
+def use_scratch_project(project_dir):
+    """Point hooks at a scratch project, with their per-user state and config inside it."""
+    os.environ['CLAUDE_PROJECT_DIR'] = project_dir
+    os.environ['CLAUDE_HOOKS_STATE'] = os.path.join(project_dir, '.hooks-state')
+    os.environ['HOME'] = os.path.join(project_dir, '.home')
+
+
+# Long enough for security-check to cache its verdict.
+PLANTED_CONTENT = 'x = 1\n' * 1000 + 'TOKEN = ghp_' + 'c' * 36 + '\n'
+
+
+def plant_clean_verdict(content):
+    """Write a forged "clean" verdict for content, as a malicious checkout could."""
+    from config import get_scan_settings, get_secret_patterns, state_dir
+    from json_cache import content_digest, fingerprint
+
+    patterns, _ = get_secret_patterns()
+    settings = get_scan_settings()
+    os.makedirs(state_dir(), exist_ok=True)
+    with open(os.path.join(state_dir(), 'security-verdicts.json'), 'w') as f:
+        json.dump({'fingerprint': fingerprint(patterns, settings),
+                   'entries': {content_digest(content): [[], '0' * 128]}}, f)
+
+
+def stub_notify_send(project_dir):
+    """Put a notify-send on PATH that logs its arguments; return the log path."""
+    bin_dir = os.path.join(project_dir, 'bin')
+    log_path = os.path.join(project_dir, 'notify-send.log')
+    os.mkdir(bin_dir)
+    stub = os.path.join(bin_dir, 'notify-send')
+    with open(stub, 'w') as f:
+        f.write(f'#!/bin/sh\nprintf \'%s|\' "$@" >> {shlex.quote(log_path)}\necho >> {shlex.quote(log_path)}\n')
+    os.chmod(stub, 0o755)
+    os.environ['PATH'] = bin_dir + os.pathsep + os.environ.get('PATH', '')
+    return log_path
+
+
+def stub_unlisted_command(project_dir):
+    """Put a command the Brewfile lists but environment.probe does not on PATH.
+
+    Returns the file it creates if it is ever run.
+    """
+    marker = os.path.join(project_dir, 'rogue-tool.ran')
+    stub = os.path.join(project_dir, 'bin', 'rogue-tool')
+    with open(stub, 'w') as f:
+        f.write(f'#!/bin/sh\ntouch {shlex.quote(marker)}\n')
+    os.chmod(stub, 0o755)
+    return marker
+
+
+def check_toolchain_probe(project_dir, marker):
+    """Only allowlisted commands are run, and their cache stays out of the project."""
+    from config import state_dir
+
+    checks = [
+        (not os.path.exists(marker), 'rogue-tool from the Brewfile was run'),
+        (os.path.exists(os.path.join(state_dir(), 'toolchain-cache.json')),
+         'no toolchain cache in the state directory'),
+        (not os.path.exists(os.path.join(project_dir, '.claude', 'toolchain-cache.json')),
+         'toolchain cache written into the project'),
+    ]
+    failed = [message for ok, message in checks if not ok]
+    if failed:
+        return True, {'exit_code': 1, 'stdout': '', 'stderr': '; '.join(failed)}
+    return True, {'exit_code': 0, 'stdout': 'only allowlisted commands probed', 'stderr': ''}
+
+
+def check_notify_log(log_path, timeout=10.0):
+    """Once the notify tests' flusher is done, their events were shown from the state dir."""
+    import fcntl
+    from config import get_notify_settings, state_dir
+    from notifier import Notifier
+
+    notifier = Notifier(state_dir(), get_notify_settings())
+
+    def flushed():
+        if notifier.pending():
+            return False
+        fd = os.open(notifier.flusher_lock_path, os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            return True
+        except OSError:
+            return False  # a flusher is still showing what it took
+        finally:
+            os.close(fd)
+
+    deadline = time.monotonic() + timeout
+    while not flushed() and time.monotonic() < deadline:
+        time.sleep(0.05)
+    try:
+        with open(log_path) as f:
+            calls = f.read().splitlines()
+    except OSError:
+        calls = []
+    # However the flusher split them, two Stops and one Notification were shown.
+    tasks = sum(int(match.group(1) or 1)
+                for call in calls for match in re.finditer(r'(\d+)? ?[Tt]asks? completed', call))
+    permission = sum(call.count('Claude needs your permission') for call in calls)
+    checks = [
+        (tasks == 2 and permission == 1, f"expected 2 tasks and 1 permission request, got {calls}"),
+        (os.path.exists(notifier.state_path), 'no notify state in the state directory'),
+        (not os.path.exists(os.path.join(os.environ['CLAUDE_PROJECT_DIR'], '.claude',
+                                         'notify-state.json')),
+         'notify state written into the project'),
+    ]
+    failed = [message for ok, message in checks if not ok]
+    if failed:
+        return True, {'exit_code': 1, 'stdout': '', 'stderr': '; '.join(failed)}
+    return True, {'exit_code': 0, 'stdout': '\n'.join(calls), 'stderr': ''}
+
+
+class FakeClock:
+    """A clock for Notifier whose sleep moves time on instead of waiting."""
+
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def time(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+def clocked_notifier(state, settings, clock, shown):
+    """A Notifier on clock that records what it shows in shown."""
+    from notifier import Notifier
+
+    class RecordingNotifier(Notifier):
+        def show(self, message, sound, urgency):
+            shown.append((clock.now, message, urgency))
+
+    return RecordingNotifier(state, settings, clock.time, clock.sleep)
+
+
+def check_notify_coalescing(project_dir):
+    """Events in one window merge into one notification; the next waits out min_interval."""
+    from config import get_notify_settings
+
+    settings = dict(get_notify_settings(), window=1.5, min_interval={'low': 30, 'normal': 5})
+    clock = FakeClock()
+    start = clock.now
+    shown = []
+    notifier = clocked_notifier(os.path.join(project_dir, 'notify-clocked'), settings, clock, shown)
+    notifier.post('Stop')
+    clock.now += 0.5
+    notifier.post('Stop')
+    clock.now += 0.5
+    notifier.post('Notification', 'Claude needs your permission')
+    notifier.run_flusher()
+    notifier.post('Notification')
+    notifier.run_flusher()
+
+    expected = [(start + 1.5, '2 tasks completed; Claude needs your permission', 'normal'),
+                (start + 6.5, 'Claude needs your input', 'normal')]
+    if shown != expected or notifier.pending():
+        return True, {'exit_code': 1, 'stdout': '',
+                      'stderr': f"expected notifications {expected}, got {shown}"}
+    return True, {'exit_code': 0, 'stdout': '; '.join(message for _, message, _ in shown),
+                  'stderr': ''}
+
+
+def check_project_cannot_loosen(project_dir):
+    """A project config that removes or replaces protections must be ignored."""
+    import config
+    from layered_config import load
+
+    other = os.path.join(project_dir, 'loosening-project')
+    os.makedirs(os.path.join(other, '.claude'))
+    attempts = [
+        {'protected': {'blocked': ['*.pem']}},
+        {'protected': {'blocked': None}},
+        {'secrets': {'skip_files+': ['config.py']}},
+        {'scan': {'max_scan_size': 1, 'oversize': 'warn'}, 'entropy': {'action': 'off'}},
+        {'scan': {'max_scan_size': 64 * 1024 * 1024}},
+        {'scan': {'cache_min_size': 0}},
+        {'entropy': {'allowlist+': ['.*']}},
+        {'reminders': []},
+        {'formatters': {'.py': {'command': ['sh', '-c', 'id'], 'timeout': 1}}},
+        {'environment': {'version_args': {'git': ['-c', 'alias.x=!id', 'x']}}},
+    ]
+    tightening = {'scan': {'max_scan_size': 1024, 'oversize': 'block'},
+                  'entropy': {'action': 'block', 'hex_threshold': 2.5},
+                  'reminders+': [{'rule_name': 'extra', 'reminder': 'Check this'}]}
+    expected = config.defaults()
+    restricted = [section for section in config.PROJECT_RESTRICTIONS if section != 'environment']
+
+    def load_project(settings):
+        with open(os.path.join(other, '.claude', 'hooks-config.json'), 'w') as f:
+            json.dump(settings, f)
+        stderr = io.StringIO()
+        real_stderr, sys.stderr = sys.stderr, stderr
+        try:
+            loaded = load(config.DEFAULT_SECTIONS, config.SCHEMA, os.path.abspath(config.__file__),
+                          config.state_dir(), config.PROJECT_RESTRICTIONS, project_dir=other)
+        finally:
+            sys.stderr = real_stderr
+        return loaded, stderr.getvalue()
+
+    for attempt in attempts:
+        loaded, errors = load_project(attempt)
+        if (any(loaded[section] != expected[section] for section in restricted)
+                or 'file ignored' not in errors):
+            return True, {'exit_code': 1, 'stdout': '',
+                          'stderr': f"project config {attempt} was not rejected"}
+    loaded, errors = load_project(tightening)
+    if (errors or loaded['scan']['max_scan_size'] != 1024 or loaded['entropy']['action'] != 'block'
+            or loaded['reminders'][-1]['rule_name'] != 'extra'):
+        return True, {'exit_code': 1, 'stdout': '',
+                      'stderr': f"project config {tightening} was not applied: {errors}"}
+    return True, {'exit_code': 0, 'stdout': 'loosening project configs ignored', 'stderr': ''}
+
+
+def check_notify_unconfigured(project_dir):
+    """The flusher must drop events that are no longer configured and exit."""
+    from config import get_notify_settings
+
+    clock = FakeClock()
+    shown = []
+    notifier = clocked_notifier(os.path.join(project_dir, 'notify-unconfigured'),
+                                get_notify_settings(), clock, shown)
+    notifier.post('SubagentStop')  # e.g. removed from the events since it was posted
+    notifier.run_flusher()
+    if shown or notifier.pending():
+        return True, {'exit_code': 1, 'stdout': '',
+                      'stderr': f"unconfigured event shown {shown} or left pending"}
+    return True, {'exit_code': 0, 'stdout': 'unconfigured event dropped', 'stderr': ''}
+
+
+def make_scan_repo(project_dir):
+    """Create a git work tree with one secret each in places scan-secrets must skip."""
+    repo = os.path.join(project_dir, 'scan-repo')
+    token = 'ghp_' + 'd' * 36
+    files = {
+        '.gitignore': 'build/\n',
+        'build/generated.py': f"TOKEN = '{token}'\n",       # ignored by git
+        'assets/blob.bin': f"\0\1\2{token}",                # binary
+        'tests/test_client.py': f"TOKEN = '{token}'\n",      # test file
+        'src/settings.py': f"A = '{token}'\nB = 1\nC = '{token}'\n",
+        'data/fixtures.py': 'x = 1\n' * 50000,                # past max_scan_size
+    }
+    for name, content in files.items():
+        path = os.path.join(repo, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w') as f:
+            f.write(content)
+    subprocess.run(['git', 'init', '-q', repo], check=True)
+    return repo
+
+
+def check_scan_secrets(repo):
+    """scan-secrets must report every finding in src/settings.py and the file it cut short."""
+    result = subprocess.run(['python3', str(HOOKS_DIR / 'scan-secrets.py'), repo, '--json', '-j', '2'],
+                            capture_output=True, text=True, timeout=60)
+    findings = [(item['file'], item['line']) for item in map(json.loads, result.stdout.splitlines())]
+    expected = [('src/settings.py', 1), ('src/settings.py', 3), ('data/fixtures.py', None)]
+    if result.returncode == 1 and findings == expected:
+        return True, {'exit_code': 0, 'stdout': result.stdout, 'stderr': result.stderr}
+    return True, {'exit_code': 1, 'stdout': result.stdout,
+                  'stderr': f"expected findings {expected}, got {findings}\n{result.stderr}"}
+
+
+def check_scan_staged(repo):
+    """scan-secrets --staged must rescan only the staged file that changed."""
+    def scan():
+        return subprocess.run(['python3', str(HOOKS_DIR / 'scan-secrets.py'), repo, '--staged'],
+                              capture_output=True, text=True, timeout=60)
+
+    subprocess.run(['git', '-C', repo, 'add', '-A'], check=True)
+    first = scan()
+    with open(os.path.join(repo, 'src', 'settings.py'), 'a') as f:
+        f.write(f"D = '{'ghp_' + 'e' * 36}'\n")
+    subprocess.run(['git', '-C', repo, 'add', '-A'], check=True)
+    second = scan()
+
+    # Findings read '❌ path:line: ...'; the summary goes to stderr.
+    lines = [[int(finding.split(':')[1]) for finding in run.stdout.splitlines()]
+             for run in (first, second)]
+    checks = [
+        (lines == [[1, 3], [1, 3, 4]], f"expected findings on lines [1, 3] then [1, 3, 4], got {lines}"),
+        ('(0 unchanged since the last scan)' in first.stderr, 'first run hit the cache'),
+        ('in 1 changed files (2 unchanged since the last scan)' in second.stderr,
+         'second run did not rescan only src/settings.py'),
+    ]
+    failed = [message for ok, message in checks if not ok]
+    if not failed:
+        return True, {'exit_code': 0, 'stdout': second.stdout, 'stderr': second.stderr}
+    return True, {'exit_code': 1, 'stdout': '',
+                  'stderr': '; '.join(failed) + f"\n{first.stderr}{second.stderr}"}
+
+
+def run_tests(mode='subprocess', jobs=1):
     """Run hook tests."""
     print("🧪 Testing Claude Code Hooks\n")
+    print(f"Mode: {mode}, jobs: {jobs}")
     print("=" * 60)
 
     tests = [
@@ -55,6 +406,18 @@ def main():
             'input': {'tool_input': {'file_path': '.env'}},
             'expected_exit': 2
         },
+        {
+            'name': 'protect-files (pattern added by .claude/hooks-config.json)',
+            'hook': 'protect-files',
+            'input': {'tool_input': {'file_path': 'certs/server.pem'}},
+            'expected_exit': 2
+        },
+        {
+            'name': 'protect-files (hooks config is protected)',
+            'hook': 'protect-files',
+            'input': {'tool_input': {'file_path': '.claude/hooks-config.json'}},
+            'expected_exit': 2
+        },
         {
             'name': 'security-check (clean content)',
             'hook': 'security-check',
@@ -66,6 +429,19 @@ def main():
             },
             'expected_exit': 0
         },
+        {
+            'name': 'security-check (reminders for workflow and os.system)',
+            'hook': 'security-check',
+            'args': ['reminders'],
+            'input': {
+                'tool_input': {
+                    'file_path': '.github/workflows/deploy.yml',
+                    'content': 'run: python -c "import os; os.system(cmd)"\n'
+                }
+            },
+            'expected_exit': 0,
+            'expected_output': ['GitHub Actions workflow', '`os.system()` is unsafe']
+        },
         {
             'name': 'security-check (API key detected)',
             'hook': 'security-check',
@@ -77,6 +453,60 @@ def main():
             },
             'expected_exit': 2
         },
+        {
+            'name': "security-check (database URL with a long, %-encoded password)",
+            'hook': 'security-check',
+            'input': {
+                'tool_input': {
+                    'file_path': 'settings.py',
+                    'content': ('DATABASE_URL = "postgres://app:s3cr%2Ft+pw' + 'x' * 300
+                                + '@db.internal:5432/app"\n')
+                }
+            },
+            'expected_exit': 2,
+            'expected_output': ['Database URL with credentials']
+        },
+        {
+            'name': 'security-check (API key after text that lower() lengthens)',
+            'hook': 'security-check',
+            'input': {
+                'tool_input': {
+                    'file_path': 'config.py',
+                    'content': 'İ' * 200 + 'api_key = "abcd1234efgh5678ijkl9012mnop3456"\n'
+                }
+            },
+            'expected_exit': 2
+        },
+        {
+            'name': 'security-check (secret past max_scan_size blocks)',
+            'hook': 'security-check',
+            'input': {
+                'tool_input': {
+                    'file_path': 'data.py',
+                    'content': 'x = 1\n' * 50000 + 'TOKEN = ghp_' + 'b' * 36 + '\n'
+                }
+            },
+            'expected_exit': 2,
+            'expected_output': ['were scanned for secrets']
+        },
+        {
+            'name': 'security-check (planted clean verdict is not trusted)',
+            'hook': 'security-check',
+            'input': {'tool_input': {'file_path': 'app.py', 'content': PLANTED_CONTENT}},
+            'expected_exit': 2
+        },
+        {
+            'name': 'security-check (high-entropy token warns)',
+            'hook': 'security-check',
+            'input': {
+                'tool_input': {
+                    'file_path': 'src/client.py',
+                    'content': 'INTERNAL_TOKEN = "q8Zr2LwX4vN7kT1pY6sB9mC3hJ5fD0gA"\n'
+                }
+            },
+            'expected_exit': 0,
+            'expected_output': ['high-entropy string']
+        },
         {
             'name': 'security-check (MultiEdit secret detected)',
             'hook': 'security-check',
@@ -90,6 +520,57 @@ def main():
             },
             'expected_exit': 2
         },
+        {
+            'name': 'security-check (MultiEdit secret in a later edit)',
+            'hook': 'security-check',
+            'input': {
+                'tool_input': {
+                    'file_path': 'config.py',
+                    'edits': [
+                        {'new_string': 'name = "app"\n'},
+                        {'new_string': 'name = "app"\n'},
+                        {'new_string': 'TOKEN = ghp_' + 'b' * 36 + '\n'}
+                    ]
+                }
+            },
+            'expected_exit': 2
+        },
+        {
+            'name': 'dispatch (blocked file short-circuits scan)',
+            'hook': 'dispatch',
+            'args': ['pre-edit'],
+            'input': {
+                'tool_input': {
+                    'file_path': '.env',
+                    'content': 'API_KEY = sk-' + 'a' * 48 + '\n'
+                }
+            },
+            'expected_exit': 2
+        },
+        {
+            'name': 'dispatch (secret detected)',
+            'hook': 'dispatch',
+            'args': ['pre-edit'],
+            'input': {
+                'tool_input': {
+                    'file_path': 'config.py',
+                    'content': 'API_KEY = sk-' + 'a' * 48 + '\n'
+                }
+            },
+            'expected_exit': 2
+        },
+        {
+            'name': 'dispatch (clean edit)',
+            'hook': 'dispatch',
+            'args': ['pre-edit'],
+            'input': {
+                'tool_input': {
+                    'file_path': 'src/app.py',
+                    'content': 'print("hello")\n'
+                }
+            },
+            'expected_exit': 0
+        },
         {
             'name': 'format-on-edit',
             'hook': 'format-on-edit',
@@ -102,12 +583,27 @@ def main():
             'input': {},
             'expected_exit': 0
         },
+        {
+            'name': 'validate-environment (Brewfile toolchain)',
+            'hook': 'validate-environment',
+            'input': {'hook_event_name': 'SessionStart', 'source': 'resume'},
+            'expected_exit': 0,
+            'expected_output': ['not-installed not found (listed in Brewfile)']
+        },
         {
             'name': 'validate-prompt (normal prompt)',
             'hook': 'validate-prompt',
             'input': {'prompt': 'Help me write a function'},
             'expected_exit': 0
         },
+        {
+            'name': 'validate-prompt (500KB pasted log)',
+            'hook': 'validate-prompt',
+            'input': {'prompt': 'review this failure:\n' +
+                      'ERROR worker crashed while checking request state\n' * 10000},
+            'expected_exit': 0,
+            'expected_output': ['debugger agent']
+        },
         {
             'name': 'log-commands',
             'hook': 'log-commands',
@@ -119,35 +615,115 @@ def main():
             },
             'expected_exit': 0
         },
+        {
+            'name': 'notify (Stop)',
+            'hook': 'notify',
+            'input': {'hook_event_name': 'Stop'},
+            'expected_exit': 0
+        },
+        {
+            'name': 'notify (second Stop in the window)',
+            'hook': 'notify',
+            'input': {'hook_event_name': 'Stop'},
+            'expected_exit': 0
+        },
+        {
+            'name': 'notify (Notification)',
+            'hook': 'notify',
+            'input': {'hook_event_name': 'Notification', 'message': 'Claude needs your permission'},
+            'expected_exit': 0
+        },
     ]
 
     passed = 0
     failed = 0
 
-    for test in tests:
+    def run(test):
+        return test_hook(test['hook'], test['input'], test.get('args', ()), mode)
+
+    if mode == 'inprocess':
+        # Import every hook up front rather than racing on first use.
+        for name in dict.fromkeys(test['hook'] for test in tests):
+            try:
+                hook_class(name)
+            except Exception:
+                pass  # reported by the test itself
+
+    # Hooks keep state (logs, caches) under the project's .claude directory;
+    # point them at a scratch project so test runs leave the tree untouched.
+    with tempfile.TemporaryDirectory() as project_dir:
+        use_scratch_project(project_dir)
+        os.mkdir(os.path.join(project_dir, '.claude'))
+        with open(os.path.join(project_dir, '.claude', 'hooks-config.json'), 'w') as f:
+            json.dump({'protected': {'blocked+': ['*.pem']},
+                       'scan': {'max_scan_size': 256 * 1024},
+                       'notify': {'backend': 'notify-send', 'window': 0.2,
+                                  'min_interval': {'low': 0, 'normal': 0}}}, f)
+        os.makedirs(os.path.join(project_dir, '.home', '.claude'))
+        with open(os.path.join(project_dir, '.home', '.claude', 'hooks-config.json'), 'w') as f:
+            json.dump({'environment': {'toolchain': True}}, f)
+        with open(os.path.join(project_dir, 'Brewfile'), 'w') as f:
+            f.write('brew "git"\nbrew "python"\nbrew "example/tap/not-installed"\n'
+                    'brew "rogue-tool"\ncask "firefox"\n')
+        notify_log = stub_notify_send(project_dir)
+        probe_marker = stub_unlisted_command(project_dir)
+        plant_clean_verdict(PLANTED_CONTENT)
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=max(jobs, 1)) as pool:
+            outcomes = list(pool.map(run, tests))
+        tests.append({'name': 'validate-environment (Brewfile commands off environment.probe not run)',
+                      'hook': 'validate-environment', 'expected_exit': 0})
+        outcomes.append(check_toolchain_probe(project_dir, probe_marker))
+        tests.append({'name': 'notify (hook events shown from the state dir)',
+                      'hook': 'notify', 'expected_exit': 0})
+        outcomes.append(check_notify_log(notify_log))
+        tests.append({'name': 'notify (events merged per window, then rate-limited)',
+                      'hook': 'notify', 'expected_exit': 0})
+        outcomes.append(check_notify_coalescing(project_dir))
+        tests.append({'name': 'notify (flusher drops unconfigured events)',
+                      'hook': 'notify', 'expected_exit': 0})
+        outcomes.append(check_notify_unconfigured(project_dir))
+        tests.append({'name': 'config (project cannot loosen security sections)',
+                      'hook': 'config', 'expected_exit': 0})
+        outcomes.append(check_project_cannot_loosen(project_dir))
+        tests.append({'name': 'scan-secrets (skips ignored, binary and test files; lists every finding and oversize file)',
+                      'hook': 'scan-secrets', 'expected_exit': 0})
+        scan_repo = make_scan_repo(project_dir)
+        outcomes.append(check_scan_secrets(scan_repo))
+        tests.append({'name': 'scan-secrets --staged (cache miss, then hit for unchanged files)',
+                      'hook': 'scan-secrets', 'expected_exit': 0})
+        outcomes.append(check_scan_staged(scan_repo))
+        elapsed = time.perf_counter() - start
+
+    for test, (success, result) in zip(tests, outcomes):
         print(f"\n📋 Test: {test['name']}")
         print(f"   Hook: {test['hook']}")
 
-        success, result = test_hook(test['hook'], test['input'])
-
         if not success:
             print(f"   ❌ FAILED: {result}")
             failed += 1
             continue
 
-        if result['exit_code'] == test['expected_exit']:
+        output = result['stdout'] + result['stderr']
+        missing = [text for text in test.get('expected_output', ()) if text not in output]
+        if result['exit_code'] == test['expected_exit'] and not missing:
             print(f"   ✅ PASSED (exit code: {result['exit_code']})")
             if result['stdout']:
                 print(f"   Output: {result['stdout'].strip()[:100]}")
             passed += 1
         else:
-            print(f"   ❌ FAILED: Expected exit {test['expected_exit']}, got {result['exit_code']}")
+            if result['exit_code'] != test['expected_exit']:
+                print(f"   ❌ FAILED: Expected exit {test['expected_exit']}, got {result['exit_code']}")
+            else:
+                print(f"   ❌ FAILED: Expected output {missing[0]!r}")
+                print(f"   Output: {result['stdout'].strip()}")
             if result['stderr']:
                 print(f"   Error: {result['stderr'].strip()}")
             failed += 1
 
     print("\n" + "=" * 60)
-    print(f"\n📊 Results: {passed} passed, {failed} failed out of {len(tests)} tests")
+    print(f"\n📊 Results: {passed} passed, {failed} failed out of {len(tests)} tests"
+          f" in {elapsed:.2f}s")
 
     if failed == 0:
         print("✅ All hooks are working correctly!\n")
@@ -157,5 +733,374 @@ def main():
         return 1
 
 
+# -- benchmarks ---------------------------------------------------------------
+
+KB = 1024
+MB = 1024 * 1024
+
+CODE_BLOCK = """def handler_{n}(request, retries=3):
+    \"\"\"Process request {n} and return a response dict.\"\"\"
+    payload = {{'id': {n}, 'items': [item for item in request.items if item.enabled]}}
+    for attempt in range(retries):
+        result = client.send('/api/v1/items/{n}', payload, timeout=30)
+        if result.status == 200:
+            return {{'ok': True, 'data': result.json(), 'attempt': attempt}}
+    logger.warning('request %s failed after %s attempts', {n}, retries)
+    return {{'ok': False}}
+
+"""
+
+
+def code_content(size: int, seed: int) -> str:
+    """Secret-free, code-like text of exactly size characters."""
+    block = ''.join(CODE_BLOCK.format(n=seed * 1000 + n) for n in range(8))
+    return (f"# benchmark run {seed}\n" + block * (size // len(block) + 1))[:size]
+
+
+def write_case(size: int) -> Callable[[int], Dict[str, Any]]:
+    def make(seed: int) -> Dict[str, Any]:
+        return {'hook_event_name': 'PreToolUse', 'tool_name': 'Write',
+                'tool_input': {'file_path': 'src/service/handlers.py',
+                               'content': code_content(size, seed)}}
+    return make
+
+
+def multiedit_case(edits: int) -> Callable[[int], Dict[str, Any]]:
+    def make(seed: int) -> Dict[str, Any]:
+        return {'hook_event_name': 'PreToolUse', 'tool_name': 'MultiEdit',
+                'tool_input': {'file_path': 'src/service/handlers.py', 'edits': [
+                    {'old_string': f'handler_{i}(', 'new_string': code_content(600, seed * edits + i)}
+                    for i in range(edits)
+                ]}}
+    return make
+
+
+def deep_path_case(depth: int) -> Callable[[int], Dict[str, Any]]:
+    def make(seed: int) -> Dict[str, Any]:
+        path = '/'.join(f'level{i}-{seed}' for i in range(depth)) + '/module.py'
+        return {'hook_event_name': 'PreToolUse', 'tool_name': 'Write',
+                'tool_input': {'file_path': path, 'content': code_content(KB, seed)}}
+    return make
+
+
+def prompt_case(size: int) -> Callable[[int], Dict[str, Any]]:
+    sentence = 'Please refactor the billing module and update the tests accordingly. '
+
+    def make(seed: int) -> Dict[str, Any]:
+        prompt = (f'Run {seed}: ' + sentence * (size // len(sentence) + 1))[:size]
+        return {'hook_event_name': 'UserPromptSubmit', 'prompt': prompt}
+    return make
+
+
+def command_case(size: int) -> Callable[[int], Dict[str, Any]]:
+    def make(seed: int) -> Dict[str, Any]:
+        command = f'echo run-{seed} && ' + ' '.join(['ls -la src/'] * (size // 11 + 1))
+        return {'hook_event_name': 'PreToolUse', 'tool_name': 'Bash',
+                'tool_input': {'command': command[:size], 'description': 'List sources'}}
+    return make
+
+
+# (hook, args, case name, payload size in bytes for throughput, generator)
+BENCH_CASES: List[Tuple[str, Tuple[str, ...], str, int, Callable[[int], Dict[str, Any]]]] = [
+    *[('security-check', (), f'write-{label}', size, write_case(size))
+      for label, size in (('1KB', KB), ('64KB', 64 * KB), ('1MB', MB), ('10MB', 10 * MB),
+                          ('50MB', 50 * MB))],
+    ('security-check', (), 'multiedit-200', 200 * 600, multiedit_case(200)),
+    ('security-check', (), 'multiedit-500', 500 * 600, multiedit_case(500)),
+    ('dispatch', ('pre-edit',), 'write-1MB', MB, write_case(MB)),
+    ('dispatch', ('pre-edit',), 'multiedit-500', 500 * 600, multiedit_case(500)),
+    ('protect-files', (), 'deep-path-200', 200 * 12, deep_path_case(200)),
+    ('dispatch', ('pre-edit',), 'deep-path-200', 200 * 12 + KB, deep_path_case(200)),
+    ('validate-prompt', (), 'prompt-100KB', 100 * KB, prompt_case(100 * KB)),
+    ('validate-prompt', (), 'prompt-1MB', MB, prompt_case(MB)),
+    ('log-commands', (), 'command-8KB', 8 * KB, command_case(8 * KB)),
+]
+
+# A case regresses when it is slower than baseline * ratio and also by more
+# than the absolute slack, which keeps noise on sub-millisecond cases quiet.
+TIME_RATIO = 1.25
+TIME_SLACK_MS = 5.0
+RSS_RATIO = 1.5
+RSS_SLACK_KB = 8 * 1024
+
+
+def spawner():
+    """Run hook processes for the benchmark and report their resource usage.
+
+    Linux carries a parent's peak RSS over into children it forks, so cold
+    runs are spawned from this small helper rather than from the benchmark
+    process, which holds the (large) generated payloads. Reads one JSON
+    request per line ({"argv", "stdin", "env", "timeout"}) and answers each with
+    {"ms", "exit_code", "rss_kb"}; "ms" is null when the run timed out.
+    """
+    for line in sys.stdin:
+        request = json.loads(line)
+        with open(request['stdin']) as stdin:
+            start = time.perf_counter()
+            proc = subprocess.Popen(request['argv'], stdin=stdin, env={**os.environ, **request['env']},
+                                    stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+            killer = threading.Timer(request['timeout'], proc.kill)
+            killer.start()
+            try:
+                _, status, usage = os.wait4(proc.pid, 0)
+            finally:
+                killer.cancel()
+            elapsed = (time.perf_counter() - start) * 1000
+        # ru_maxrss is in KB on Linux and bytes on macOS.
+        rss = usage.ru_maxrss // 1024 if sys.platform == 'darwin' else usage.ru_maxrss
+        print(json.dumps({
+            'ms': None if elapsed >= request['timeout'] * 1000 else elapsed,
+            'exit_code': os.waitstatus_to_exitcode(status),
+            'rss_kb': rss,
+        }), flush=True)
+    return 0
+
+
+class ColdRunner:
+    """Client for the spawner helper; runs a hook script in a fresh process."""
+
+    def __init__(self):
+        self.proc = subprocess.Popen([sys.executable, __file__, '--spawner'],
+                                     stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True)
+
+    def run(self, hook_name: str, args: Tuple[str, ...], payload: str,
+            timeout: float) -> Tuple[Optional[float], int, int]:
+        """Return (wall ms or None on timeout, exit code, peak RSS in KB)."""
+        with tempfile.NamedTemporaryFile('w', suffix='.json') as stdin:
+            stdin.write(payload)
+            stdin.flush()
+            request = {'argv': ['python3', str(HOOKS_DIR / f"{hook_name}.py"), *args],
+                       'stdin': stdin.name, 'timeout': timeout,
+                       'env': {name: os.environ[name]
+                               for name in ('CLAUDE_PROJECT_DIR', 'CLAUDE_HOOKS_STATE')}}
+            self.proc.stdin.write(json.dumps(request) + '\n')
+            self.proc.stdin.flush()
+            reply = json.loads(self.proc.stdout.readline())
+        return reply['ms'], reply['exit_code'], reply['rss_kb']
+
+    def close(self):
+        self.proc.stdin.close()
+        self.proc.wait()
+
+
+def run_warm(hook, payload: str) -> float:
+    """Invoke an already constructed hook in-process; return wall ms."""
+    start = time.perf_counter()
+    hook.invoke(io.StringIO(payload), io.StringIO(), io.StringIO())
+    return (time.perf_counter() - start) * 1000
+
+
+def bench_case(runner: ColdRunner, hook_name: str, args: Tuple[str, ...], make: Callable[[int], Dict[str, Any]],
+               size: int, repeat: int, timeout: float) -> Dict[str, Any]:
+    result = {'hook': hook_name, 'args': list(args), 'bytes': size}
+    # Large payloads are repeated less so the whole suite stays practical.
+    runs = repeat if size < 10 * MB else 2
+    # Every run gets distinct content so verdict/format caches never hit.
+    cold = []
+    for seed in range(runs):
+        elapsed, exit_code, rss = runner.run(hook_name, args, json.dumps(make(seed)), timeout)
+        if elapsed is None:
+            result.update(timed_out=True, timeout_s=timeout, peak_rss_kb=rss)
+            return result
+        cold.append((elapsed, exit_code, rss))
+
+    hook = hook_class(hook_name)(*args)
+    hook.long_lived = True
+    run_warm(hook, json.dumps(make(runs)))  # warm-up
+    warm = [run_warm(hook, json.dumps(make(runs + 1 + seed))) for seed in range(runs)]
+
+    warm_ms = statistics.median(warm)
+    result.update({
+        'exit_code': cold[0][1],
+        'cold_ms': round(statistics.median(c[0] for c in cold), 3),
+        'warm_ms': round(warm_ms, 3),
+        'mb_per_s': round(size / MB / (warm_ms / 1000), 3) if warm_ms else None,
+        'peak_rss_kb': max(c[2] for c in cold),
+    })
+    return result
+
+
+def compare(results: Dict[str, Any], baseline: Dict[str, Any]) -> List[str]:
+    """Return regression messages for results against a baseline."""
+    regressions = []
+    for case, result in results.items():
+        base = baseline.get(case)
+        if not base:
+            continue
+        if result.get('timed_out') or base.get('timed_out'):
+            if result.get('timed_out') and not base.get('timed_out'):
+                regressions.append(f"{case}: timed out after {result['timeout_s']}s")
+            continue
+        for key in ('cold_ms', 'warm_ms'):
+            if result[key] > base[key] * TIME_RATIO and result[key] - base[key] > TIME_SLACK_MS:
+                regressions.append(f"{case}: {key} {base[key]:.1f} -> {result[key]:.1f}")
+        rss, base_rss = result['peak_rss_kb'], base['peak_rss_kb']
+        if rss > base_rss * RSS_RATIO and rss - base_rss > RSS_SLACK_KB:
+            regressions.append(f"{case}: peak_rss_kb {base_rss} -> {rss}")
+        if result['exit_code'] != base['exit_code']:
+            regressions.append(f"{case}: exit code {base['exit_code']} -> {result['exit_code']}")
+    return regressions
+
+
+def run_bench(options: argparse.Namespace) -> int:
+    """Benchmark hooks, print JSON results and compare them to a baseline."""
+    os.environ.pop('CLAUDE_HOOKS_METRICS', None)
+
+    cases = [case for case in BENCH_CASES
+             if case[3] <= options.max_size * MB
+             and (not options.filter or options.filter in f"{case[0]}:{case[2]}")]
+
+    results = {}
+    runner = ColdRunner()
+    try:
+        for hook_name, args, name, size, make in cases:
+            case = f"{hook_name}:{name}"
+            print(f"⏱  {case}", file=sys.stderr)
+            # A fresh project per case keeps hook caches from leaking between cases.
+            with tempfile.TemporaryDirectory() as project_dir:
+                use_scratch_project(project_dir)
+                results[case] = bench_case(runner, hook_name, args, make, size,
+                                           options.repeat, options.timeout)
+            if results[case].get('timed_out'):
+                print(f"   timed out after {options.timeout}s", file=sys.stderr)
+    finally:
+        runner.close()
+
+    report = {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'results': results,
+    }
+    output = json.dumps(report, indent=2)
+    if options.output:
+        Path(options.output).write_text(output + '\n')
+    else:
+        print(output)
+
+    if options.save_baseline:
+        Path(options.baseline).write_text(output + '\n')
+        print(f"Saved baseline to {options.baseline}", file=sys.stderr)
+        return 0
+
+    try:
+        baseline = json.loads(Path(options.baseline).read_text())['results']
+    except (OSError, ValueError, KeyError):
+        print(f"No baseline at {options.baseline}; run with --save-baseline", file=sys.stderr)
+        return 0
+
+    regressions = compare(results, baseline)
+    for message in regressions:
+        print(f"❌ regression: {message}", file=sys.stderr)
+    if not regressions:
+        print("✅ No regressions against the baseline", file=sys.stderr)
+    return 1 if regressions else 0
+
+
+# -- start-up budget ----------------------------------------------------------
+
+# Allowed cost to the decision, in bare interpreter start-ups, so the budget
+# holds on slow and fast machines alike (--budget-ms sets an absolute one).
+STARTUP_BUDGET_RATIO = 3.0
+
+STARTUP_CASES = [
+    ('protect-files', (), deep_path_case(3)),
+    ('security-check', (), write_case(KB)),
+    ('dispatch', ('pre-edit',), write_case(KB)),
+    ('validate-prompt', (), prompt_case(200)),
+    ('log-commands', (), command_case(64)),
+]
+
+
+def wall_ms(argv: List[str], payload: str, runs: int) -> float:
+    """Median wall time of running argv with payload on stdin."""
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run(argv, input=payload, capture_output=True, text=True, timeout=30)
+        times.append((time.perf_counter() - start) * 1000)
+    return statistics.median(times)
+
+
+def import_costs(argv: List[str], payload: str) -> Dict[str, float]:
+    """Self -X importtime cost (ms) of every module argv imports."""
+    result = subprocess.run(['python3', '-X', 'importtime', *argv[1:]], input=payload,
+                            capture_output=True, text=True, timeout=30)
+    imports = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        own, _, name = line.split('|')
+        imports[name.strip()] = int(own.split(':')[1]) / 1000
+    return imports
+
+
+def run_startup(options: argparse.Namespace) -> int:
+    """Hold every hook's cold start to the start-up budget.
+
+    The cost to the decision is the hook's wall time minus that of a bare
+    interpreter; over-budget hooks list their heaviest imports.
+    """
+    os.environ.pop('CLAUDE_HOOKS_METRICS', None)
+    over = 0
+
+    with tempfile.TemporaryDirectory() as project_dir:
+        use_scratch_project(project_dir)
+        bare = wall_ms(['python3', '-c', 'pass'], '', options.repeat)
+        interpreter_imports = import_costs(['python3', '-c', 'pass'], '')
+        budget = options.budget_ms or STARTUP_BUDGET_RATIO * bare
+        print(f"Bare interpreter: {bare:.1f}ms; budget: {budget:.0f}ms to the decision\n")
+
+        for hook_name, args, make in STARTUP_CASES:
+            argv = ['python3', str(HOOKS_DIR / f"{hook_name}.py"), *args]
+            payload = json.dumps(make(0))
+            cost = wall_ms(argv, payload, options.repeat) - bare
+            imports = {name: ms for name, ms in import_costs(argv, payload).items()
+                       if name not in interpreter_imports}
+            status = '✅' if cost <= budget else '❌'
+            print(f"{status} {hook_name:<18} {cost:7.1f}ms "
+                  f"(imports {sum(imports.values()):.1f}ms under -X importtime)")
+            if cost > budget:
+                over += 1
+                for name, ms in sorted(imports.items(), key=lambda item: -item[1])[:5]:
+                    print(f"     {ms:7.1f}ms  {name}")
+
+    return 1 if over else 0
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description='Test or benchmark the hooks.')
+    parser.add_argument('--mode', choices=MODES, default='subprocess',
+                        help='run tests as scripts (end to end, the default) or in-process')
+    parser.add_argument('-j', '--jobs', type=int, default=1,
+                        help='run independent tests concurrently on N workers')
+    parser.add_argument('--bench', action='store_true', help='run the benchmark suite')
+    parser.add_argument('--startup', action='store_true',
+                        help='check hook cold starts against the start-up budget')
+    parser.add_argument('--budget-ms', type=float,
+                        help=f'start-up budget per hook (default {STARTUP_BUDGET_RATIO:g}x '
+                             f'the bare interpreter start-up)')
+    parser.add_argument('--repeat', type=int, default=5, help='runs per case (default 5)')
+    parser.add_argument('--timeout', type=float, default=60,
+                        help='seconds before a cold run counts as timed out (default 60)')
+    parser.add_argument('--filter', help='only cases whose "hook:case" id contains this')
+    parser.add_argument('--max-size', type=float, default=50,
+                        help='skip cases with payloads above this many MB (default 50)')
+    parser.add_argument('--output', help='write JSON results here instead of stdout')
+    parser.add_argument('--baseline', default=str(PLUGIN_ROOT / 'bench-baseline.json'),
+                        help='baseline results to compare against')
+    parser.add_argument('--save-baseline', action='store_true',
+                        help='store these results as the new baseline')
+    parser.add_argument('--spawner', action='store_true', help=argparse.SUPPRESS)
+    options = parser.parse_args(argv)
+
+    if options.spawner:
+        return spawner()
+    if options.bench:
+        return run_bench(options)
+    if options.startup:
+        return run_startup(options)
+    return run_tests(options.mode, options.jobs)
+
+
 if __name__ == '__main__':
     sys.exit(main())
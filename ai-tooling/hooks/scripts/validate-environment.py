@@ -2,17 +2,19 @@
 """
 SessionStart hook - Validates environment on session startup.
 Checks for required tools, configuration, and potential issues.
+With environment.toolchain enabled in ~/.claude/hooks-config.json, the
+commands in the project's Brewfile are checked too (see lib/toolchain.py).
 
 Source: https://github.com/CloudAI-X/claude-workflow
 """
 import sys
 import os
 import shutil
-from pathlib import Path
 
-sys.path.insert(0, str(Path(__file__).parent.parent / 'lib'))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'lib'))
 
 from base_hook import BaseHook
+from config import get_environment_settings, state_dir
 
 
 class ValidateEnvironmentHook(BaseHook):
@@ -25,14 +27,14 @@ class ValidateEnvironmentHook(BaseHook):
         info, warnings = self.check_environment()
 
         if info:
-            print("Environment check:")
+            print("Environment check:", file=self.stdout)
             for item in info:
-                print(f"  ✓ {item}")
+                print(f"  ✓ {item}", file=self.stdout)
 
         if warnings:
-            print("\nWarnings:")
+            print("\nWarnings:", file=self.stdout)
             for warning in warnings:
-                print(f"  ⚠️  {warning}")
+                print(f"  ⚠️  {warning}", file=self.stdout)
 
         return 0
 
@@ -56,19 +58,27 @@ class ValidateEnvironmentHook(BaseHook):
         else:
             warnings.append("Git not found - version control commands unavailable")
 
-        project_dir = Path(os.environ.get("CLAUDE_PROJECT_DIR", os.getcwd()))
-        env_example = project_dir / ".env.example"
-        env_file = project_dir / ".env"
+        project_dir = os.environ.get("CLAUDE_PROJECT_DIR", os.getcwd())
+        env_example = os.path.join(project_dir, ".env.example")
+        env_file = os.path.join(project_dir, ".env")
 
-        if env_example.exists() and not env_file.exists():
+        if os.path.exists(env_example) and not os.path.exists(env_file):
             warnings.append("No .env file found but .env.example exists - copy and configure it")
 
-        package_json = project_dir / "package.json"
-        if package_json.exists():
-            node_modules = project_dir / "node_modules"
-            if not node_modules.exists():
+        package_json = os.path.join(project_dir, "package.json")
+        if os.path.exists(package_json):
+            node_modules = os.path.join(project_dir, "node_modules")
+            if not os.path.exists(node_modules):
                 warnings.append("node_modules not found - run 'npm install' first")
 
+        settings = get_environment_settings()
+        if settings['toolchain']:
+            from toolchain import check_toolchain
+
+            toolchain_info, toolchain_warnings = check_toolchain(settings, project_dir, state_dir())
+            info.extend(toolchain_info)
+            warnings.extend(toolchain_warnings)
+
         return info, warnings
 
 
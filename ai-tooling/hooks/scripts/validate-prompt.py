@@ -5,14 +5,16 @@ Can provide warnings or context to Claude based on the prompt content.
 
 Source: https://github.com/CloudAI-X/claude-workflow
 """
+import os
 import sys
 import re
-from pathlib import Path
 
-sys.path.insert(0, str(Path(__file__).parent.parent / 'lib'))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'lib'))
 
 from base_hook import BaseHook
 from config import get_agent_hints
+from pattern_matcher import HintMatcher
+from secret_scanner import PatternScanner
 
 
 class ValidatePromptHook(BaseHook):
@@ -21,18 +23,9 @@ class ValidatePromptHook(BaseHook):
     def __init__(self):
         super().__init__('validate-prompt')
         self.agent_hints, self.dangerous_patterns = get_agent_hints()
-        self._compile_patterns()
-
-    def _compile_patterns(self):
-        """Pre-compile regex patterns for performance."""
-        self.compiled_hints = {
-            re.compile(pattern, re.IGNORECASE): hint
-            for pattern, hint in self.agent_hints.items()
-        }
-        self.compiled_dangerous = [
-            (re.compile(pattern, re.IGNORECASE), warning)
-            for pattern, warning in self.dangerous_patterns
-        ]
+        self.hints = list(self.agent_hints.values())
+        self.hint_matcher = HintMatcher(list(self.agent_hints), re.IGNORECASE)
+        self.danger_scanner = PatternScanner(self.dangerous_patterns, re.IGNORECASE)
 
     def execute(self) -> int:
         prompt = self.get_prompt()
@@ -43,7 +36,7 @@ class ValidatePromptHook(BaseHook):
         messages = self.validate_prompt(prompt)
 
         for msg in messages:
-            print(msg)
+            print(msg, file=self.stdout)
 
         return 0
 
@@ -51,14 +44,14 @@ class ValidatePromptHook(BaseHook):
         """Validate the user prompt and provide helpful context."""
         messages = []
 
-        for pattern, hint in self.compiled_hints.items():
-            if pattern.search(prompt):
-                messages.append(hint)
-                break
+        # Keyword hints are matched by position rather than by regex, so
+        # long pasted logs cannot trigger '.*' backtracking.
+        index = self.hint_matcher.first_match(prompt)
+        if index is not None:
+            messages.append(self.hints[index])
 
-        for pattern, warning in self.compiled_dangerous:
-            if pattern.search(prompt):
-                messages.append(warning)
+        # One pass over the prompt for all dangerous-command patterns.
+        messages.extend(self.danger_scanner.scan(prompt))
 
         return messages
 